@@ -0,0 +1,99 @@
+"""
+Genera productos diarios y mensuales desde el almacén SQLite de observaciones.
+
+Las estaciones automáticas (horarias) se resumen con las columnas de una estación
+convencional: temperatura máxima y mínima, humedad media y precipitación total, más
+la temperatura media, el viento y el nivel del río. Cada campo lleva la cantidad de
+lecturas válidas del periodo.
+
+Ejemplos:
+    python aggregate.py                                    # Todas las estaciones, diario y mensual
+    python aggregate.py --stations 472D30C8 --frequency month
+    python aggregate.py --start 2020-01 --end 2024-12 --min-coverage 0.9
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+import settings
+from typing import List
+from src.aggregation import FIELD_HEADERS, AggregatedTable, aggregate, observations_to_table
+from src.station_service import find_station_by_code
+from src.writers import ObservationStore, StreamingCSVWriter
+
+FILE_SUFFIXES = {"day": "diario", "month": "mensual"}
+
+
+def csv_lines(table: AggregatedTable) -> List[str]:
+    """Filas CSV de la tabla agregada; celdas vacías donde el periodo no tiene dato"""
+    columns = []
+    for field in table.fields:
+        values = table.columns[field]
+        if values.dtype.kind != 'f':
+            columns.append(values.astype(str))
+            continue
+        text = np.round(values, 2).astype(str).astype(object)
+        text[table.masks[field]] = ""
+        columns.append(text)
+    measurement_fields = [field for field in table.fields if field in table.counts]
+    columns.extend(table.counts[field].astype(str) for field in measurement_fields)
+    return [settings.CSV_SEPARATOR.join(row) for row in zip(*(column.tolist() for column in columns))]
+
+
+def csv_headers(table: AggregatedTable) -> List[str]:
+    return table.headers + [f"Registros {FIELD_HEADERS[field]}" for field in table.fields if field in table.counts]
+
+
+def aggregate_station(store: ObservationStore, station_code: str, args) -> List[str]:
+    """Escribe los archivos diario y/o mensual de una estación y retorna sus rutas"""
+    table = observations_to_table(store.query(station_code, args.start, args.end))
+    if not len(table):
+        return []
+
+    station = find_station_by_code(station_code)
+    name = station.name.replace(" ", "") if station else station_code
+    directory = os.path.join(args.output_dir, name)
+    files = []
+    for frequency in args.frequency:
+        result = aggregate(table, frequency, min_coverage=args.min_coverage)
+        filepath = os.path.join(directory, f"{name}-{FILE_SUFFIXES[frequency]}.csv")
+        with StreamingCSVWriter(filepath, csv_headers(result)) as writer:
+            writer.write_lines(frequency, csv_lines(result))
+        files.append(filepath)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", nargs="+", help="Códigos de estación (por defecto, todas las del almacén)")
+    parser.add_argument("--frequency", nargs="+", choices=tuple(FILE_SUFFIXES), default=list(FILE_SUFFIXES))
+    parser.add_argument("--start", help="Inicio del rango, p. ej. 2020-01-01")
+    parser.add_argument("--end", help="Fin del rango (incluido), p. ej. 2024-12")
+    parser.add_argument("--min-coverage", type=float, default=settings.AGGREGATION_MIN_COVERAGE,
+                        help="Fracción mínima de lecturas del periodo para calcular su valor")
+    parser.add_argument("--store", default=settings.SQLITE_STORE_FILE, help="Almacén SQLite de observaciones")
+    parser.add_argument("--output-dir", default=settings.AGGREGATES_DIR, help="Directorio de salida")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        print(f"{settings.ERROR} No existe el almacén {args.store} (SQLITE_STORE o rebuild.py --sqlite)")
+        return
+
+    start = time.perf_counter()
+    total = 0
+    with ObservationStore(args.store) as store:
+        for station_code in args.stations or list(store.stations()):
+            files = aggregate_station(store, station_code, args)
+            if not files:
+                print(f"{settings.WARNING} {station_code}: sin observaciones en el rango")
+                continue
+            total += len(files)
+            for filepath in files:
+                print(f"{settings.SUCCESS} {filepath}")
+
+    print(f"\n🎉 {total} archivos generados en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Descarga varias estaciones en un solo proceso, reutilizando navegadores ya iniciados.
+
+Ejemplos:
+    python batch.py --stations 472D30C8 4726A602 --mode year --year 2024 --consolidated
+    python batch.py --stations 472D30C8 --mode month --year 2024 --month 9
+    python batch.py --stations-file estaciones.txt --mode period --start-year 2020 --end-year 2025 \\
+        --consolidated --browsers 2 --headless
+    python batch.py --stations 472D30C8 --mode month --year 2024 --month 9 --profile cookies
+"""
+
+import argparse
+import asyncio
+import time
+import settings
+from main import evict_html_cache, scrape_stations
+from src.browser_pool import BrowserPool
+from src.browser_profile import ProfileStore
+from src.metrics import recorder
+from src.station_service import find_station_by_code
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", nargs="+", default=[], help="Códigos de estación")
+    parser.add_argument("--stations-file", help="Archivo con un código de estación por línea")
+    parser.add_argument("--mode", choices=("month", "year", "period"), required=True)
+    parser.add_argument("--year", type=int, help="Año (modos month y year)")
+    parser.add_argument("--month", type=int, help="Mes (modo month)")
+    parser.add_argument("--start-year", type=int, help="Año inicial (modo period)")
+    parser.add_argument("--end-year", type=int, help="Año final (modo period)")
+    parser.add_argument("--consolidated", action="store_true", help="Un archivo único por estación")
+    parser.add_argument("--browsers", type=int, default=settings.BROWSER_POOL_SIZE, help="Navegadores simultáneos")
+    parser.add_argument("--max-jobs", type=int, default=settings.BROWSER_MAX_JOBS, help="Estaciones por navegador antes de reciclarlo")
+    parser.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    parser.add_argument("--browser-path", help="Ejecutable de Chrome/Chromium")
+    parser.add_argument("--profile", choices=("profile", "cookies"), default=settings.BROWSER_PROFILE_MODE,
+                        help="Reutilizar la autorización de Cloudflare entre ejecuciones")
+    args = parser.parse_args()
+
+    required = {"month": ("year", "month"), "year": ("year",), "period": ("start_year", "end_year")}[args.mode]
+    missing = [f"--{name.replace('_', '-')}" for name in required if getattr(args, name) is None]
+    if missing:
+        parser.error(f"el modo {args.mode} requiere {', '.join(missing)}")
+    return args
+
+
+def build_query_params(args) -> dict:
+    if args.mode == "month":
+        return {"mode": "month", "year": args.year, "month": args.month}
+    if args.mode == "year":
+        return {"mode": "year", "year": args.year, "consolidated": args.consolidated}
+    return {"mode": "period", "start_year": args.start_year, "end_year": args.end_year, "consolidated": args.consolidated}
+
+
+async def run(args) -> None:
+    codes = list(args.stations)
+    if args.stations_file:
+        with open(args.stations_file, 'r', encoding='utf-8') as f:
+            codes.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    stations = []
+    for code in codes:
+        station = find_station_by_code(code)
+        if station:
+            stations.append(station)
+        else:
+            print(f"{settings.WARNING} Estación no encontrada: {code}")
+    if not stations:
+        print(f"{settings.ERROR} No hay estaciones para procesar")
+        return
+
+    browser_kwargs = {"headless": args.headless}
+    if args.browser_path:
+        browser_kwargs["browser_executable_path"] = args.browser_path
+
+    recorder.reset()
+    start = time.perf_counter()
+    async with BrowserPool(size=args.browsers, max_jobs=args.max_jobs, browser_kwargs=browser_kwargs,
+                           profiles=ProfileStore(mode=args.profile)) as pool:
+        results = await scrape_stations(stations, build_query_params(args), pool=pool)
+
+    print("\n" + "=" * 50)
+    for result in results:
+        print(f"{result.station_code}: {result.get_summary()}")
+        for error in result.errors:
+            print(f"   - {error}")
+    print(f"\n🎉 {sum(r.success for r in results)}/{len(results)} estaciones en {time.perf_counter() - start:.1f} s "
+          f"({pool.launched} navegadores iniciados, {pool.recycled} reciclados)")
+
+    evict_html_cache()
+    for filepath in recorder.write_reports():
+        print(f"📈 Métricas guardadas: {filepath}")
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Mide la agregación diaria y mensual de datos horarios (src/aggregation.py) frente a una
+agregación fila por fila en Python, y su tiempo total para muchas estaciones.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_aggregation
+    python -m benchmarks.bench_aggregation --stations 300 --start-year 2015 --end-year 2024
+"""
+
+import argparse
+import math
+import time
+from collections import defaultdict
+import numpy as np
+from src.aggregation import aggregate
+from src.columnar import ColumnarTable
+from src.models.data_schema import METEOROLOGICAL_AUTOMATIC_HEADERS, get_column_dtypes
+
+
+def make_hourly_columns(start_year: int, end_year: int, seed: int, missing_ratio: float = 0.05) -> ColumnarTable:
+    """Una estación automática con lecturas horarias del rango de años, generada directamente en NumPy"""
+    rng = np.random.default_rng(seed)
+    dtypes = get_column_dtypes(METEOROLOGICAL_AUTOMATIC_HEADERS)
+    start = np.datetime64(f"{start_year}-01-01T00", "h")
+    times = np.arange(start, np.datetime64(f"{end_year + 1}-01-01T00", "h"))
+    days = times.astype("datetime64[D]")
+    months = times.astype("datetime64[M]")
+
+    columns = {
+        "year": (months.astype(np.int64) // 12 + 1970).astype(dtypes["year"]),
+        "month": (months.astype(np.int64) % 12 + 1).astype(dtypes["month"]),
+        "day": ((days - months.astype("datetime64[D]")).astype(np.int64) + 1).astype(dtypes["day"]),
+        "hour": ((times - days.astype("datetime64[h]")).astype(np.int64)).astype(dtypes["hour"]),
+    }
+    ranges = {"temperature": (0, 30), "precipitation": (0, 5), "humidity": (20, 100),
+              "wind_direction": (0, 360), "wind_speed": (0, 15)}
+    masks = {}
+    for field, (low, high) in ranges.items():
+        values = rng.uniform(low, high, len(times)).round(1).astype(dtypes[field])
+        masks[field] = rng.random(len(times)) < missing_ratio
+        values[masks[field]] = np.nan
+        columns[field] = values
+    return ColumnarTable(METEOROLOGICAL_AUTOMATIC_HEADERS, columns, masks)
+
+
+def aggregate_rows(table: ColumnarTable) -> dict:
+    """Referencia fila por fila: máximo, mínimo y media de temperatura y total de precipitación por día"""
+    days = defaultdict(lambda: {"temperature": [], "precipitation": []})
+    columns = {field: table[field].tolist() for field in ("year", "month", "day", "temperature", "precipitation")}
+    for year, month, day, temperature, precipitation in zip(*columns.values()):
+        group = days[(year, month, day)]
+        if not math.isnan(temperature):
+            group["temperature"].append(temperature)
+        if not math.isnan(precipitation):
+            group["precipitation"].append(precipitation)
+    return {
+        key: (max(group["temperature"]), min(group["temperature"]),
+              sum(group["temperature"]) / len(group["temperature"]), sum(group["precipitation"]))
+        for key, group in days.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--end-year", type=int, default=2024)
+    args = parser.parse_args()
+
+    table = make_hourly_columns(args.start_year, args.end_year, seed=0)
+    print(f"📊 Una estación, {len(table)} lecturas horarias ({args.start_year}-{args.end_year})")
+
+    start = time.perf_counter()
+    reference = aggregate_rows(table)
+    rows_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    daily = aggregate(table, "day", min_coverage=0)
+    numpy_time = time.perf_counter() - start
+
+    for index, key in enumerate(zip(*(daily[field].tolist() for field in ("year", "month", "day")))):
+        expected = reference[key]
+        actual = [daily[field][index] for field in ("temp_max", "temp_min", "temperature", "precipitation")]
+        if not np.allclose(actual, expected, rtol=1e-5):
+            raise AssertionError(f"Resultados distintos el {key}: {actual} vs {expected}")
+    print(f"   Fila por fila  {rows_time * 1000:9.1f} ms (4 campos)")
+    print(f"   NumPy          {numpy_time * 1000:9.1f} ms ({len(daily.fields) - 3} campos, con cobertura)")
+    print(f"   Aceleración: {rows_time / numpy_time:.0f}x")
+
+    tables = [make_hourly_columns(args.start_year, args.end_year, seed=seed) for seed in range(args.stations)]
+    start = time.perf_counter()
+    for station_table in tables:
+        aggregate(station_table, "day")
+        aggregate(station_table, "month")
+    elapsed = time.perf_counter() - start
+    total = sum(len(station_table) for station_table in tables)
+    print(f"\n📊 {args.stations} estaciones, {total:,} lecturas: diario y mensual en {elapsed:.2f} s "
+          f"({total / elapsed / 1e6:.1f} M lecturas/s)")
+
+
+if __name__ == "__main__":
+    main()
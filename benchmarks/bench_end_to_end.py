@@ -0,0 +1,212 @@
+"""
+Benchmark de extremo a extremo del scraper contra el servidor local de prueba.
+
+Ejecuta `scrape_station` con zendriver (o el modo HTTP) sobre estaciones
+convencionales y automáticas servidas por `fixture_server` y reporta meses por
+segundo, latencia p50/p95 por opción y memoria RSS máxima del proceso y del
+navegador, además del desglose de tiempo por fase (src/metrics.py). No accede
+al sitio real.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_end_to_end
+    python -m benchmarks.bench_end_to_end --mode http --latency 0.2 --json resultados.json
+    python -m benchmarks.bench_end_to_end --tabs 4 --error-rate 0.05 --browser-path /usr/bin/chromium
+    python -m benchmarks.bench_end_to_end --no-blocking --asset-latency 0.1   # Sin bloqueo de peticiones
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import List
+import main
+import settings
+from benchmarks.fixture_server import ERROR_KINDS, FixtureServer
+from src.browser_pool import process_table
+from src.http_fetcher import HttpTableFetcher
+from src.metrics import recorder
+from src.station_service import get_stations
+
+class RssSampler:
+    """Registra la memoria máxima del proceso y la del árbol completo (incluido el navegador)"""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_self = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        pid = os.getpid()
+        children, rss = process_table()
+        total, pending = 0, [pid]
+        while pending:
+            current = pending.pop()
+            total += rss.get(current, 0)
+            pending.extend(children.get(current, []))
+        self.peak_total = max(self.peak_total, total)
+        self.peak_self = max(self.peak_self, rss.get(pid, 0))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        if os.path.isdir("/proc"):
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+@contextlib.contextmanager
+def record_latencies(latencies: List[float]):
+    """Mide cada descarga de opción, por el navegador o por HTTP"""
+    original_fetch_option = main.fetch_option_table
+    original_fetch_table = HttpTableFetcher.fetch_table
+
+    async def timed_fetch_option(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original_fetch_option(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    async def timed_fetch_table(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original_fetch_table(self, *args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    main.fetch_option_table = timed_fetch_option
+    HttpTableFetcher.fetch_table = timed_fetch_table
+    try:
+        yield
+    finally:
+        main.fetch_option_table = original_fetch_option
+        HttpTableFetcher.fetch_table = original_fetch_table
+
+
+def pick_stations(count: int) -> list:
+    """Alterna estaciones meteorológicas convencionales y automáticas"""
+    stations = get_stations()
+    conventional = [s for s in stations if s.station_type == "M" and s.status != "AUTOMATICA"]
+    automatic = [s for s in stations if s.station_type == "M" and s.status == "AUTOMATICA"]
+    picked = []
+    for index in range(count):
+        source = conventional if index % 2 == 0 else automatic
+        picked.append(source[index // 2 % len(source)])
+    return picked
+
+
+def percentile(values: List[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+async def run_benchmark(args) -> dict:
+    import zendriver as zd
+
+    settings.REQUEST_BLOCKING_ENABLED = not args.no_blocking
+    server = FixtureServer(start_year=args.start_year, end_year=args.end_year, latency=args.latency,
+                           jitter=args.jitter, asset_latency=args.asset_latency, error_rate=args.error_rate, error_kinds=args.error_kinds)
+    latencies: List[float] = []
+    results = []
+    query_params = {"mode": "period", "start_year": args.start_year, "end_year": args.end_year, "consolidated": True}
+
+    recorder.reset()
+    with server, tempfile.TemporaryDirectory() as output_dir, RssSampler() as sampler, record_latencies(latencies):
+        browser = await zd.start(headless=not args.headful, browser_executable_path=args.browser_path,
+                                 sandbox=not args.no_sandbox)
+        start = time.perf_counter()
+        try:
+            for station in pick_stations(args.stations):
+                name = station.name.replace(" ", "")
+                params = dict(query_params, filename=f"{name}-{args.start_year}-{args.end_year}.csv")
+                quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with quiet:
+                    result = await main.scrape_station(browser, station, params, output_dir=output_dir,
+                                                       base_url=server.base_url, fetch_mode=args.mode,
+                                                       tabs=args.tabs, use_html_cache=False)
+                results.append(result)
+        finally:
+            elapsed = time.perf_counter() - start
+            await browser.stop()
+
+    months = args.stations * (args.end_year - args.start_year + 1) * 12
+    return {
+        "mode": args.mode,
+        "tabs": args.tabs,
+        "stations": args.stations,
+        "months": months,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "request_blocking": not args.no_blocking,
+        "elapsed_s": round(elapsed, 3),
+        "months_per_s": round(months / elapsed, 2),
+        "option_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "option_p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "peak_rss_total_mb": round(sampler.peak_total / 1024 ** 2, 1),
+        "peak_rss_python_mb": round(sampler.peak_self / 1024 ** 2, 1),
+        "stations_ok": sum(result.success for result in results),
+        "server": dict(server.stats),
+        "phases": recorder.summary(),
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("browser", "http"), default="browser")
+    parser.add_argument("--tabs", type=int, default=1, help="Pestañas en paralelo (modo navegador)")
+    parser.add_argument("--stations", type=int, default=2, help="Estaciones (alternando convencional y automática)")
+    parser.add_argument("--start-year", type=int, default=2024)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia de cada tabla (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--asset-latency", type=float, default=0.0, help="Latencia de cada imagen o fuente")
+    parser.add_argument("--no-blocking", action="store_true", help="Desactivar el bloqueo de peticiones")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-kinds", nargs="+", default=list(ERROR_KINDS), choices=ERROR_KINDS)
+    parser.add_argument("--browser-path", help="Ejecutable de Chrome/Chromium")
+    parser.add_argument("--no-sandbox", action="store_true", help="Necesario al ejecutar como root")
+    parser.add_argument("--headful", action="store_true", help="Mostrar la ventana del navegador")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida del scraper")
+    parser.add_argument("--json", help="Guardar el resultado en este archivo")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+
+    print(f"\n📊 {report['months']} meses en {report['elapsed_s']} s ({report['mode']}, {report['tabs']} pestañas)")
+    print(f"   Meses/s:        {report['months_per_s']}")
+    print(f"   Latencia p50:   {report['option_p50_ms']} ms")
+    print(f"   Latencia p95:   {report['option_p95_ms']} ms")
+    print(f"   RSS máx total:  {report['peak_rss_total_mb']} MB (Python {report['peak_rss_python_mb']} MB)")
+    print(f"   Estaciones OK:  {report['stations_ok']}/{report['stations']}")
+    print(f"   Recursos:       {report['server'].get('assets', 0)} servidos, "
+          f"{report['server'].get('asset_bytes', 0) / 1024:.0f} KB")
+    print(f"\n   {'Fase':<16} {'n':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for phase, summary in report["phases"].items():
+        print(f"   {phase:<16} {summary['count']:>6} {summary['sum_s']:>9.2f} "
+              f"{summary['p50_s'] * 1000:>9.1f} {summary['p95_s'] * 1000:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Resultado guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main_cli()
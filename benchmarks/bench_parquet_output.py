@@ -0,0 +1,98 @@
+"""
+Compara el CSV consolidado con el dataset Parquet particionado: tamaño en disco y
+tiempo de una lectura analítica (una columna, varias estaciones, un rango de meses).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_parquet_output
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+import pyarrow.compute as pc
+import settings
+from benchmarks.generators import make_daily_table, make_hourly_table, month_periods
+from src.columnar import decode_table_html
+from src.html_utils import html_table_to_csv
+from src.models.data_schema import METEOROLOGICAL_AUTOMATIC_HEADERS, METEOROLOGICAL_CONVENTIONAL_HEADERS
+from src.writers import ParquetDatasetWriter, read_observations
+
+STATION_KINDS = (
+    ("CONV", METEOROLOGICAL_CONVENTIONAL_HEADERS, make_daily_table, 2),
+    ("AUTO", METEOROLOGICAL_AUTOMATIC_HEADERS, make_hourly_table, 1),
+)
+
+
+def build_outputs(root: str, stations: int, start_year: int, end_year: int) -> None:
+    for kind, headers, make_table, start_line in STATION_KINDS:
+        for number in range(stations):
+            code = f"{kind}{number:03d}"
+            writer = ParquetDatasetWriter(code, headers, os.path.join(root, "parquet"))
+            lines = [settings.CSV_SEPARATOR.join(headers)]
+            for seed, period in enumerate(month_periods(start_year, end_year)):
+                html = make_table(int(period[:4]), int(period[4:]), seed=seed + number)
+                lines.extend(html_table_to_csv(html, start_line=start_line).split('\n'))
+                writer.write_table(period, decode_table_html(html, headers, start_line))
+            writer.close()
+            with open(os.path.join(root, "csv", f"{code}.csv"), 'w', encoding=settings.CSV_ENCODING) as f:
+                f.write('\n'.join(lines))
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(base, name)) for base, _, names in os.walk(path) for name in names)
+
+
+def sum_csv_column(directory: str, column: str, start_period: str, end_period: str) -> float:
+    # El CSV escribe los valores sin dato como 0.0, que no alteran la suma
+    total = 0.0
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), encoding=settings.CSV_ENCODING) as f:
+            reader = csv.reader(f, delimiter=settings.CSV_SEPARATOR)
+            index = next(reader).index(column)
+            for row in reader:
+                if start_period <= row[0] + row[1] <= end_period:
+                    total += float(row[index])
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=5, help="Estaciones por tipo")
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--end-year", type=int, default=2024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "csv"))
+        print(f"🏗️  Generando {args.stations * 2} estaciones, {args.start_year}-{args.end_year}...")
+        build_outputs(root, args.stations, args.start_year, args.end_year)
+
+        csv_size = directory_size(os.path.join(root, "csv"))
+        parquet_size = directory_size(os.path.join(root, "parquet"))
+        print(f"\n💾 CSV     {csv_size / 1024:10.1f} KB")
+        print(f"💾 Parquet {parquet_size / 1024:10.1f} KB ({csv_size / parquet_size:.1f}x más pequeño)")
+
+        start_period, end_period = f"{args.end_year - 1}01", f"{args.end_year}12"
+        print(f"\n📊 Precipitación {start_period}-{end_period}, todas las estaciones")
+
+        start = time.perf_counter()
+        csv_total = sum_csv_column(os.path.join(root, "csv"), "Precipitación (mm)", start_period, end_period)
+        csv_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        table = read_observations(os.path.join(root, "parquet"), start_period=start_period,
+                                  end_period=end_period, columns=["precipitation"])
+        parquet_total = pc.sum(table.column("precipitation")).as_py()
+        parquet_time = time.perf_counter() - start
+
+        if abs(csv_total - parquet_total) > 1e-3 * max(abs(csv_total), 1):
+            raise AssertionError(f"Lecturas distintas: CSV {csv_total:.1f}, Parquet {parquet_total:.1f}")
+        print(f"   CSV      {csv_time * 1000:8.1f} ms (suma {csv_total:.1f})")
+        print(f"   Parquet  {parquet_time * 1000:8.1f} ms ({table.num_rows} filas leídas)")
+        print(f"   Aceleración: {csv_time / parquet_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Mide el almacén SQLite de observaciones: carga por meses (upsert en una transacción por mes)
+y latencia de consultas por estación y rango de fechas sobre años de datos horarios.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_sqlite_store
+    python -m benchmarks.bench_sqlite_store --stations 20 --start-year 2005 --end-year 2024
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+from benchmarks.generators import make_daily_table, make_hourly_table, month_periods
+from src.columnar import decode_table_html
+from src.models.data_schema import METEOROLOGICAL_AUTOMATIC_HEADERS, METEOROLOGICAL_CONVENTIONAL_HEADERS
+from src.writers import ObservationStore
+
+STATION_KINDS = (
+    ("CONV", METEOROLOGICAL_CONVENTIONAL_HEADERS, make_daily_table, 2),
+    ("AUTO", METEOROLOGICAL_AUTOMATIC_HEADERS, make_hourly_table, 1),
+)
+
+REPEATS = 20
+
+
+def load_store(store: ObservationStore, stations: int, start_year: int, end_year: int) -> int:
+    # Se decodifica un año de tablas por tipo y se reutiliza en todos los años: se mide la carga, no el parser
+    rows = 0
+    for kind, headers, make_table, start_line in STATION_KINDS:
+        tables = {month: decode_table_html(make_table(2024, month, seed=month), headers, start_line)
+                  for month in range(1, 13)}
+        for number in range(stations):
+            for period in month_periods(start_year, end_year):
+                table = tables[int(period[4:])]
+                table.columns["year"][:] = int(period[:4])
+                rows += store.upsert(f"{kind}{number:03d}", table)
+    return rows
+
+
+def measure(store: ObservationStore, station: str, start: str, end: str, columns) -> tuple:
+    times = []
+    for _ in range(REPEATS):
+        begin = time.perf_counter()
+        result = store.query(station, start, end, columns)
+        times.append(time.perf_counter() - begin)
+    return statistics.median(times), len(result["time"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", type=int, default=5, help="Estaciones por tipo")
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--end-year", type=int, default=2024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "observations.sqlite")
+        with ObservationStore(path) as store:
+            print(f"🏗️  Cargando {args.stations * 2} estaciones, {args.start_year}-{args.end_year}...")
+            start = time.perf_counter()
+            rows = load_store(store, args.stations, args.start_year, args.end_year)
+            elapsed = time.perf_counter() - start
+            print(f"{'Carga':<28} {rows:>9} filas  {elapsed:6.2f} s  ({rows / elapsed:,.0f} filas/s)")
+
+            start = time.perf_counter()
+            load_store(store, 1, args.start_year, args.start_year)
+            print(f"{'Recarga de un año (upsert)':<28} {time.perf_counter() - start:16.3f} s")
+            print(f"💾 {os.path.getsize(path) / 1024 ** 2:.1f} MB\n")
+
+            last = str(args.end_year)
+            cases = (
+                ("AUTO, un mes, 1 campo", "AUTO000", f"{last}-06", f"{last}-06", ["temperature"]),
+                ("AUTO, un año, 1 campo", "AUTO000", last, last, ["temperature"]),
+                ("AUTO, todo, 1 campo", "AUTO000", None, None, ["precipitation"]),
+                ("AUTO, todo, todos los campos", "AUTO000", None, None, None),
+                ("CONV, todo, todos los campos", "CONV000", None, None, None),
+            )
+            for label, station, begin, end, columns in cases:
+                median, count = measure(store, station, begin, end, columns)
+                print(f"{label:<28} {count:>9} filas  {median * 1000:8.2f} ms")
+
+            result = store.query("AUTO000", last, last, ["temperature"])
+            assert np.all(np.diff(result["time"].astype(np.int64)) > 0), "Filas duplicadas o desordenadas"
+
+
+if __name__ == "__main__":
+    main()
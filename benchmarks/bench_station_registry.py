@@ -0,0 +1,79 @@
+"""
+Compara la búsqueda lineal de estaciones con los índices de `StationRegistry`.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_station_registry
+"""
+
+import argparse
+import timeit
+import settings
+from src.models import StationStatus, StationType
+from src.station_registry import StationRegistry
+from src.station_service import load_stations
+
+
+def linear_find(stations, code):
+    """Búsqueda original: recorrido completo de la lista"""
+    for station in stations:
+        if station.code == code:
+            return station
+    return None
+
+
+def linear_filter(stations, station_type, status):
+    return [s for s in stations if s.station_type == station_type and s.status == status]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    stations = load_stations(settings.STATIONS_FILE)
+    registry = StationRegistry(stations)
+    codes = [station.code for station in stations]
+
+    build = min(timeit.repeat(lambda: StationRegistry(stations), number=1, repeat=args.repeat))
+    print(f"🏗️  Construcción del registro ({len(stations)} estaciones): {build * 1000:.2f} ms")
+
+    cases = (
+        (f"Búsqueda de los {len(codes)} códigos",
+         lambda: [linear_find(stations, code) for code in codes],
+         lambda: [registry.get(code) for code in codes]),
+        ("Filtro automáticas hidrológicas",
+         lambda: linear_filter(stations, StationType.HYDROLOGICAL.value, StationStatus.AUTOMATIC.value),
+         lambda: registry.filter(station_type=StationType.HYDROLOGICAL, status=StationStatus.AUTOMATIC)),
+    )
+
+    for title, linear, indexed in cases:
+        if linear() != indexed():
+            raise AssertionError(f"Resultados distintos en: {title}")
+        linear_time = min(timeit.repeat(linear, number=10, repeat=args.repeat)) / 10
+        indexed_time = min(timeit.repeat(indexed, number=10, repeat=args.repeat)) / 10
+        print(f"\n📊 {title}")
+        print(f"   Lineal     {linear_time * 1000:8.3f} ms")
+        print(f"   Indexado   {indexed_time * 1000:8.3f} ms")
+        print(f"   Aceleración: {linear_time / indexed_time:.0f}x")
+
+    prefix = min(timeit.repeat(lambda: registry.find_by_prefix("SAN"), number=100, repeat=args.repeat)) / 100
+    similar = min(timeit.repeat(lambda: registry.find_similar("CHACHAPOYAS"), number=10, repeat=args.repeat)) / 10
+    print(f"\n🔎 Prefijo 'SAN': {prefix * 1e6:.1f} µs | Similitud: {similar * 1000:.2f} ms")
+
+    # Consultas espaciales alrededor de Cajamarca
+    spatial = registry.spatial
+    lat, lon = -7.16, -78.51
+    spatial_cases = (
+        ("5 más cercanas", lambda: spatial.nearest(lat, lon, 5)),
+        ("Radio 50 km", lambda: spatial.within_radius(lat, lon, 50)),
+        ("Radio 50 km automáticas", lambda: spatial.within_radius(lat, lon, 50, status=StationStatus.AUTOMATIC)),
+        ("Rectángulo 2°x2°", lambda: spatial.within_bbox(lat - 1, lon - 1, lat + 1, lon + 1)),
+    )
+    print("\n🗺️  Consultas espaciales")
+    for title, query in spatial_cases:
+        elapsed = min(timeit.repeat(query, number=100, repeat=args.repeat)) / 100
+        print(f"   {title:<26} {elapsed * 1000:6.3f} ms ({len(query())} estaciones)")
+
+
+if __name__ == "__main__":
+    main()
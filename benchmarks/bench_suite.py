@@ -0,0 +1,197 @@
+"""
+Micro-benchmarks de las rutas críticas de parsing y de estaciones, con línea base.
+
+Mide el tiempo por llamada (mejor de varias repeticiones) y la memoria máxima
+asignada por llamada (tracemalloc) de cada caso. Con `--save` guarda los
+resultados como línea base; con `--check` los compara con ella y termina con
+código 1 si algún caso es más lento o asigna más memoria que el umbral permitido.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_suite                  # Solo medir
+    python -m benchmarks.bench_suite --save           # Guardar la línea base
+    python -m benchmarks.bench_suite --check          # Comparar y fallar ante regresiones
+    python -m benchmarks.bench_suite --check --filter html_table_to_csv --time-threshold 0.15
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import settings
+from benchmarks.generators import make_daily_table, make_hourly_table, make_select_html
+from src.html_utils import (CELL_TERMINATOR, ROW_SEPARATOR, _date_format, extract_select_options, extract_table_rows,
+                             html_table_to_csv, split_table_rows, table_rows_to_csv)
+from src.query_handler import QueryModeHandler
+from src.station_registry import StationRegistry
+from src.station_service import load_stations, load_stations_cached
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines.json")
+TIME_THRESHOLD = 0.25    # Tolerancia de tiempo: 25 % más lento
+ALLOC_THRESHOLD = 0.10   # Tolerancia de memoria: 10 % más
+ALLOC_MIN_BYTES = 1024   # Diferencias de memoria menores se consideran ruido
+
+
+def _cases() -> List[Tuple[str, Callable[[], object]]]:
+    """Casos del benchmark; la preparación de datos queda fuera de la medición"""
+    daily = make_daily_table(seed=1)
+    hourly = make_hourly_table(seed=1)
+    # Texto que retorna la extracción de filas en la página (TABLE_EXTRACTION = "js")
+    hourly_payload = ROW_SEPARATOR.join("".join(cell + CELL_TERMINATOR for cell in row)
+                                        for row in extract_table_rows(hourly))
+    select_html = make_select_html(2000, 2025)
+    dates = [f"{2000 + i % 26:04d}{'-/'[i % 2]}{1 + i % 12:02d}{'-/'[i % 2]}{1 + i % 28:02d}" for i in range(1000)]
+
+    stations = load_stations(settings.STATIONS_FILE)
+    registry = StationRegistry(stations)
+    codes = [station.code for station in stations]
+
+    handler = QueryModeHandler()
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.load_options(select_html)
+
+    return [
+        ("html_table_to_csv/daily_31", lambda: html_table_to_csv(daily, start_line=2)),
+        ("html_table_to_csv/hourly_744", lambda: html_table_to_csv(hourly, start_line=1)),
+        ("table_rows_to_csv/hourly_744_js", lambda: table_rows_to_csv(split_table_rows(hourly_payload), start_line=1)),
+        ("extract_select_options/312", lambda: extract_select_options(select_html)),
+        ("date_format/1000", lambda: [_date_format(date) for date in dates]),
+        ("load_stations/json", lambda: load_stations(settings.STATIONS_FILE)),
+        ("load_stations/snapshot", lambda: load_stations_cached()),
+        (f"find_station_by_code/{len(codes)}", lambda: [registry.get(code) for code in codes]),
+        ("filter_by_month", lambda: handler.filter_by_month(2015, 6)),
+        ("filter_by_year", lambda: handler.filter_by_year(2015)),
+        ("filter_by_period", lambda: handler.filter_by_period(2005, 2020)),
+    ]
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Tiempo por llamada (mejor repetición) y memoria máxima asignada por llamada"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    # Lotes cortos (~20 ms): el mínimo entre repeticiones es más estable que el de lotes largos
+    number = max(1, int(0.02 * number / elapsed))
+    gc.collect()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    func()  # Calentamiento: cachés internas (regex, imports) fuera de la medición de memoria
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": seconds, "ops_per_s": 1 / seconds, "peak_alloc_bytes": peak}
+
+
+def run_suite(repeat: int, name_filter: str = "", names: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, func in _cases():
+        if name_filter and name_filter not in name or names is not None and name not in names:
+            continue
+        # filter_by_* imprime en consola: la salida se descarta para no medirla
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = measure(func, repeat)
+        result = results[name]
+        print(f"   {name:<32} {result['seconds'] * 1e6:12.1f} µs {result['ops_per_s']:12.1f} op/s "
+              f"{result['peak_alloc_bytes'] / 1024:10.1f} KB")
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "processor": platform.processor() or platform.machine()}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            time_threshold: float, alloc_threshold: float) -> List[str]:
+    """
+    Compara los resultados con la línea base y retorna la descripción de cada regresión
+    """
+    regressions = []
+    print(f"\n   {'Caso':<32} {'Tiempo':>10} {'Memoria':>10}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"   {name:<32} {'(nuevo)':>10}")
+            continue
+
+        time_ratio = result["seconds"] / reference["seconds"]
+        alloc_diff = result["peak_alloc_bytes"] - reference["peak_alloc_bytes"]
+        alloc_ratio = result["peak_alloc_bytes"] / max(reference["peak_alloc_bytes"], 1)
+        print(f"   {name:<32} {time_ratio:9.2f}x {alloc_ratio:9.2f}x")
+
+        if time_ratio > 1 + time_threshold:
+            regressions.append(f"{name}: {time_ratio:.2f}x más lento (límite {1 + time_threshold:.2f}x)")
+        if alloc_ratio > 1 + alloc_threshold and alloc_diff > ALLOC_MIN_BYTES:
+            regressions.append(f"{name}: {alloc_ratio:.2f}x más memoria (límite {1 + alloc_threshold:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30, help="Repeticiones por caso")
+    parser.add_argument("--filter", default="", help="Ejecutar solo los casos que contienen este texto")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Archivo de línea base")
+    parser.add_argument("--save", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--check", action="store_true", help="Comparar con la línea base y fallar ante regresiones")
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--alloc-threshold", type=float, default=ALLOC_THRESHOLD)
+    parser.add_argument("--retries", type=int, default=2, help="Nuevas mediciones de los casos con regresión")
+    args = parser.parse_args()
+
+    print(f"⏱️  Micro-benchmarks ({args.repeat} repeticiones)")
+    results = run_suite(args.repeat, args.filter)
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"{settings.ERROR} No existe la línea base {args.baseline}; ejecuta con --save")
+            sys.exit(2)
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print(f"{settings.WARNING} La línea base se generó en otro entorno: {baseline.get('environment')}")
+
+        regressions = compare(results, baseline["results"], args.time_threshold, args.alloc_threshold)
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            # Una máquina ocupada produce falsos positivos: se vuelven a medir los casos con regresión
+            regressed = [name for name in results if any(r.startswith(f"{name}:") for r in regressions)]
+            print(f"\n{settings.WARNING} Repitiendo la medición de {len(regressed)} casos")
+            for name, result in run_suite(args.repeat, names=regressed).items():
+                result["seconds"] = min(result["seconds"], results[name]["seconds"])
+                result["ops_per_s"] = 1 / result["seconds"]
+                results[name] = result
+            regressions = compare({name: results[name] for name in regressed}, baseline["results"],
+                                  args.time_threshold, args.alloc_threshold)
+        if regressions:
+            print(f"\n{settings.ERROR} {len(regressions)} regresiones:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n{settings.SUCCESS} Sin regresiones respecto a la línea base")
+
+    if args.save:
+        saved = {}
+        if args.filter and os.path.exists(args.baseline):
+            # Con filtro solo se actualizan los casos ejecutados
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                saved = json.load(f).get("results", {})
+        saved.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({"created_at": datetime.now().isoformat(timespec="seconds"), "environment": environment(),
+                       "results": saved}, f, indent=2)
+        print(f"\n{settings.SUCCESS} Línea base guardada en {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compara el tokenizador de `html_table_to_csv` con la implementación de referencia
+basada en BeautifulSoup: verifica que ambas produzcan el mismo CSV y mide su rendimiento.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_table_parser
+"""
+
+import argparse
+import timeit
+from benchmarks.generators import make_daily_table, make_hourly_table
+from src.html_utils import html_table_to_csv, html_table_to_csv_soup
+
+
+def check_equivalence(samples: int = 50) -> None:
+    """Verifica que ambas implementaciones generen exactamente el mismo CSV"""
+    for seed in range(samples):
+        for html, start_line in ((make_daily_table(seed=seed, missing_ratio=0.2), 2),
+                                 (make_hourly_table(seed=seed, missing_ratio=0.2), 1)):
+            expected = html_table_to_csv_soup(html, start_line=start_line)
+            actual = html_table_to_csv(html, start_line=start_line)
+            if expected != actual:
+                raise AssertionError(f"Salida distinta para la semilla {seed}")
+    print(f"✅ Salidas idénticas en {samples * 2} tablas")
+
+
+def bench(html: str, start_line: int, repeat: int) -> None:
+    results = {}
+    for label, func in (("BeautifulSoup", html_table_to_csv_soup), ("Tokenizador", html_table_to_csv)):
+        best = min(timeit.repeat(lambda: func(html, start_line=start_line), number=1, repeat=repeat))
+        results[label] = best
+        print(f"   {label:<14} {best * 1000:8.2f} ms")
+    print(f"   Aceleración: {results['BeautifulSoup'] / results['Tokenizador']:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    check_equivalence()
+
+    print("\n📊 Tabla diaria (31 filas)")
+    bench(make_daily_table(month=1), 2, args.repeat)
+    print("\n📊 Tabla horaria (744 filas)")
+    bench(make_hourly_table(month=1), 1, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Servidor local que imita la página de estaciones del SENAMHI (map_red_graf.php).
+
+Reproduce lo que usa el scraper: la pestaña `a#tabla-tab`, el `select#CBOFiltro`
+con los periodos YYYYMM y el `iframe#contenedor`, cuyo contenido se recarga con
+la tabla `table#dataTable` del periodo elegido. Las estaciones AUTOMATICA reciben
+tablas horarias y el resto tablas diarias. Como el sitio real, la página también
+carga recursos que el scraper no usa (teselas del mapa, imágenes y una fuente).
+Permite simular latencia y errores para medir el scraper sin acceder al sitio real.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.fixture_server --port 8765 --latency 0.2 --error-rate 0.05
+"""
+
+import argparse
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Sequence
+from urllib.parse import parse_qs, urlencode, urlparse
+from benchmarks.generators import make_daily_table, make_hourly_table, make_select_html
+
+PAGE_PATH = "/mapas/mapa-estaciones-2/map_red_graf.php"
+TABLE_PATH = "/mapas/mapa-estaciones-2/_dato_esta_tipo02.php"
+ASSET_PATH = "/assets/"
+
+# Recursos que carga la página y que el scraper no necesita: (nombre, tipo MIME, tamaño en bytes)
+PAGE_ASSETS = [(f"tile-{index}.png", "image/png", 40 * 1024) for index in range(12)] + [
+    ("logo.jpg", "image/jpeg", 120 * 1024),
+    ("roboto.woff2", "font/woff2", 60 * 1024),
+]
+
+# Errores que se pueden inyectar en las respuestas del iframe
+ERROR_KINDS = (
+    "500",    # Error del servidor
+    "empty",  # Página sin tabla
+    "stale",  # Tabla del mes anterior al solicitado
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Estación {code}</title>
+<style>@font-face {{ font-family: Roboto; src: url("{asset_path}roboto.woff2"); }} body {{ font-family: Roboto; }}</style></head>
+<body>
+<div id="mapa">{assets}</div>
+<ul class="nav nav-tabs">
+  <li><a id="grafico-tab" href="#grafico">Gráfico</a></li>
+  <li><a id="tabla-tab" href="#tabla" onclick="mostrarTabla(); return false;">Tabla</a></li>
+</ul>
+<div id="tabla" style="display: none">
+  {select}
+  <iframe id="contenedor" name="contenedor" width="100%" height="600"></iframe>
+</div>
+<script>
+  const base = "{table_url}";
+  function cargarPeriodo(periodo) {{
+    document.getElementById("contenedor").src = base + "&CBOFiltro=" + periodo;
+  }}
+  function mostrarTabla() {{
+    document.getElementById("tabla").style.display = "block";
+    if (!document.getElementById("contenedor").getAttribute("src")) cargarPeriodo("{latest}");
+  }}
+  document.getElementById("CBOFiltro").addEventListener("change", (e) => cargarPeriodo(e.target.value));
+</script>
+</body></html>"""
+
+TABLE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"></head>
+<body><div class="table-responsive">{table}</div></body></html>"""
+
+
+def _previous_period(period: str) -> str:
+    year, month = int(period[:4]), int(period[4:6])
+    return f"{year - 1:04d}12" if month == 1 else f"{year:04d}{month - 1:02d}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SenamhiFixture/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body, content_type: str = "text/html; charset=utf-8") -> None:
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        fixture: FixtureServer = self.server.fixture
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+
+        if parsed.path == PAGE_PATH:
+            fixture.sleep(fixture.page_latency)
+            self._send(200, fixture.render_page(params))
+        elif parsed.path == TABLE_PATH:
+            fixture.sleep(fixture.latency)
+            self._send(*fixture.render_table(params))
+        elif parsed.path.startswith(ASSET_PATH):
+            fixture.sleep(fixture.asset_latency)
+            self._send(*fixture.render_asset(parsed.path[len(ASSET_PATH):]))
+        else:
+            self._send(404, "<html><body>No encontrado</body></html>")
+
+
+class FixtureServer:
+    """
+    Servidor HTTP en un hilo de fondo con la estructura de la página de estaciones
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, start_year: int = 2020, end_year: int = 2024,
+                 latency: float = 0.0, jitter: float = 0.0, page_latency: float = 0.0, asset_latency: float = 0.0,
+                 error_rate: float = 0.0, error_kinds: Sequence[str] = ERROR_KINDS,
+                 missing_ratio: float = 0.05, seed: Optional[int] = 0):
+        self.host = host
+        self.port = port
+        self.start_year = start_year
+        self.end_year = end_year
+        self.latency = latency
+        self.jitter = jitter
+        self.page_latency = page_latency
+        self.asset_latency = asset_latency
+        self.error_rate = error_rate
+        self.error_kinds = tuple(error_kinds)
+        self.missing_ratio = missing_ratio
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL equivalente a settings.BASE_URL"""
+        return f"http://{self.host}:{self.port}{PAGE_PATH}"
+
+    def sleep(self, seconds: float) -> None:
+        if seconds or self.jitter:
+            with self._lock:
+                extra = self._rng.uniform(0, self.jitter)
+            time.sleep(seconds + extra)
+
+    def _pick_error(self) -> Optional[str]:
+        with self._lock:
+            if self.error_kinds and self._rng.random() < self.error_rate:
+                return self._rng.choice(self.error_kinds)
+        return None
+
+    def render_page(self, params: dict) -> str:
+        with self._lock:
+            self.stats["pages"] += 1
+        code = params.get("cod", "")
+        table_url = f"{TABLE_PATH}?{urlencode({'estaciones': code, 'estado': params.get('estado', ''), 'tipo_esta': params.get('tipo_esta', '')})}"
+        assets = "".join(f'<img src="{ASSET_PATH}{name}">' for name, content_type, _ in PAGE_ASSETS
+                         if content_type.startswith("image/"))
+        return PAGE_TEMPLATE.format(
+            code=code,
+            asset_path=ASSET_PATH,
+            assets=assets,
+            select=make_select_html(self.start_year, self.end_year),
+            table_url=table_url,
+            latest=f"{self.end_year:04d}12",
+        )
+
+    def render_asset(self, name: str) -> tuple:
+        for asset_name, content_type, size in PAGE_ASSETS:
+            if asset_name == name:
+                with self._lock:
+                    self.stats["assets"] += 1
+                    self.stats["asset_bytes"] += size
+                return 200, bytes(size), content_type
+        return 404, "<html><body>No encontrado</body></html>"
+
+    def make_table(self, code: str, status: str, period: str) -> str:
+        """Tabla determinista de una estación y periodo"""
+        seed = zlib.crc32(f"{code}{period}".encode())
+        make_table = make_hourly_table if status == "AUTOMATICA" else make_daily_table
+        return make_table(int(period[:4]), int(period[4:6]), missing_ratio=self.missing_ratio, seed=seed)
+
+    def render_table(self, params: dict) -> tuple:
+        period = params.get("CBOFiltro", "")
+        code, status = params.get("estaciones", ""), params.get("estado", "")
+
+        error = self._pick_error()
+        with self._lock:
+            self.stats["tables"] += 1
+            if error:
+                self.stats[f"error_{error}"] += 1
+
+        if error == "500":
+            return 500, "<html><body>Error interno</body></html>"
+        if error == "empty":
+            return 200, "<html><body><p>Sin datos</p></body></html>"
+        if error == "stale":
+            period = _previous_period(period)
+        if len(period) != 6 or not period.isdigit():
+            return 200, TABLE_TEMPLATE.format(table='<table id="dataTable" class="table"></table>')
+        return 200, TABLE_TEMPLATE.format(table=self.make_table(code, status, period))
+
+    def start(self) -> "FixtureServer":
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fixture = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--start-year", type=int, default=2020)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia de cada tabla (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latencia adicional aleatoria máxima (segundos)")
+    parser.add_argument("--asset-latency", type=float, default=0.0, help="Latencia de cada imagen o fuente (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de tablas con error")
+    parser.add_argument("--error-kinds", nargs="+", default=list(ERROR_KINDS), choices=ERROR_KINDS)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.host, args.port, args.start_year, args.end_year, latency=args.latency,
+                           jitter=args.jitter, asset_latency=args.asset_latency, error_rate=args.error_rate, error_kinds=args.error_kinds)
+    with server:
+        print(f"🌐 Servidor de prueba en {server.base_url}")
+        print(f"   Ejemplo: {server.base_url}?cod=472D30C8&estado=AUTOMATICA&tipo_esta=M&cate=EMA&cod_old=")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(f"\n📊 {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Generadores de datos sintéticos con la forma de las tablas del SENAMHI.
+"""
+
+import calendar
+import random
+from typing import List, Optional
+
+CONVENTIONAL_HEADER = (
+    '<tr><th rowspan="2">AÑO / MES / DÍA</th><th colspan="2">TEMPERATURA (°C)</th>'
+    '<th rowspan="2">HUMEDAD RELATIVA (%)</th><th rowspan="2">PRECIPITACIÓN (mm/día)</th></tr>'
+    '<tr><th>MAX</th><th>MIN</th></tr>'
+)
+
+AUTOMATIC_HEADER = (
+    '<tr><th>AÑO / MES / DÍA</th><th>HORA</th><th>TEMPERATURA (°C)</th><th>PRECIPITACIÓN (mm/hora)</th>'
+    '<th>HUMEDAD (%)</th><th>DIRECCION DEL VIENTO (°)</th><th>VELOCIDAD DEL VIENTO (m/s)</th></tr>'
+)
+
+
+def _value(rng: random.Random, low: float, high: float, missing_ratio: float) -> str:
+    if rng.random() < missing_ratio:
+        return "S/D"
+    return f"{rng.uniform(low, high):.1f}"
+
+
+def _cell(rng: random.Random, value: str) -> str:
+    # Variantes de marcado presentes en el HTML serializado por el navegador
+    variant = rng.random()
+    if variant < 0.1:
+        return f'<td>\n    {value}&nbsp;</td>'
+    if variant < 0.2:
+        return f'<td class="dato"><span>{value}</span></td>'
+    return f'<td>{value}</td>'
+
+
+def make_daily_table(year: int = 2024, month: int = 1, missing_ratio: float = 0.05,
+                     seed: Optional[int] = 0) -> str:
+    """Tabla mensual de una estación convencional (una fila por día, dos filas de encabezado)"""
+    rng = random.Random(seed)
+    rows = [CONVENTIONAL_HEADER]
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        cells = [
+            f"{year:04d}-{month:02d}-{day:02d}",
+            _value(rng, 15, 30, missing_ratio),
+            _value(rng, 0, 15, missing_ratio),
+            _value(rng, 40, 100, missing_ratio),
+            _value(rng, 0, 40, missing_ratio),
+        ]
+        rows.append('<tr>' + ''.join(_cell(rng, cell) for cell in cells) + '</tr>')
+    return '<table id="dataTable" class="table">' + ''.join(rows) + '</table>'
+
+
+def make_hourly_table(year: int = 2024, month: int = 1, missing_ratio: float = 0.05,
+                      seed: Optional[int] = 0) -> str:
+    """Tabla mensual de una estación automática (una fila por hora, una fila de encabezado)"""
+    rng = random.Random(seed)
+    rows = [AUTOMATIC_HEADER]
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        for hour in range(24):
+            cells = [
+                f"{year:04d}/{month:02d}/{day:02d}",
+                f"{hour:02d}:00",
+                _value(rng, 5, 25, missing_ratio),
+                _value(rng, 0, 5, missing_ratio),
+                _value(rng, 40, 100, missing_ratio),
+                str(rng.randint(0, 359)),
+                _value(rng, 0, 10, missing_ratio),
+            ]
+            rows.append('<tr>' + ''.join(_cell(rng, cell) for cell in cells) + '</tr>')
+    return '<table id="dataTable" class="table">' + ''.join(rows) + '</table>'
+
+
+def make_select_html(start_year: int = 2000, end_year: int = 2025) -> str:
+    """Select CBOFiltro con una opción por mes en formato YYYYMM"""
+    options = ['<option value="">Seleccione</option>']
+    for year in range(end_year, start_year - 1, -1):
+        for month in range(12, 0, -1):
+            options.append(f'<option value="{year:04d}{month:02d}">{year:04d}-{month:02d}</option>')
+    return '<select id="CBOFiltro" name="CBOFiltro">' + ''.join(options) + '</select>'
+
+
+def month_periods(start_year: int, end_year: int) -> List[str]:
+    """Lista de periodos YYYYMM en orden cronológico"""
+    return [f"{year:04d}{month:02d}" for year in range(start_year, end_year + 1) for month in range(1, 13)]
@@ -1,9 +1,26 @@
 import asyncio
-import zendriver as zd
-from settings import SUCCESS, ERROR, PROCESSING, TIMEOUT_SECONDS, POLL_INTERVAL
-from src.query_handler import QueryModeHandler, CSVManager, get_user_query_mode, get_station_code
-from src.exceptions import IframeNotFoundError, TableNotFoundError, SelectNotFoundError
-from src.station_service import create_station_url, get_headers_for_station
+import contextvars
+import functools
+import os
+import time
+from collections import Counter
+from settings import (SUCCESS, ERROR, PROCESSING, WARNING, TIMEOUT_SECONDS, POLL_INTERVAL, CONCURRENT_TABS, REORDER_WINDOW,
+                      TABLE_POLL_INTERVAL, TABLE_REFRESH_TIMEOUT, FETCH_MODE, HTTP_CONCURRENCY, INCREMENTAL_SYNC,
+                      HTML_CACHE_ENABLED, PARQUET_OUTPUT, SQLITE_STORE, EXPORT_FORMATS, BASE_URL, CSV_DIR,
+                      BROWSER_VERIFICATION_PAUSE, TABLE_EXTRACTION)
+from src.concurrency import ReorderBuffer
+from src.query_handler import QueryModeHandler, CSVManager, get_user_query_mode, get_station_code, get_export_filename
+from src.models import OutputFormat, ScrapingResult
+from src.exceptions import IframeNotFoundError, TableNotFoundError, SelectNotFoundError, ClearanceExpiredError
+from src.html_utils import rows_period, split_table_rows, table_period
+from src.http_fetcher import HttpTableFetcher
+from src.sync_manifest import plan_incremental_sync
+from src.station_service import create_station_url, get_headers_for_station, get_table_start_line
+from src.html_cache import HtmlCache
+from src.browser_pool import BrowserPool
+from src.request_blocking import get_blocker, open_tab
+from src.metrics import recorder
+from src.retry import CircuitBreaker, RetryPolicy
 
 async def wait_for_in_node(node, selector, poll_interval=POLL_INTERVAL):
     """Espera a que un elemento aparezca dentro de un nodo específico"""
@@ -21,24 +38,106 @@ async def wait_for_in_node(node, selector, poll_interval=POLL_INTERVAL):
         print(f"Timeout waiting for selector: {selector}")
         return None
 
-async def setup_page_and_iframe(browser, url: str):
+# Retorna "YYYYMM|filas" a partir de la primera celda con fecha de la tabla
+TABLE_STATE_JS = """(table) => {
+    for (const row of table.rows) {
+        const text = row.cells.length ? row.cells[0].textContent.trim() : '';
+        if (/^\\d{4}([-\\/])\\d{2}\\1\\d{2}$/.test(text)) {
+            return text.slice(0, 4) + text.slice(5, 7) + '|' + table.rows.length;
+        }
+    }
+    return '|' + table.rows.length;
+}"""
+
+# Texto de las celdas de cada fila, normalizado como extract_table_rows (nodos de texto sin
+# espacios en los extremos, sin el contenido de <script>/<style> y espacios internos colapsados;
+# table.rows y row.cells no incluyen las filas de tablas anidadas). Las filas se separan con U+001E
+# y cada celda termina en U+001F (ver split_table_rows).
+TABLE_ROWS_JS = """(table) => {
+    const doc = table.ownerDocument;
+    const rows = [];
+    for (const row of table.rows) {
+        let line = '';
+        for (const cell of row.cells) {
+            const walker = doc.createTreeWalker(cell, NodeFilter.SHOW_TEXT);
+            let text = '';
+            while (walker.nextNode()) {
+                const parent = walker.currentNode.parentNode.nodeName;
+                if (parent !== 'SCRIPT' && parent !== 'STYLE') {
+                    text += walker.currentNode.data.trim();
+                }
+            }
+            line += text.replace(/\\s+/g, ' ') + '\\u001f';
+        }
+        rows.push(line);
+    }
+    return rows.join('\\u001e');
+}"""
+
+async def get_table_state(iframe_with_table):
+    """
+    Obtiene la tabla actual del iframe junto con su estado (periodo mostrado y número de filas).
+    Retorna (None, None) si la tabla no está disponible, por ejemplo mientras el iframe se recarga.
+    """
+    try:
+        table = await iframe_with_table.query_selector("table#dataTable")
+        if not table:
+            return None, None
+        state = await table.apply(TABLE_STATE_JS)
+        return table, state if isinstance(state, str) else None
+    except Exception:
+        return None, None
+
+async def wait_for_table_refresh(iframe_with_table, option_value: str, previous_table=None, previous_state=None,
+                                 timeout=TABLE_REFRESH_TIMEOUT, poll_interval=TABLE_POLL_INTERVAL):
+    """
+    Espera a que la tabla del iframe corresponda al periodo seleccionado.
+
+    La tabla se considera actualizada cuando su primera fecha pertenece al periodo
+    YYYYMM seleccionado, o cuando el nodo fue reemplazado por una tabla sin fechas
+    (mes sin datos). Retorna el elemento de la tabla, o None si se agota el tiempo
+    sin que la tabla cambie, evitando guardar datos del mes anterior.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    previous_node_id = previous_table.backend_node_id if previous_table else None
+
+    while True:
+        table, state = await get_table_state(iframe_with_table)
+        if table and state is not None:
+            period = state.split('|', 1)[0]
+            replaced = table.backend_node_id != previous_node_id or state != previous_state
+            if period == option_value or (replaced and not period):
+                return table
+
+        if loop.time() >= deadline:
+            return None
+        await asyncio.sleep(poll_interval)
+
+async def setup_page_and_iframe(browser, url: str, new_tab: bool = False):
     """Configura la página inicial y obtiene el iframe"""
-    page = await browser.get(url)
+    with recorder.span("page_load"):
+        # La intercepción de peticiones se activa antes de navegar
+        tab = await open_tab(browser, new_tab=new_tab)
+        page = await tab.get(url)
 
     # Hacer clic en la pestaña de tabla
-    tab = await page.wait_for(selector='a#tabla-tab')
-    await tab.click()
+    with recorder.span("tab_click"):
+        tab = await page.wait_for(selector='a#tabla-tab')
+        await tab.click()
 
     # Esperar al iframe que contiene la tabla
-    iframe_with_table = await page.wait_for(selector='iframe#contenedor')
+    with recorder.span("iframe_wait"):
+        iframe_with_table = await page.wait_for(selector='iframe#contenedor')
     if not iframe_with_table:
         raise IframeNotFoundError(f"{ERROR} Iframe contenedor no encontrado")
     
     print(f"{SUCCESS} Iframe contenedor encontrado")
     
     # Esperar a que la tabla inicial esté disponible
-    async with asyncio.timeout(TIMEOUT_SECONDS):
-        table_found = await wait_for_in_node(iframe_with_table, "table#dataTable")
+    with recorder.span("table_wait"):
+        async with asyncio.timeout(TIMEOUT_SECONDS):
+            table_found = await wait_for_in_node(iframe_with_table, "table#dataTable")
     
     if not table_found:
         raise TableNotFoundError(f"{ERROR} Tabla inicial no encontrada en iframe")
@@ -54,44 +153,542 @@ async def get_select_options(page):
     select_html = await select_found.get_html()
     return select_html
 
-async def process_option(page, iframe_with_table, option, csv_manager, save_individual=True):
-    """Procesa una opción específica del select"""
-    print(f"\n{PROCESSING} Procesando opción: {option['text']} ({option['value']})")
-    
-    # Seleccionar la opción
-    option_select = await page.query_selector(f"option[value='{option['value']}']")
-    if not option_select:
-        print(f"{ERROR} No se pudo encontrar la opción: {option['value']}")
-        return False
-    
-    await option_select.select_option()
-    print(f"{SUCCESS} Opción seleccionada exitosamente")
+# Con la caché HTML activa se lee el HTML completo aunque TABLE_EXTRACTION sea "js": rebuild.py
+# debe volver a parsear la respuesta original, no una tabla reconstruida a partir de las filas.
+# Lo fija scrape_station; las tareas de sus pestañas heredan el valor
+_read_raw_html: contextvars.ContextVar[bool] = contextvars.ContextVar("read_raw_html", default=False)
+
+async def read_table(table_element):
+    """
+    Lee la tabla del iframe. Con TABLE_EXTRACTION = "js" un script recorre las filas dentro de
+    la página y solo viaja su texto; si el script falla, o si la caché HTML está activa, se lee
+    el HTML completo.
+
+    Returns:
+        Filas de celdas (modo "js") o el HTML de la tabla
+    """
+    if TABLE_EXTRACTION == "js" and not _read_raw_html.get():
+        try:
+            payload = await table_element.apply(TABLE_ROWS_JS)
+            if isinstance(payload, str):
+                return split_table_rows(payload)
+        except Exception as e:
+            print(f"{WARNING} No se pudieron extraer las filas en la página, se usará el HTML: {e}")
+    return await table_element.get_html()
+
+async def fetch_option_table(page, iframe_with_table, option):
+    """
+    Selecciona una opción del select y retorna la tabla actualizada (filas o HTML, ver read_table)
+    """
+    with recorder.span("option_select"):
+        # Seleccionar la opción
+        option_select = await page.query_selector(f"option[value='{option['value']}']")
+        if not option_select:
+            print(f"{ERROR} No se pudo encontrar la opción: {option['value']}")
+            return None
 
-    # Esperar actualización de la tabla
-    await asyncio.sleep(2)
+        # Estado de la tabla antes del cambio para detectar su reemplazo
+        previous_table, previous_state = await get_table_state(iframe_with_table)
+
+        await option_select.select_option()
+    print(f"{SUCCESS} Opción seleccionada exitosamente: {option['value']}")
 
     try:
-        # Buscar tabla actualizada
-        updated_table = await wait_for_in_node(iframe_with_table, "table#dataTable")
+        # Esperar a que la tabla del periodo seleccionado reemplace a la anterior
+        with recorder.span("table_wait"):
+            updated_table = await wait_for_table_refresh(iframe_with_table, option['value'], previous_table, previous_state)
         
         if not updated_table:
             print(f"{ERROR} No se pudo encontrar la tabla actualizada para opción: {option['value']}")
-            return False
-        
-        # Obtener HTML de la tabla
-        table_html = await updated_table.get_html()
+            return None
         
-        # Guardar datos
-        if save_individual:
-            csv_manager.save_individual_file(table_html, option['value'])
-        else:
-            csv_manager.add_table_data(table_html, option['value'])
+        # Obtener el contenido de la tabla
+        with recorder.span("table_read"):
+            table = await read_table(updated_table)
+
+        # Verificación final contra datos de otro periodo
+        period = table_period(table) if isinstance(table, str) else rows_period(table)
+        if period is not None and period != option['value']:
+            print(f"{ERROR} La tabla obtenida corresponde a {period} y no a {option['value']}")
+            return None
 
-        return True
+        return table
         
     except Exception as e:
         print(f"{ERROR} Error procesando opción {option['value']}: {e}")
-        return False
+        return None
+
+def save_option_table(csv_manager, table, option, save_individual=True) -> bool:
+    """
+    Guarda la tabla de una opción (HTML o filas) en archivo individual o en el buffer consolidado.
+    Retorna False si el mes no quedó escrito y debe reintentarse; un mes sin filas de datos no
+    se reintenta (queda en csv_manager.empty_periods)
+    """
+    if save_individual:
+        return bool(csv_manager.save_individual_file(table, option['value'])) or option['value'] in csv_manager.empty_periods
+    return csv_manager.add_table_data(table, option['value'])
+
+async def open_extra_tabs(browser, url: str, count: int):
+    """Abre pestañas adicionales con la página e iframe configurados"""
+    results = await asyncio.gather(
+        *(setup_page_and_iframe(browser, url, new_tab=True) for _ in range(count)),
+        return_exceptions=True
+    )
+
+    tabs = []
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"{WARNING} No se pudo abrir una pestaña adicional: {result}")
+        else:
+            tabs.append(result)
+    return tabs
+
+async def process_options_with_workers(options, fetchers, csv_manager, save_individual=True, window=REORDER_WINDOW,
+                                       breaker=None, failed=None):
+    """
+    Reparte las opciones entre varios fetchers mediante una cola compartida.
+
+    Cada fetcher es una función asíncrona que recibe una opción y retorna el HTML de
+    su tabla (o None si falla). Los resultados se entregan al CSVManager en orden
+    cronológico, sin importar qué fetcher termine primero. Ninguna opción empieza a
+    descargarse si está a `window` o más posiciones de la más antigua sin guardar,
+    lo que limita las tablas retenidas en memoria a la espera de su turno.
+
+    Si se indica un CircuitBreaker, cada descarga espera a que el circuito esté
+    cerrado y le informa su resultado. Las opciones cuya descarga falla se añaden,
+    en orden cronológico, a la lista `failed` para reintentarlas después.
+    """
+    queue = asyncio.Queue()
+    for index, option in enumerate(options):
+        queue.put_nowait((index, option))
+
+    reorder = ReorderBuffer()
+    window = max(window, len(fetchers))
+    window_moved = asyncio.Condition()
+    successful_count = 0
+
+    def commit(index, option, table_html):
+        nonlocal successful_count
+        for ready_option, ready_html in reorder.push(index, (option, table_html)):
+            if ready_html is None:
+                if failed is not None:
+                    failed.append(ready_option)
+                continue
+            try:
+                saved = save_option_table(csv_manager, ready_html, ready_option, save_individual)
+            except Exception as e:
+                print(f"{ERROR} Error procesando opción {ready_option['value']}: {e}")
+                saved = False
+            if saved:
+                successful_count += 1
+            elif failed is not None:
+                # Un mes descargado pero no guardado se reintenta como uno que falló
+                failed.append(ready_option)
+
+    async def worker(fetch):
+        while True:
+            try:
+                index, option = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            # La cola entrega los índices en orden, así que la opción más antigua pendiente
+            # siempre está en manos de algún worker y la espera no puede bloquearse
+            async with window_moved:
+                await window_moved.wait_for(lambda: index < reorder.next_index + window)
+
+            print(f"\n{PROCESSING} Procesando opción {index + 1}/{len(options)}: {option['text']} ({option['value']})")
+            table_html = None
+            try:
+                if breaker is not None:
+                    await breaker.wait()
+                if breaker is None or not breaker.exhausted:
+                    with recorder.span("option", option['value']):
+                        table_html = await fetch(option)
+                    if breaker is not None:
+                        breaker.record(table_html is not None)
+            finally:
+                commit(index, option, table_html)
+                async with window_moved:
+                    window_moved.notify_all()
+
+    await asyncio.gather(*(worker(fetch) for fetch in fetchers))
+    return successful_count
+
+async def process_options_concurrently(browser, url: str, page, iframe_with_table, options, csv_manager,
+                                       save_individual=True, tabs=CONCURRENT_TABS, breaker=None, failed=None):
+    """
+    Procesa las opciones repartiéndolas entre varias pestañas del mismo navegador.
+    """
+    extra_tabs = await open_extra_tabs(browser, url, min(tabs, len(options)) - 1)
+    workers_tabs = [(page, iframe_with_table)] + extra_tabs
+    print(f"🗂️  Procesando con {len(workers_tabs)} pestañas en paralelo")
+
+    fetchers = [
+        functools.partial(fetch_option_table, worker_page, worker_iframe)
+        for worker_page, worker_iframe in workers_tabs
+    ]
+
+    try:
+        return await process_options_with_workers(options, fetchers, csv_manager, save_individual,
+                                                  breaker=breaker, failed=failed)
+    finally:
+        for extra_page, _ in extra_tabs:
+            try:
+                await extra_page.close()
+            except Exception:
+                pass
+
+async def process_options_http(browser, page, iframe_with_table, options, csv_manager,
+                               save_individual=True, concurrency=HTTP_CONCURRENCY, breaker=None, failed=None):
+    """
+    Procesa las opciones con peticiones HTTP directas reutilizando la autorización del navegador.
+
+    Si Cloudflare vuelve a exigir el desafío, la opción se obtiene por el navegador,
+    que renueva la autorización, y las cookies actualizadas se reutilizan en HTTP.
+    """
+    fetcher = await HttpTableFetcher.from_browser(browser, page, iframe_with_table)
+    browser_lock = asyncio.Lock()
+
+    async def fetch(option):
+        if not fetcher.expired:
+            try:
+                with recorder.span("http_fetch"):
+                    return await fetcher.fetch_table(option['value'])
+            except ClearanceExpiredError as e:
+                print(f"{e}, usando el navegador para {option['value']}")
+            except Exception as e:
+                print(f"{ERROR} Error HTTP para opción {option['value']}: {e}")
+                return None
+
+        async with browser_lock:
+            table_html = await fetch_option_table(page, iframe_with_table, option)
+            if fetcher.expired:
+                await fetcher.refresh_clearance(browser, page, iframe_with_table)
+            return table_html
+
+    print(f"🌐 Procesando por HTTP con {concurrency} conexiones en paralelo")
+    try:
+        return await process_options_with_workers(options, [fetch] * min(concurrency, len(options)),
+                                                  csv_manager, save_individual, breaker=breaker, failed=failed)
+    finally:
+        await fetcher.aclose()
+
+async def retry_failed_options(browser, url: str, page, iframe_with_table, failed, csv_manager,
+                               save_individual=True, policy=None, breaker=None):
+    """
+    Reintenta por el navegador las opciones que fallaron en la pasada principal.
+
+    Las opciones se reintentan en rondas, cada una precedida de una espera exponencial
+    con variación aleatoria. Tras RETRY_RESET_AFTER_FAILURES fallos seguidos la página
+    y el iframe se vuelven a configurar. Los meses recuperados llegan tarde al archivo
+    consolidado, que los reordena al publicarse.
+
+    Returns:
+        (opciones recuperadas, opciones que siguen fallando)
+    """
+    policy = policy or RetryPolicy()
+    breaker = breaker or CircuitBreaker()
+    pending = list(failed)
+    recovered = 0
+    consecutive_failures = 0
+
+    for attempt in range(1, policy.max_attempts + 1):
+        if not pending or breaker.exhausted:
+            break
+        delay = policy.delay(attempt)
+        print(f"\n🔁 Reintento {attempt}/{policy.max_attempts}: {len(pending)} opciones en {delay:.1f} s")
+        await asyncio.sleep(delay)
+
+        still_failing = []
+        for option in pending:
+            await breaker.wait()
+            if breaker.exhausted:
+                still_failing.append(option)
+                continue
+
+            if consecutive_failures >= policy.reset_after_failures:
+                print(f"{WARNING} {consecutive_failures} fallos seguidos, recargando la página")
+                try:
+                    with recorder.span("page_reset"):
+                        page, iframe_with_table = await setup_page_and_iframe(browser, url)
+                    consecutive_failures = 0
+                except Exception as e:
+                    print(f"{ERROR} No se pudo recargar la página: {e}")
+
+            with recorder.span("option", option['value']):
+                table_html = await fetch_option_table(page, iframe_with_table, option)
+            breaker.record(table_html is not None)
+            if table_html is None:
+                consecutive_failures += 1
+                still_failing.append(option)
+                continue
+
+            consecutive_failures = 0
+            try:
+                saved = save_option_table(csv_manager, table_html, option, save_individual)
+            except Exception as e:
+                print(f"{ERROR} Error procesando opción {option['value']}: {e}")
+                saved = False
+            if saved:
+                recovered += 1
+                print(f"{SUCCESS} Opción recuperada: {option['value']}")
+            else:
+                still_failing.append(option)
+        pending = still_failing
+
+    return recovered, pending
+
+def create_export_writers(formats, csv_manager, query_params, station_code: str):
+    """
+    Crea los escritores de las salidas activas: dataset Parquet, almacén SQLite y las exportaciones
+    configuradas en EXPORT_FORMATS. Cada escritor se importa solo si se usa, para no cargar
+    numpy ni pyarrow cuando sus salidas están desactivadas
+    """
+    writers = []
+    if PARQUET_OUTPUT:
+        from src.writers.parquet_writer import ParquetDatasetWriter
+        writers.append(ParquetDatasetWriter(station_code, csv_manager.headers))
+    if SQLITE_STORE:
+        from src.writers.sqlite_writer import SQLiteObservationWriter
+        writers.append(SQLiteObservationWriter(station_code))
+    for output_format in map(OutputFormat, formats):
+        filepath = os.path.join(csv_manager.output_dir,
+                                get_export_filename(query_params, csv_manager.filename, output_format.value))
+        if output_format == OutputFormat.JSON:
+            from src.writers.ndjson_writer import NDJSONWriter
+            writers.append(NDJSONWriter(filepath, station_code))
+        elif output_format == OutputFormat.EXCEL:
+            from src.writers.xlsx_writer import XLSXWriter
+            writers.append(XLSXWriter(filepath, csv_manager.headers))
+    return writers
+
+async def scrape_station(browser, query_station, query_params, output_dir: str = CSV_DIR,
+                         base_url: str = BASE_URL, fetch_mode: str = FETCH_MODE, tabs: int = CONCURRENT_TABS,
+                         use_html_cache: bool = HTML_CACHE_ENABLED) -> ScrapingResult:
+    """
+    Descarga los meses de una estación según los parámetros de consulta, sin interacción con el usuario.
+
+    Args:
+        browser: Navegador de zendriver ya iniciado
+        query_station: Estación a consultar
+        query_params: Parámetros del modo de consulta (ver get_user_query_mode)
+        output_dir: Directorio base de salida
+        base_url: URL de la página de la estación (permite usar un servidor local)
+        fetch_mode: "browser" o "http"
+        tabs: Pestañas en paralelo en modo navegador
+        use_html_cache: Guardar el HTML crudo de cada tabla en la caché
+
+    Returns:
+        ScrapingResult de la estación
+    """
+    result = ScrapingResult(station_code=query_station.code, success=False)
+    headers = get_headers_for_station(query_station)
+    station_name = query_station.name.replace(" ", "")
+    csv_manager = None
+    raw_html_token = _read_raw_html.set(use_html_cache)
+    started = time.perf_counter()
+    with recorder.station(query_station.code) as station_metrics:
+        try:
+            # Peticiones ya bloqueadas en la pestaña reutilizada (estaciones anteriores del mismo navegador)
+            previous_blocker = get_blocker(browser.main_tab) if browser.main_tab is not None else None
+            blocked_before = Counter(previous_blocker.blocked) if previous_blocker is not None else Counter()
+
+            # Configurar página e iframe
+            url_station = create_station_url(query_station, base_url)
+            page, iframe_with_table = await setup_page_and_iframe(browser, url_station)
+
+            # Obtener opciones del select
+            select_html = await get_select_options(page)
+        
+            # Configurar manejadores
+            query_handler = QueryModeHandler()
+            query_handler.load_options(select_html)
+        
+            csv_manager = CSVManager(station_name, output_dir)
+            csv_manager.headers = headers
+            csv_manager.start_line = get_table_start_line(query_station)
+            csv_manager.station_code = query_station.code
+            if use_html_cache:
+                csv_manager.html_cache = HtmlCache()
+            csv_manager.table_writers.extend(create_export_writers(EXPORT_FORMATS, csv_manager, query_params, query_station.code))
+
+            # Mostrar años disponibles
+            available_years = query_handler.get_available_years()
+            print(f"📅 Años disponibles: {available_years}")
+        
+            # Filtrar opciones según el modo
+            if query_params['mode'] == 'month':
+                filtered_options = query_handler.filter_by_month(query_params['year'], query_params['month'])
+                save_individual = True
+            elif query_params['mode'] == 'year':
+                filtered_options = query_handler.filter_by_year(query_params['year'])
+                save_individual = not query_params['consolidated']
+            elif query_params['mode'] == 'period':
+                filtered_options = query_handler.filter_by_period(query_params['start_year'], query_params['end_year'])
+                save_individual = not query_params['consolidated']
+            elif query_params['mode'] == 'periods':
+                filtered_options = query_handler.filter_by_periods(query_params['periods'])
+                save_individual = True
+                offered = {option['value'] for option in filtered_options}
+                result.unavailable_periods = sorted(set(query_params['periods']) - offered)
+        
+            if not filtered_options:
+                print(f"{ERROR} No se encontraron opciones para los criterios especificados")
+                result.add_error("No se encontraron opciones para los criterios especificados")
+                return result
+
+            # Sincronización incremental: omitir meses cerrados ya descargados
+            if INCREMENTAL_SYNC and save_individual:
+                requested = {option['value'] for option in filtered_options}
+                plan = plan_incremental_sync(filtered_options, csv_manager.manifest, query_handler.get_valid_options())
+                print(f"🔁 Sincronización incremental: {len(plan.missing)} faltantes, {len(plan.stale)} recientes, "
+                      f"{len(plan.skipped)} ya descargados")
+                if plan.removed:
+                    print(f"{WARNING} Periodos del manifiesto que ya no ofrece el sitio: {', '.join(plan.removed)}")
+                filtered_options = plan.to_fetch
+                result.completed_periods = sorted(set(plan.skipped) & requested)
+                if not filtered_options:
+                    print(f"{SUCCESS} La estación ya está sincronizada")
+                    result.success = True
+                    return result
+            elif INCREMENTAL_SYNC:
+                print(f"{WARNING} La sincronización incremental solo aplica a archivos individuales; se descargará todo el rango")
+        
+            print(f"\n📊 Se procesarán {len(filtered_options)} opciones")
+
+            # El consolidado se escribe a medida que llegan los meses
+            if not save_individual and query_params.get('filename'):
+                csv_manager.open_consolidated_file(query_params['filename'])
+        
+            # Procesar opciones filtradas; las que fallan quedan en failed_options
+            breaker = CircuitBreaker()
+            failed_options = []
+            if fetch_mode == "http":
+                successful_count = await process_options_http(
+                    browser, page, iframe_with_table, filtered_options, csv_manager,
+                    save_individual=save_individual, breaker=breaker, failed=failed_options
+                )
+            elif tabs > 1 and len(filtered_options) > 1:
+                successful_count = await process_options_concurrently(
+                    browser, url_station, page, iframe_with_table, filtered_options, csv_manager,
+                    save_individual=save_individual, tabs=tabs, breaker=breaker, failed=failed_options
+                )
+            else:
+                fetchers = [functools.partial(fetch_option_table, page, iframe_with_table)]
+                successful_count = await process_options_with_workers(
+                    filtered_options, fetchers, csv_manager, save_individual,
+                    breaker=breaker, failed=failed_options
+                )
+
+            # Reintentar los meses fallidos antes de publicar los archivos
+            remaining_options = failed_options
+            if failed_options:
+                recovered, remaining_options = await retry_failed_options(
+                    browser, url_station, page, iframe_with_table, failed_options, csv_manager,
+                    save_individual=save_individual, breaker=breaker
+                )
+                successful_count += recovered
+                print(f"\n🔁 Reintentos: {recovered}/{len(failed_options)} opciones recuperadas")
+        
+            # Guardar archivo consolidado si es necesario
+            published = save_individual
+            if not save_individual and query_params.get('filename'):
+                filepath = csv_manager.save_consolidated_file(query_params['filename'])
+                if filepath:
+                    result.add_file(filepath)
+                    published = True
+        
+            for filepath in csv_manager.close_table_writers():
+                print(f"{SUCCESS} Archivo guardado: {filepath}")
+                result.add_file(filepath)
+
+            print(f"\n🎉 Proceso completado: {successful_count}/{len(filtered_options)} opciones procesadas exitosamente")
+            blocker = get_blocker(page)
+            if blocker is not None:
+                print(f"🚫 {blocker.summary(since=blocked_before)}")
+            result.success = successful_count == len(filtered_options)
+            # Solo cuentan como terminados los meses cuyas filas quedaron escritas en un archivo publicado,
+            # y los meses sin filas de datos, que no tienen nada que publicar
+            saved = set(csv_manager.saved_periods) if published else set()
+            empty = set(csv_manager.empty_periods)
+            result.completed_periods += [option['value'] for option in filtered_options
+                                         if option['value'] in saved or option['value'] in empty]
+            result.empty_periods = [option['value'] for option in filtered_options if option['value'] in empty]
+            for option in remaining_options:
+                result.add_error(f"Periodo {option['value']} sin descargar tras los reintentos")
+            if breaker.exhausted:
+                result.add_error("Descarga interrumpida: el sitio falló de forma continua")
+
+            return result
+
+        finally:
+            # Si el proceso no terminó, los meses ya escritos quedan en el archivo .part
+            if csv_manager is not None:
+                csv_manager.close_consolidated_file()
+                csv_manager.close_table_writers(publish=False)
+                result.records_count = csv_manager.records_count
+            _read_raw_html.reset(raw_html_token)
+            result.processing_time = time.perf_counter() - started
+            station_metrics.success = result.success
+            station_metrics.records = result.records_count
+
+def station_query_params(query_params, station_name: str):
+    """
+    Copia los parámetros de consulta con el nombre de archivo de otra estación
+    """
+    params = dict(query_params)
+    if params['mode'] == 'month' or params.get('consolidated'):
+        params['filename'] = get_export_filename(params, station_name, "csv")
+    else:
+        params['filename'] = None
+    return params
+
+async def scrape_stations(stations, query_params, pool=None, **kwargs):
+    """
+    Descarga varias estaciones con los mismos parámetros, reutilizando los navegadores de un pool.
+
+    Cada estación toma prestado un navegador que ya superó Cloudflare, por lo que solo paga
+    la navegación a su página. Se procesan tantas estaciones a la vez como navegadores
+    tenga el pool. Los argumentos adicionales se pasan a scrape_station.
+
+    Returns:
+        Lista de ScrapingResult en el orden de `stations`
+    """
+    owns_pool = pool is None
+    pool = pool or BrowserPool()
+
+    async def run(station):
+        station_name = station.name.replace(" ", "")
+        try:
+            async with pool.lease() as browser:
+                return await scrape_station(browser, station, station_query_params(query_params, station_name), **kwargs)
+        except Exception as e:
+            print(f"{ERROR} Error en la estación {station.code}: {e}")
+            result = ScrapingResult(station_code=station.code, success=False)
+            result.add_error(str(e))
+            return result
+
+    try:
+        return await asyncio.gather(*(run(station) for station in stations))
+    finally:
+        if owns_pool:
+            await pool.close()
+
+def evict_html_cache() -> None:
+    """
+    Aplica la expiración y el límite de tamaño de la caché HTML. Recorre toda la caché,
+    por lo que se llama una vez al terminar el proceso y no tras cada estación
+    """
+    if not HTML_CACHE_ENABLED:
+        return
+    try:
+        evicted = HtmlCache().evict()
+    except OSError as e:
+        print(f"{WARNING} No se pudo limpiar la caché HTML: {e}")
+        return
+    if evicted:
+        print(f"🧹 Caché HTML: {evicted} tablas antiguas eliminadas")
 
 async def main():
     # Obtener código de estación y verificar
@@ -104,7 +701,6 @@ async def main():
     # Mostrar información de la estación
     print(f"{SUCCESS} Estación encontrada: {query_station.name} ({query_station.code})")
 
-    headers = get_headers_for_station(query_station)
     station_name = query_station.name.replace(" ", "")
 
     # Obtener modo de consulta
@@ -112,59 +708,18 @@ async def main():
 
     print(f"\n🚀 Iniciando scraping a la estación {query_station.name} en modo: {query_params['mode'].upper()}")
 
-    browser = await zd.start()
+    recorder.reset()
+    pool = BrowserPool(size=1)
     
     try:
-        # Configurar página e iframe
-        url_station = create_station_url(query_station)
-        page, iframe_with_table = await setup_page_and_iframe(browser, url_station)
-
-        # Obtener opciones del select
-        select_html = await get_select_options(page)
-        
-        # Configurar manejadores
-        query_handler = QueryModeHandler()
-        query_handler.load_options(select_html)
-        
-        csv_manager = CSVManager(station_name)
-        csv_manager.headers = headers
-        csv_manager.start_line = 1 if query_station.status == "AUTOMATICA" else 2
-
-        # Mostrar años disponibles
-        available_years = query_handler.get_available_years()
-        print(f"📅 Años disponibles: {available_years}")
-        
-        # Filtrar opciones según el modo
-        if query_params['mode'] == 'month':
-            filtered_options = query_handler.filter_by_month(query_params['year'], query_params['month'])
-            save_individual = True
-        elif query_params['mode'] == 'year':
-            filtered_options = query_handler.filter_by_year(query_params['year'])
-            save_individual = not query_params['consolidated']
-        elif query_params['mode'] == 'period':
-            filtered_options = query_handler.filter_by_period(query_params['start_year'], query_params['end_year'])
-            save_individual = not query_params['consolidated']
-        
-        if not filtered_options:
-            print(f"{ERROR} No se encontraron opciones para los criterios especificados")
-            return
-        
-        print(f"\n📊 Se procesarán {len(filtered_options)} opciones")
-        
-        # Procesar opciones filtradas
-        successful_count = 0
-        for i, option in enumerate(filtered_options, 1):
-            print(f"\n--- Procesando {i}/{len(filtered_options)} ---")
+        async with pool.lease() as browser:
+            result = await scrape_station(browser, query_station, query_params)
+            print(f"\n{result.get_summary()} en {result.processing_time:.1f} s")
 
-            success = await process_option(page, iframe_with_table, option, csv_manager, save_individual=save_individual)
-            if success:
-                successful_count += 1
-        
-        # Guardar archivo consolidado si es necesario
-        if not save_individual and query_params.get('filename'):
-            csv_manager.save_consolidated_file(query_params['filename'])
-        
-        print(f"\n🎉 Proceso completado: {successful_count}/{len(filtered_options)} opciones procesadas exitosamente")
+            # Pausa opcional para verificación visual
+            if BROWSER_VERIFICATION_PAUSE > 0:
+                print(f"🔍 Manteniendo navegador abierto {BROWSER_VERIFICATION_PAUSE} segundos para verificación...")
+                await asyncio.sleep(BROWSER_VERIFICATION_PAUSE)
         
     except Exception as e:
         print(f"{ERROR} Error durante el proceso: {e}")
@@ -172,10 +727,13 @@ async def main():
         traceback.print_exc()
     
     finally:
-        # Pausa para verificación visual
-        print("🔍 Manteniendo navegador abierto 2 segundos para verificación...")
-        await asyncio.sleep(2)
-        await browser.stop()
+        await pool.close()
+        evict_html_cache()
+        try:
+            for filepath in recorder.write_reports():
+                print(f"📈 Métricas guardadas: {filepath}")
+        except OSError as e:
+            print(f"{WARNING} No se pudieron guardar las métricas: {e}")
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
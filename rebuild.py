@@ -0,0 +1,69 @@
+"""
+Regenera los archivos CSV desde la caché de HTML crudo, sin abrir el navegador.
+
+Ejemplos:
+    python rebuild.py                          # Todas las estaciones de la caché
+    python rebuild.py --stations 472D30C8      # Una estación
+    python rebuild.py --start-year 2020 --end-year 2025 --consolidated
+    python rebuild.py --parquet                # También regenerar el dataset Parquet
+    python rebuild.py --sqlite                 # También cargar el almacén SQLite
+    python rebuild.py --evict                  # Aplicar expiración y límite de tamaño
+"""
+
+import argparse
+import time
+import settings
+from src.html_cache import HtmlCache
+from src.rebuild import rebuild_from_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", nargs="+", help="Códigos de estación (por defecto, todas las de la caché)")
+    parser.add_argument("--start-year", type=int, help="Primer año a regenerar")
+    parser.add_argument("--end-year", type=int, help="Último año a regenerar")
+    parser.add_argument("--consolidated", action="store_true", help="Un archivo único por estación")
+    parser.add_argument("--workers", type=int, help="Procesos en paralelo (por defecto, uno por CPU)")
+    parser.add_argument("--cache-dir", default=settings.HTML_CACHE_DIR, help="Directorio de la caché")
+    parser.add_argument("--output-dir", default=settings.CSV_DIR, help="Directorio de salida")
+    parser.add_argument("--parquet", action="store_true", help=f"Regenerar también el Parquet en {settings.PARQUET_DIR}")
+    parser.add_argument("--sqlite", action="store_true", help=f"Cargar también el almacén {settings.SQLITE_STORE_FILE}")
+    parser.add_argument("--evict", action="store_true", help="Solo limpiar la caché")
+    args = parser.parse_args()
+
+    if args.evict:
+        removed = HtmlCache(args.cache_dir).evict()
+        print(f"🧹 {removed} tablas eliminadas de la caché")
+        return
+
+    start = time.perf_counter()
+    summaries = rebuild_from_cache(
+        station_codes=args.stations,
+        cache_dir=args.cache_dir,
+        output_dir=args.output_dir,
+        start_year=args.start_year,
+        end_year=args.end_year,
+        consolidated=args.consolidated,
+        workers=args.workers,
+        parquet_dir=settings.PARQUET_DIR if args.parquet else None,
+        sqlite_path=settings.SQLITE_STORE_FILE if args.sqlite else None,
+    )
+
+    print("\n" + "=" * 50)
+    for summary in summaries:
+        if summary["error"]:
+            print(f"{settings.ERROR} {summary['station']}: {summary['error']}")
+        elif summary["failed"]:
+            print(f"{settings.WARNING} {summary['station']}: {summary['months']} meses, {len(summary['files'])} archivos, "
+                  f"{len(summary['failed'])} meses con error: {', '.join(summary['failed'])}")
+        else:
+            print(f"{settings.SUCCESS} {summary['station']}: {summary['months']} meses, {len(summary['files'])} archivos")
+    total_months = sum(summary["months"] for summary in summaries)
+    total_failed = sum(len(summary["failed"]) for summary in summaries)
+    print(f"\n🎉 {total_months} meses regenerados en {time.perf_counter() - start:.1f} s")
+    if total_failed:
+        print(f"{settings.WARNING} {total_failed} meses no se pudieron regenerar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Mantiene actualizado el mes en curso de las estaciones automáticas y de tiempo real.
+
+Proceso de larga duración: atiende primero las estaciones más atrasadas respecto de su
+intervalo (REFRESH_INTERVALS) y guarda su estado en REFRESH_STATE_FILE para continuar
+tras un reinicio. Se detiene con Ctrl+C o SIGTERM al terminar las actualizaciones en curso.
+
+Ejemplos:
+    python scheduler.py --headless --profile cookies
+    python scheduler.py --statuses AUTOMATICA --concurrency 4 --headless
+    python scheduler.py --stations 472D30C8 4726A602 --once     # Actualiza las vencidas y termina
+"""
+
+import argparse
+import asyncio
+import signal
+import time
+import settings
+from typing import Optional
+from main import evict_html_cache, scrape_station, station_query_params
+from src.browser_pool import BrowserPool
+from src.browser_profile import ProfileStore
+from src.metrics import recorder
+from src.refresh_scheduler import RefreshScheduler
+from src.station_service import find_station_by_code, get_stations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stations", nargs="+", default=[], help="Códigos de estación (por defecto, todas las de --statuses)")
+    parser.add_argument("--statuses", nargs="+", default=settings.REFRESH_STATUSES,
+                        choices=sorted(settings.REFRESH_INTERVALS), help="Estados de estación incluidos")
+    parser.add_argument("--concurrency", type=int, default=settings.REFRESH_CONCURRENCY, help="Actualizaciones simultáneas")
+    parser.add_argument("--state-file", default=settings.REFRESH_STATE_FILE, help="Archivo de estado del planificador")
+    parser.add_argument("--once", action="store_true", help="Actualizar las estaciones vencidas y terminar")
+    parser.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    parser.add_argument("--browser-path", help="Ejecutable de Chrome/Chromium")
+    parser.add_argument("--profile", choices=("profile", "cookies"), default=settings.BROWSER_PROFILE_MODE,
+                        help="Reutilizar la autorización de Cloudflare entre ejecuciones")
+    return parser.parse_args()
+
+
+def select_stations(args) -> list:
+    if args.stations:
+        stations = [find_station_by_code(code) for code in args.stations]
+        for code, station in zip(args.stations, stations):
+            if station is None:
+                print(f"{settings.WARNING} Estación no encontrada: {code}")
+        return [station for station in stations if station is not None]
+    return [station for station in get_stations() if station.status in args.statuses]
+
+
+async def refresh_station(scheduler: RefreshScheduler, pool: BrowserPool, station) -> None:
+    """Descarga el mes en curso (y el anterior si hace falta) de una estación y registra el resultado"""
+    periods = scheduler.periods(station.code)
+    params = station_query_params({"mode": "periods", "periods": periods}, station.name.replace(" ", ""))
+    success = False
+    try:
+        async with pool.lease() as browser:
+            result = await scrape_station(browser, station, params)
+        # Un mes que la estación aún no ofrece no es un error
+        success = set(periods) <= set(result.completed_periods) | set(result.unavailable_periods)
+    except Exception as e:
+        print(f"{settings.ERROR} Error actualizando {station.code}: {e}")
+    finally:
+        scheduler.finish(station.code, success)
+    schedule = scheduler.stations[station.code]
+    status = f"{settings.SUCCESS} actualizada" if success else f"{settings.ERROR} falló ({schedule.failures} seguidos)"
+    print(f"🕒 {station.name} ({station.code}) {', '.join(periods)}: {status}")
+
+
+async def run_scheduler(scheduler: RefreshScheduler, pool: BrowserPool, stations: dict, concurrency: int,
+                        once: bool = False, stop: Optional[asyncio.Event] = None) -> None:
+    """
+    Bucle principal: lanza las estaciones vencidas de mayor prioridad mientras haya presupuesto
+    y duerme hasta que termine una actualización o venza la próxima estación
+    """
+    stop = stop or asyncio.Event()
+    running = set()
+    last_report = time.monotonic()
+
+    while not stop.is_set():
+        for code in scheduler.due(concurrency - len(running)):
+            scheduler.start(code)
+            running.add(asyncio.create_task(refresh_station(scheduler, pool, stations[code])))
+
+        if once and not running:
+            break
+
+        timeout = settings.REFRESH_REPORT_INTERVAL
+        if len(running) < concurrency:
+            # Con el presupuesto completo, las estaciones vencidas esperan a que termine una actualización:
+            # seconds_until_due() sería 0 y el bucle giraría sin pausa
+            wait = scheduler.seconds_until_due()
+            if wait is not None:
+                timeout = min(wait, timeout)
+        stopper = asyncio.create_task(stop.wait())
+        _, pending = await asyncio.wait(running | {stopper}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        running = {task for task in pending if task is not stopper}
+
+        if time.monotonic() - last_report >= settings.REFRESH_REPORT_INTERVAL:
+            last_report = time.monotonic()
+            recorder.keep_latest_stations()
+            recorder.write_reports()
+            print(f"📋 {scheduler.overdue()} estaciones vencidas, {len(running)} en curso")
+
+    if running:
+        print(f"⏳ Esperando {len(running)} actualizaciones en curso...")
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def run(args) -> None:
+    stations = {station.code: station for station in select_stations(args)}
+    scheduler = RefreshScheduler(args.state_file)
+    scheduler.add_all(stations.values())
+    if not scheduler.stations:
+        print(f"{settings.ERROR} No hay estaciones para actualizar")
+        return
+    print(f"{settings.SUCCESS} {len(scheduler.stations)} estaciones, {scheduler.overdue()} vencidas")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C interrumpe el proceso directamente
+
+    browser_kwargs = {"headless": args.headless}
+    if args.browser_path:
+        browser_kwargs["browser_executable_path"] = args.browser_path
+
+    recorder.reset()
+    try:
+        async with BrowserPool(size=args.concurrency, browser_kwargs=browser_kwargs,
+                               profiles=ProfileStore(mode=args.profile)) as pool:
+            await run_scheduler(scheduler, pool, stations, args.concurrency, once=args.once, stop=stop)
+    finally:
+        scheduler.save()
+        evict_html_cache()
+        recorder.keep_latest_stations()
+        for filepath in recorder.write_reports():
+            print(f"📈 Métricas guardadas: {filepath}")
+
+
+def main():
+    asyncio.run(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
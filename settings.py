@@ -12,17 +12,125 @@ PAGE_TIMEOUT = 30
 ELEMENT_TIMEOUT = 10
 TIMEOUT_SECONDS = 30
 POLL_INTERVAL = 0.5
+TABLE_POLL_INTERVAL = 0.1      # Intervalo de verificación tras seleccionar una opción
+TABLE_REFRESH_TIMEOUT = 30     # Tiempo máximo de espera para que la tabla se actualice
+
+# Concurrencia
+CONCURRENT_TABS = 1  # Pestañas paralelas por navegador (1 = procesamiento secuencial)
+REORDER_WINDOW = 16  # Meses que pueden adelantarse al más antiguo pendiente de guardar
+
+# Bloqueo de peticiones que la página pide pero el scraper no usa (mapas, imágenes, fuentes, analítica)
+REQUEST_BLOCKING_ENABLED = True
+BLOCKED_RESOURCE_TYPES = ["Image", "Media", "Font"]   # Tipos de recurso de CDP (Stylesheet, Script...)
+BLOCKED_URL_PATTERNS = [                              # Comodines * y ?
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*tile.openstreetmap.org*", "*arcgisonline.com*", "*maps.googleapis.com*", "*maps.gstatic.com*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*youtube.com*",
+]
+ALLOWED_URL_PATTERNS = [                              # Nunca se bloquean: desafío de Cloudflare y contenido del iframe
+    "*challenges.cloudflare.com*", "*/cdn-cgi/*", "*_dato_esta_*",
+]
+
+# Pool de navegadores: varias estaciones por proceso reutilizan navegadores ya iniciados
+BROWSER_POOL_SIZE = 1             # Navegadores (y estaciones) simultáneos
+BROWSER_MAX_JOBS = 50             # Estaciones por navegador antes de reciclarlo
+BROWSER_MAX_MEMORY_MB = 1500      # Memoria máxima del navegador y sus procesos antes de reciclarlo
+BROWSER_HEALTH_TIMEOUT = 5        # Tiempo máximo de la verificación de salud (segundos)
+BROWSER_VERIFICATION_PAUSE = 2    # Segundos con el navegador abierto al terminar main() (0 = sin pausa)
+
+# Perfil persistente: reutiliza la autorización de Cloudflare entre ejecuciones
+BROWSER_PROFILE_MODE = None       # None (perfil temporal), "profile" (user-data-dir persistente) o "cookies" (cookies exportadas)
+BROWSER_PROFILE_DIR = "output/browser_profiles"
+BROWSER_PROFILE_SLOTS = 4         # Perfiles por configuración (uno por navegador simultáneo)
+CLEARANCE_COOKIE = "cf_clearance"
+CLEARANCE_MIN_TTL = 300           # Vigencia mínima (segundos) para reutilizar la autorización guardada
+
+# Reintentos de meses fallidos (al terminar la pasada principal)
+RETRY_MAX_ATTEMPTS = 3          # Rondas de reintento por mes
+RETRY_BASE_DELAY = 2.0          # Espera antes de la primera ronda (se duplica en cada una)
+RETRY_MAX_DELAY = 60.0          # Espera máxima entre rondas
+RETRY_JITTER = 0.5              # Variación aleatoria de la espera (fracción)
+RETRY_RESET_AFTER_FAILURES = 2  # Fallos seguidos antes de recargar la página e iframe
+
+# Cortacircuitos: pausa la descarga cuando el sitio falla de forma continua
+CIRCUIT_FAILURE_THRESHOLD = 5   # Fallos seguidos que abren el circuito
+CIRCUIT_COOLDOWN = 60.0         # Pausa con el circuito abierto (segundos)
+CIRCUIT_MAX_OPENS = 3           # Pausas permitidas antes de abandonar los meses restantes
+
+# Cola de trabajo distribuida (worker.py): tareas (estación, YYYYMM) en SQLite
+WORK_QUEUE_FILE = "output/work_queue.sqlite"
+WORK_QUEUE_BATCH = 12             # Meses de una misma estación por tarea reclamada
+WORK_QUEUE_LEASE = 600            # Vigencia del préstamo sin latido (segundos)
+WORK_QUEUE_HEARTBEAT = 60         # Intervalo entre latidos del worker (segundos)
+WORK_QUEUE_MAX_ATTEMPTS = 5       # Intentos por tarea antes de marcarla como fallida
+WORK_QUEUE_POLL_INTERVAL = 30     # Espera cuando no hay tareas disponibles (segundos)
+
+# Actualización continua (scheduler.py): solo el mes en curso de las estaciones que publican datos seguido
+REFRESH_INTERVALS = {             # Intervalo objetivo entre actualizaciones según el estado (segundos)
+    "AUTOMATICA": 3600,           # Datos horarios
+    "REAL": 3 * 3600,             # Tiempo real
+    "DIFERIDO": 24 * 3600,        # Solo si se incluye con --statuses
+}
+REFRESH_STATUSES = ["AUTOMATICA", "REAL"]  # Estados incluidos por defecto
+REFRESH_CONCURRENCY = 2           # Estaciones actualizándose a la vez (navegadores del pool)
+REFRESH_STATE_FILE = "output/refresh_state.json"
+REFRESH_REPORT_INTERVAL = 300     # Cada cuánto se actualizan los reportes de métricas (segundos)
+
+# Modo de descarga: "browser" (DOM del navegador) o "http" (peticiones directas tras Cloudflare)
+FETCH_MODE = "browser"
+TABLE_EXTRACTION = "js"              # Modo browser: "js" (filas leídas en la página) o "html" (HTML completo de la tabla)
+HTTP_CONCURRENCY = 8                 # Peticiones HTTP simultáneas
+HTTP_MAX_CONNECTIONS = 8             # Conexiones persistentes del cliente HTTP
+HTTP_TIMEOUT = 30                    # Tiempo máximo por petición (segundos)
+HTTP_MAX_CLEARANCE_REFRESHES = 3     # Renovaciones de la autorización antes de volver al navegador
+HTTP_PERIOD_PARAM = "CBOFiltro"      # Parámetro del iframe que indica el periodo YYYYMM
+TABLE_ID = "dataTable"
 
 # Configuración de archivos
 CSV_SEPARATOR = ";"
 CSV_ENCODING = "utf-8"
+CSV_WRITE_BUFFER_SIZE = 1024 * 1024   # Buffer de escritura del archivo consolidado (bytes)
 OUTPUT_DIR = "output"
 CSV_DIR = "output/csv"
 LOGS_DIR = "output/logs"
 REPORTS_DIR = "output/reports"
 
+# Exportaciones adicionales al CSV: "json" (NDJSON, una lectura por línea) y/o "xlsx" (una hoja por año)
+EXPORT_FORMATS = []
+
+# Salida columnar Parquet (además del CSV), particionada por estación y año
+PARQUET_OUTPUT = False
+PARQUET_DIR = "output/parquet"
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_ROWS = 50000   # Filas mínimas por grupo (se agrupan meses completos)
+
+# Almacén SQLite de observaciones (además del CSV), con clave (estación, fecha y hora)
+SQLITE_STORE = False
+SQLITE_STORE_FILE = "output/observations.sqlite"
+
+# Agregación diaria y mensual de datos horarios (aggregate.py)
+AGGREGATION_MIN_COVERAGE = 0.8   # Fracción mínima de lecturas del periodo para calcular su valor
+AGGREGATES_DIR = "output/aggregates"
+
+# Sincronización incremental (solo archivos individuales)
+INCREMENTAL_SYNC = False
+SYNC_FRESHNESS_DAYS = 31   # Días tras el fin de mes en que un periodo aún puede cambiar
+
+# Caché del HTML crudo de las tablas (permite regenerar salidas sin volver a descargar)
+HTML_CACHE_ENABLED = False
+HTML_CACHE_DIR = "cache/html"
+HTML_CACHE_TTL_DAYS = None               # None = sin expiración
+HTML_CACHE_MAX_BYTES = 2 * 1024 ** 3     # Tamaño máximo comprimido (2 GB)
+
+# Métricas de tiempo por fase (reporte JSON y archivo de texto para Prometheus)
+METRICS_ENABLED = True
+METRICS_DIR = REPORTS_DIR
+METRICS_PROMETHEUS_FILE = "output/reports/senamhi_scraper.prom"   # Textfile collector; cada proceso agrega su pid al nombre
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)   # Segundos
+
 # Datos
 STATIONS_FILE = "data/estaciones.json"
+STATIONS_SNAPSHOT_FILE = "data/estaciones.snapshot.pkl"  # Estaciones prevalidadas (se regenera si cambia el JSON)
 
 # Mensajes de estado
 SUCCESS = "✅"
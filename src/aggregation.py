@@ -0,0 +1,230 @@
+"""
+Agregación diaria y mensual de tablas columnares con NumPy.
+
+Las estaciones automáticas reportan lecturas horarias; los productos habituales son
+diarios y mensuales. Cada campo de salida se calcula con una regla (campo de origen y
+reducción), de modo que una estación automática produce las mismas columnas que una
+convencional:
+
+    temperature    → temp_max (máximo), temp_min (mínimo) y temperature (media)
+    precipitation  → precipitation (suma)
+    humidity       → humidity (media)
+    river_level    → river_level_06/10/14/18 (lectura de esas horas) y river_level (media)
+    wind_speed     → wind_speed (media)
+    wind_direction → wind_direction (media vectorial ponderada por la velocidad)
+
+Las tablas convencionales (diarias) también se agregan por mes con sus propios campos.
+Las filas se ordenan por periodo una sola vez y cada reducción es un `reduceat` sobre
+los límites de los periodos, sin recorrer las filas en Python.
+
+Cada campo lleva la cantidad de lecturas válidas por periodo (`counts`) y las esperadas
+(`expected`: 24 por día en datos horarios, una por día en datos diarios). Un periodo con
+menos de `min_coverage` de las lecturas esperadas queda sin dato.
+"""
+
+import numpy as np
+import settings
+from typing import Dict, List, NamedTuple, Optional
+from src.columnar import ColumnarTable, day_numbers, month_numbers
+from src.models.data_schema import COLUMN_FIELDS, MEASUREMENT_DTYPE, TIME_FIELD_DTYPES
+
+FREQUENCIES = ("day", "month")
+
+RIVER_LEVEL_HOURS = (6, 10, 14, 18)
+
+
+class Rule(NamedTuple):
+    """Cálculo de un campo de salida a partir de un campo de la tabla"""
+    field: str
+    source: str
+    reduction: str              # sum, mean, min, max o direction
+    hour: Optional[int] = None  # Solo las lecturas de esa hora
+
+
+# En orden de salida: primero las columnas de las estaciones convencionales
+RULES = (
+    Rule("temp_max", "temperature", "max"),
+    Rule("temp_max", "temp_max", "max"),
+    Rule("temp_min", "temperature", "min"),
+    Rule("temp_min", "temp_min", "min"),
+    Rule("humidity", "humidity", "mean"),
+    Rule("precipitation", "precipitation", "sum"),
+    *(Rule(f"river_level_{hour:02d}", "river_level", "mean", hour) for hour in RIVER_LEVEL_HOURS),
+    *(Rule(f"river_level_{hour:02d}", f"river_level_{hour:02d}", "mean") for hour in RIVER_LEVEL_HOURS),
+    Rule("temperature", "temperature", "mean"),
+    Rule("wind_direction", "wind_direction", "direction"),
+    Rule("wind_speed", "wind_speed", "mean"),
+    Rule("river_level", "river_level", "mean"),
+)
+
+# Header de cada campo; "precipitation" toma "Precipitación (mm)", el primero en data_schema.py
+FIELD_HEADERS = {field: header for header, field in reversed(COLUMN_FIELDS.items())}
+
+
+class AggregatedTable(ColumnarTable):
+    """
+    Tabla diaria o mensual con la cobertura de cada campo.
+
+    Atributos (además de los de ColumnarTable):
+        frequency: "day" o "month"
+        counts: Lecturas válidas por periodo de cada campo
+        expected: Lecturas esperadas por periodo de cada campo
+    """
+
+    def __init__(self, headers: List[str], columns: Dict[str, np.ndarray], masks: Dict[str, np.ndarray],
+                 frequency: str, counts: Dict[str, np.ndarray], expected: Dict[str, np.ndarray]):
+        super().__init__(headers, columns, masks)
+        self.frequency = frequency
+        self.counts = counts
+        self.expected = expected
+
+    def coverage(self, field: str) -> np.ndarray:
+        """Fracción de lecturas disponibles por periodo (0 a 1)"""
+        return (self.counts[field] / np.maximum(self.expected[field], 1)).astype(np.float32)
+
+
+def observations_to_table(data: Dict[str, np.ndarray], hourly: Optional[bool] = None) -> ColumnarTable:
+    """
+    Convierte el resultado de `ObservationStore.query` en una tabla columnar.
+
+    Args:
+        data: Diccionario con `time` (datetime64) y un arreglo por campo de medición
+        hourly: Si los datos son horarios; por defecto, si alguna lectura no es a medianoche
+    """
+    time = data["time"].astype("datetime64[s]")
+    days = time.astype("datetime64[D]")
+    months = time.astype("datetime64[M]")
+    month_values = months.astype(np.int64)
+    if hourly is None:
+        hourly = bool(np.any(time != days))
+
+    columns = {
+        "year": (month_values // 12 + 1970).astype(TIME_FIELD_DTYPES["year"]),
+        "month": (month_values % 12 + 1).astype(TIME_FIELD_DTYPES["month"]),
+        "day": ((days - months.astype("datetime64[D]")).astype(np.int64) + 1).astype(TIME_FIELD_DTYPES["day"]),
+    }
+    if hourly:
+        columns["hour"] = ((time - days).astype(np.int64) // 3600).astype(TIME_FIELD_DTYPES["hour"])
+
+    masks = {}
+    for field, values in data.items():
+        if field != "time":
+            columns[field] = values.astype(MEASUREMENT_DTYPE)
+            masks[field] = np.isnan(columns[field])
+    return ColumnarTable([FIELD_HEADERS[field] for field in columns], columns, masks)
+
+
+def _reduce(reduction: str, values: np.ndarray, valid: np.ndarray, starts: np.ndarray, counts: np.ndarray,
+            weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Aplica una reducción a cada periodo (filas desde cada índice de `starts`).
+    `values` tiene NaN donde `valid` es False
+    """
+    if reduction == "max":
+        return np.fmax.reduceat(values, starts)
+    if reduction == "min":
+        return np.fmin.reduceat(values, starts)
+    if reduction == "direction":
+        # Media vectorial: 350° y 10° promedian 0°, no 180°
+        radians = np.deg2rad(values, dtype=np.float64)
+        east = np.add.reduceat(np.where(valid, weights * np.sin(radians), 0.0), starts)
+        north = np.add.reduceat(np.where(valid, weights * np.cos(radians), 0.0), starts)
+        # Redondeo antes del módulo: un ángulo de -1e-14° debe dar 0°, no 360°
+        return np.round(np.rad2deg(np.arctan2(east, north)), 1) % 360
+    # Sumas en float64: un mes horario acumula cientos de valores float32
+    totals = np.add.reduceat(np.where(valid, values, 0), starts, dtype=np.float64)
+    if reduction == "sum":
+        return totals
+    return totals / np.maximum(counts, 1)
+
+
+def aggregate(table: ColumnarTable, frequency: str = "day",
+              min_coverage: float = settings.AGGREGATION_MIN_COVERAGE) -> AggregatedTable:
+    """
+    Agrega una tabla por día o por mes.
+
+    Args:
+        table: Tabla de una estación (horaria o diaria), en cualquier orden
+        frequency: "day" o "month"
+        min_coverage: Fracción mínima de lecturas esperadas para dar un valor al periodo
+
+    Returns:
+        AggregatedTable con year, month (y day, si es diaria) y los campos de salida de la estación
+
+    Raises:
+        ValueError: Si la frecuencia no es válida
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Frecuencia no válida: {frequency} (use {', '.join(FREQUENCIES)})")
+
+    hourly = "hour" in table.columns
+    rules = [rule for rule in RULES if rule.source in table.columns and (rule.hour is None or hourly)]
+    fields = list(dict.fromkeys(rule.field for rule in rules))
+    time_fields = ["year", "month", "day"] if frequency == "day" else ["year", "month"]
+    headers = [FIELD_HEADERS[field] for field in time_fields + fields]
+
+    keys = day_numbers(table) if frequency == "day" else month_numbers(table)
+    if not len(keys):
+        empty = {field: np.empty(0, dtype=np.int32) for field in fields}
+        result = ColumnarTable.empty(headers)
+        return AggregatedTable(headers, result.columns, result.masks, frequency, empty, dict(empty))
+
+    # Un solo ordenamiento (estable) si las filas no vienen en orden cronológico
+    order = None
+    if np.any(keys[1:] < keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    periods = keys[starts]
+
+    def column(field: str) -> np.ndarray:
+        values = table.columns[field]
+        return values if order is None else values[order]
+
+    # Lecturas esperadas por periodo: una por día (o 24 en datos horarios), o por cada día del mes
+    if frequency == "day":
+        days = np.ones(len(periods), dtype=np.int32)
+        dates = periods.astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+    else:
+        months = periods.astype("datetime64[M]")
+        days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int32)
+    readings = days * 24 if hourly else days
+
+    month_values = months.astype(np.int64)
+    columns = {
+        "year": (month_values // 12 + 1970).astype(TIME_FIELD_DTYPES["year"]),
+        "month": (month_values % 12 + 1).astype(TIME_FIELD_DTYPES["month"]),
+    }
+    if frequency == "day":
+        columns["day"] = ((dates - months.astype("datetime64[D]")).astype(np.int64) + 1).astype(TIME_FIELD_DTYPES["day"])
+
+    hours = column("hour") if hourly else None
+    weights = np.ones(len(keys))
+    if "wind_speed" in table.columns:
+        speed = column("wind_speed")
+        weights = np.where(np.isnan(speed), 1.0, speed)
+
+    # Valores, lecturas válidas y su cantidad por periodo, una vez por campo de origen (y hora)
+    sources = {}
+    masks, counts, expected = {}, {}, {}
+    for rule in rules:
+        if rule.field in columns:
+            continue  # Ya calculado con una regla anterior
+        key = (rule.source, rule.hour)
+        if key not in sources:
+            values = column(rule.source)
+            valid = ~np.isnan(values)
+            if rule.hour is not None:
+                valid &= hours == rule.hour
+                values = np.where(valid, values, np.nan)
+            sources[key] = (values, valid, np.add.reduceat(valid, starts, dtype=np.int32))
+        values, valid, counts[rule.field] = sources[key]
+        expected[rule.field] = days if rule.hour is not None else readings
+
+        result = _reduce(rule.reduction, values, valid, starts, counts[rule.field], weights).astype(MEASUREMENT_DTYPE)
+        masks[rule.field] = (counts[rule.field] == 0) | (counts[rule.field] < min_coverage * expected[rule.field])
+        result[masks[rule.field]] = np.nan
+        columns[rule.field] = result
+
+    return AggregatedTable(headers, columns, masks, frequency, counts, expected)
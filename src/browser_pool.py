@@ -0,0 +1,209 @@
+"""
+Pool de navegadores reutilizables entre estaciones.
+
+Iniciar zendriver y superar Cloudflare Turnstile cuesta varios segundos. El pool
+mantiene navegadores ya iniciados que se prestan a cada estación: al terminar, el
+navegador vuelve al pool con su autorización vigente y la siguiente estación solo
+paga la navegación a su página. Antes de cada préstamo se verifica que el navegador
+responda, y se recicla tras `BROWSER_MAX_JOBS` estaciones o al superar
+`BROWSER_MAX_MEMORY_MB` de memoria. Con BROWSER_PROFILE_MODE cada navegador toma una
+ranura de perfil persistente, de modo que la autorización también sobrevive al proceso.
+"""
+
+import asyncio
+import os
+import settings
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from src.browser_profile import ProfileSlot, ProfileStore
+from src.metrics import recorder
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_table() -> tuple:
+    """Hijos y RSS (bytes) de cada proceso, leídos de /proc (solo Linux)"""
+    children: Dict[int, List[int]] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)  # fields[1] = PPID
+        rss[pid] = int(fields[21]) * PAGE_SIZE               # fields[21] = RSS en páginas
+    return children, rss
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """
+    Memoria RSS (bytes) de un proceso y todos sus descendientes; None si no se puede medir
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    children, rss = process_table()
+    if pid not in rss:
+        return None
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += rss.get(current, 0)
+        pending.extend(children.get(current, []))
+    return total
+
+
+async def start_zendriver(**kwargs) -> Any:
+    """Inicia un navegador de zendriver (importación diferida)"""
+    import zendriver as zd
+
+    return await zd.start(**kwargs)
+
+
+class PooledBrowser:
+    """Navegador del pool junto con su historial de uso"""
+
+    def __init__(self, browser: Any, number: int, profile: Optional[ProfileSlot] = None):
+        self.browser = browser
+        self.number = number
+        self.profile = profile
+        self.jobs = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return getattr(self.browser, "_process_pid", None)
+
+
+class BrowserPool:
+    """
+    Presta navegadores ya iniciados a las estaciones.
+
+    Uso:
+        async with BrowserPool(size=2) as pool:
+            async with pool.lease() as browser:
+                await scrape_station(browser, station, query_params)
+    """
+
+    def __init__(self, size: int = settings.BROWSER_POOL_SIZE, max_jobs: int = settings.BROWSER_MAX_JOBS,
+                 max_memory_mb: Optional[float] = settings.BROWSER_MAX_MEMORY_MB,
+                 health_timeout: float = settings.BROWSER_HEALTH_TIMEOUT,
+                 start_browser: Callable[..., Awaitable[Any]] = start_zendriver,
+                 browser_kwargs: Optional[Dict[str, Any]] = None, profiles: Optional[ProfileStore] = None):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_memory_mb = max_memory_mb
+        self.health_timeout = health_timeout
+        self.start_browser = start_browser
+        self.browser_kwargs = browser_kwargs or {}
+        self.profiles = profiles if profiles is not None else ProfileStore()
+        self.launched = 0
+        self.recycled = 0
+        self._idle: List[PooledBrowser] = []
+        # Un préstamo por navegador: los navegadores vivos nunca superan `size`
+        self._slots = asyncio.Semaphore(size)
+        self._closed = False
+
+    async def _launch(self) -> PooledBrowser:
+        profile = self.profiles.acquire(self.browser_kwargs)
+        try:
+            with recorder.span("browser_start"):
+                browser = await self.start_browser(**self.profiles.launch_kwargs(profile, self.browser_kwargs))
+        except BaseException:
+            if profile is not None:
+                profile.release()
+            raise
+        self.launched += 1
+        print(f"🌐 Navegador {self.launched} iniciado")
+        await self.profiles.restore(browser, profile)
+        return PooledBrowser(browser, self.launched, profile)
+
+    async def _is_healthy(self, instance: PooledBrowser) -> bool:
+        """El proceso sigue vivo y responde al endpoint de DevTools"""
+        if getattr(instance.browser, "stopped", False):
+            return False
+        try:
+            return bool(await asyncio.wait_for(instance.browser.test_connection(), self.health_timeout))
+        except Exception:
+            return False
+
+    def _memory_mb(self, instance: PooledBrowser) -> Optional[float]:
+        if instance.pid is None:
+            return None
+        rss = process_tree_rss(instance.pid)
+        return rss / 1024 ** 2 if rss is not None else None
+
+    async def _stop(self, instance: PooledBrowser) -> None:
+        try:
+            await instance.browser.stop()
+        except Exception as e:
+            print(f"{settings.WARNING} Error cerrando navegador {instance.number}: {e}")
+        finally:
+            # El perfil queda libre solo cuando Chrome ya no lo usa
+            if instance.profile is not None:
+                instance.profile.release()
+
+    async def _retire(self, instance: PooledBrowser, reason: str) -> None:
+        self.recycled += 1
+        print(f"♻️  Reciclando navegador {instance.number} ({reason})")
+        await self._stop(instance)
+
+    async def _acquire(self) -> PooledBrowser:
+        while self._idle:
+            instance = self._idle.pop()
+            if await self._is_healthy(instance):
+                return instance
+            await self._retire(instance, "no responde")
+        return await self._launch()
+
+    async def _release(self, instance: PooledBrowser) -> None:
+        instance.jobs += 1
+        # Exportar la autorización vigente para los próximos procesos
+        await self.profiles.save(instance.browser, instance.profile)
+        memory_mb = self._memory_mb(instance) if self.max_memory_mb else None
+
+        if self._closed:
+            await self._retire(instance, "pool cerrado")
+        elif self.max_jobs and instance.jobs >= self.max_jobs:
+            await self._retire(instance, f"{instance.jobs} estaciones")
+        elif memory_mb is not None and memory_mb > self.max_memory_mb:
+            await self._retire(instance, f"{memory_mb:.0f} MB")
+        else:
+            self._idle.append(instance)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Any]:
+        """
+        Presta un navegador sano; al salir del bloque vuelve al pool o se recicla
+        """
+        if self._closed:
+            raise RuntimeError("El pool de navegadores está cerrado")
+        async with self._slots:
+            instance = await self._acquire()
+            try:
+                yield instance.browser
+            finally:
+                await self._release(instance)
+
+    async def warm(self, count: Optional[int] = None) -> None:
+        """
+        Inicia navegadores por adelantado (por defecto, hasta completar el pool)
+        """
+        missing = min(count or self.size, self.size) - len(self._idle)
+        if missing > 0:
+            self._idle.extend(await asyncio.gather(*(self._launch() for _ in range(missing))))
+
+    async def close(self) -> None:
+        """Cierra los navegadores libres; los prestados se cierran al devolverse"""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for instance in idle:
+            await self._stop(instance)
+
+    async def __aenter__(self) -> "BrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
@@ -0,0 +1,234 @@
+"""
+Perfil persistente del navegador para reutilizar la autorización de Cloudflare entre ejecuciones.
+
+Cada proceso nuevo de zendriver parte de un perfil temporal y vuelve a resolver Turnstile.
+Con BROWSER_PROFILE_MODE la sesión se conserva:
+
+- "profile": cada navegador usa un directorio de datos (user-data-dir) persistente.
+- "cookies": el perfil es temporal; las cookies del sitio se cargan desde un archivo JSON.
+
+En ambos modos las cookies del sitio se exportan al devolver el navegador al pool. Los
+perfiles se separan por la configuración que afecta a la autorización (sitio, ejecutable y
+modo headless, que cambia el user agent) y se dividen en ranuras protegidas con un bloqueo
+de archivo, para que dos navegadores o dos procesos nunca compartan el mismo directorio.
+Al iniciar se revisa la vigencia de la cookie cf_clearance: si venció, falta o fue emitida
+para otro user agent, se descarta y el desafío se resuelve en la primera página.
+"""
+
+import hashlib
+import json
+import os
+import time
+import settings
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from src.http_fetcher import cookie_matches_host
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+COOKIE_FILE = "cookies.json"
+LOCK_FILE = ".lock"
+USER_DATA_DIR = "chrome"
+
+
+def _try_lock(handle) -> bool:
+    """Bloqueo exclusivo sin espera; se libera al cerrar el archivo o terminar el proceso"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def clearance_expiry(cookies: List[Dict[str, Any]], name: str = settings.CLEARANCE_COOKIE) -> Optional[float]:
+    """
+    Vencimiento (epoch) de la cookie de autorización; None si no existe.
+    Una cookie de sesión (sin vencimiento) se considera vigente mientras dure el perfil.
+    """
+    for cookie in cookies:
+        if cookie.get("name") == name:
+            expires = cookie.get("expires")
+            return float("inf") if expires is None or expires < 0 else float(expires)
+    return None
+
+
+class ProfileSlot:
+    """Ranura de perfil bloqueada por un navegador"""
+
+    def __init__(self, path: str, handle, mode: str):
+        self.path = path
+        self.mode = mode
+        self._handle = handle
+
+    @property
+    def user_data_dir(self) -> Optional[str]:
+        return os.path.join(self.path, USER_DATA_DIR) if self.mode == "profile" else None
+
+    @property
+    def cookie_file(self) -> str:
+        return os.path.join(self.path, COOKIE_FILE)
+
+    def release(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class ProfileStore:
+    """
+    Perfiles persistentes por configuración del scraper.
+
+    Uso (lo hace BrowserPool):
+        slot = store.acquire(browser_kwargs)
+        browser = await zd.start(**store.launch_kwargs(slot, browser_kwargs))
+        await store.restore(browser, slot)
+        ...
+        await store.save(browser, slot)
+        slot.release()
+    """
+
+    def __init__(self, mode: Optional[str] = settings.BROWSER_PROFILE_MODE,
+                 root: str = settings.BROWSER_PROFILE_DIR, max_slots: int = settings.BROWSER_PROFILE_SLOTS,
+                 min_ttl: float = settings.CLEARANCE_MIN_TTL, base_url: str = settings.BASE_URL,
+                 clock: Callable[[], float] = time.time):
+        if mode not in (None, "profile", "cookies"):
+            raise ValueError(f"Modo de perfil no soportado: {mode}")
+        self.mode = mode
+        self.root = root
+        self.max_slots = max_slots
+        self.min_ttl = min_ttl
+        self.host = urlparse(base_url).hostname or ""
+        self.clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def profile_dir(self, browser_kwargs: Dict[str, Any]) -> str:
+        """Directorio de perfiles para una configuración (sitio, ejecutable y headless)"""
+        config = {
+            "host": self.host,
+            "headless": bool(browser_kwargs.get("headless", False)),
+            "browser": browser_kwargs.get("browser_executable_path"),
+        }
+        digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:10]
+        return os.path.join(self.root, f"{self.host}-{digest}")
+
+    def acquire(self, browser_kwargs: Dict[str, Any]) -> Optional[ProfileSlot]:
+        """
+        Bloquea la primera ranura libre; None si el modo está desactivado o todas están en uso
+        """
+        if not self.enabled:
+            return None
+        base = self.profile_dir(browser_kwargs)
+        for number in range(self.max_slots):
+            path = os.path.join(base, str(number))
+            os.makedirs(path, exist_ok=True)
+            handle = open(os.path.join(path, LOCK_FILE), "a+")
+            if _try_lock(handle):
+                return ProfileSlot(path, handle, self.mode)
+            handle.close()
+        print(f"{settings.WARNING} Los {self.max_slots} perfiles están en uso; se usará un perfil temporal")
+        return None
+
+    def launch_kwargs(self, slot: Optional[ProfileSlot], browser_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs = dict(browser_kwargs)
+        if slot is not None and slot.user_data_dir:
+            kwargs["user_data_dir"] = slot.user_data_dir
+        return kwargs
+
+    def _site_cookies(self, cookies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [cookie for cookie in cookies if cookie_matches_host(self.host, cookie.get("domain", ""))]
+
+    def is_valid(self, expiry: Optional[float]) -> bool:
+        """La autorización existe y le quedan al menos CLEARANCE_MIN_TTL segundos"""
+        return expiry is not None and expiry - self.clock() >= self.min_ttl
+
+    def load_jar(self, slot: ProfileSlot) -> Optional[Dict[str, Any]]:
+        try:
+            with open(slot.cookie_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    async def restore(self, browser, slot: Optional[ProfileSlot]) -> Optional[float]:
+        """
+        Deja en el navegador una autorización vigente si la hay, y descarta la vencida.
+
+        Returns:
+            Vencimiento (epoch) de la autorización reutilizada; None si habrá que resolver el desafío
+        """
+        if slot is None:
+            return None
+        from zendriver import cdp
+
+        try:
+            user_agent = await browser.main_tab.evaluate("navigator.userAgent")
+            jar = self.load_jar(slot) or {}
+            # cf_clearance solo vale para el user agent que resolvió el desafío
+            same_agent = jar.get("user_agent") == user_agent
+            current = self._site_cookies([cookie.to_json() for cookie in await browser.cookies.get_all()])
+            expiry = clearance_expiry(current)
+            if self.mode == "profile" and same_agent and self.is_valid(expiry):
+                self._report(expiry)
+                return expiry
+            if expiry is not None:
+                # El perfil conserva la cookie vencida o de otro user agent: se borra del navegador
+                await self._delete_clearance(browser, current)
+
+            now = self.clock()
+            cookies = [cookie for cookie in self._site_cookies(jar.get("cookies", []))
+                       if cookie.get("expires", -1) < 0 or cookie["expires"] > now]
+            expiry = clearance_expiry(cookies)
+            if not self.is_valid(expiry) or not same_agent:
+                cookies = [cookie for cookie in cookies if cookie["name"] != settings.CLEARANCE_COOKIE]
+                expiry = None
+            if cookies:
+                await browser.cookies.set_all([cdp.network.CookieParam.from_json(cookie) for cookie in cookies])
+        except Exception as e:
+            print(f"{settings.WARNING} No se pudo restaurar la sesión del perfil: {e}")
+            return None
+
+        self._report(expiry)
+        return expiry
+
+    @staticmethod
+    async def _delete_clearance(browser, cookies: List[Dict[str, Any]]) -> None:
+        """Borra del navegador (Network.deleteCookies) cada cf_clearance del sitio"""
+        from zendriver import cdp
+
+        for cookie in cookies:
+            if cookie.get("name") == settings.CLEARANCE_COOKIE:
+                await browser.main_tab.send(cdp.network.delete_cookies(
+                    name=cookie["name"], domain=cookie.get("domain"), path=cookie.get("path")))
+
+    def _report(self, expiry: Optional[float]) -> None:
+        if expiry is None:
+            print("🔑 Sin autorización de Cloudflare vigente: se resolverá el desafío")
+        elif expiry == float("inf"):
+            print("🔑 Autorización de Cloudflare reutilizada (cookie de sesión)")
+        else:
+            print(f"🔑 Autorización de Cloudflare reutilizada (vence {datetime.fromtimestamp(expiry):%Y-%m-%d %H:%M})")
+
+    async def save(self, browser, slot: Optional[ProfileSlot]) -> None:
+        """Exporta las cookies del sitio y el user agent a la ranura (escritura atómica)"""
+        if slot is None:
+            return
+        try:
+            user_agent = await browser.main_tab.evaluate("navigator.userAgent")
+            cookies = self._site_cookies([cookie.to_json() for cookie in await browser.cookies.get_all()])
+            jar = {"saved_at": self.clock(), "user_agent": user_agent, "cookies": cookies}
+            temp_path = f"{slot.cookie_file}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(jar, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, slot.cookie_file)
+        except Exception as e:
+            print(f"{settings.WARNING} No se pudieron guardar las cookies del perfil: {e}")
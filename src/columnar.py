@@ -0,0 +1,180 @@
+"""
+Decodificación columnar de las tablas del SENAMHI.
+
+Convierte las filas de una tabla mensual en un arreglo NumPy tipado por columna,
+según los headers de `models/data_schema.py`: año/mes/día como int16, hora como
+uint8 y mediciones como float32. Los valores sin dato (S/D) quedan como NaN y se
+marcan en una máscara por columna.
+"""
+
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from src.html_utils import extract_table_rows, _date_format
+from src.models.data_schema import get_column_dtypes, TIME_FIELD_DTYPES
+
+# Valores que la tabla usa para indicar ausencia de dato
+MISSING_VALUES = ("S/D", "", "-")
+
+HOUR_PATTERN = re.compile(r'^(\d{1,2})(?::\d{2})?$')
+
+
+class ColumnarTable:
+    """
+    Datos de una o varias tablas mensuales como arreglos tipados por columna.
+
+    Atributos:
+        headers: Headers CSV de la estación
+        columns: Arreglo por nombre de campo (year, month, day, hour, temperature, ...)
+        masks: Máscara booleana por campo de medición, True donde el valor no está disponible
+    """
+
+    def __init__(self, headers: List[str], columns: Dict[str, np.ndarray], masks: Dict[str, np.ndarray]):
+        self.headers = headers
+        self.columns = columns
+        self.masks = masks
+
+    @classmethod
+    def empty(cls, headers: List[str]) -> "ColumnarTable":
+        """Crea una tabla sin filas con los tipos de la estación"""
+        dtypes = get_column_dtypes(headers)
+        columns = {field: np.empty(0, dtype=dtype) for field, dtype in dtypes.items()}
+        masks = {field: np.empty(0, dtype=bool) for field in columns if field not in TIME_FIELD_DTYPES}
+        return cls(headers, columns, masks)
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos de datos y máscaras"""
+        return sum(array.nbytes for array in self.columns.values()) + sum(mask.nbytes for mask in self.masks.values())
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+
+def _decode_measurements(values: List[str], dtype: str) -> np.ndarray:
+    """Convierte una columna de texto a números, con NaN para los valores sin dato"""
+    text = np.array(values, dtype=str)
+    text[np.isin(text, MISSING_VALUES)] = "nan"
+    try:
+        return text.astype(dtype)
+    except ValueError:
+        # Valores no numéricos inesperados: conversión celda por celda
+        result = np.empty(len(values), dtype=dtype)
+        for index, value in enumerate(text):
+            try:
+                result[index] = float(value)
+            except ValueError:
+                result[index] = np.nan
+        return result
+
+
+def decode_table_rows(rows: List[List[str]], headers: List[str], start_line: Optional[int] = 0) -> ColumnarTable:
+    """
+    Decodifica las filas extraídas de una tabla en columnas tipadas.
+
+    Args:
+        rows: Texto de las celdas por fila, incluidas las de encabezado (ver `extract_table_rows`)
+        headers: Headers CSV de la estación, que definen los campos y sus tipos
+        start_line: Índice de la primera fila de datos
+
+    Returns:
+        ColumnarTable con una entrada por fila válida
+    """
+    dtypes = get_column_dtypes(headers)
+    fields = list(dtypes)
+    has_hour = "hour" in dtypes
+    measurement_fields = fields[4:] if has_hour else fields[3:]
+    expected_cells = len(fields) - 2  # La fecha ocupa una sola celda en la tabla
+
+    years, months, days, hours = [], [], [], []
+    measurements: List[List[str]] = [[] for _ in measurement_fields]
+
+    for row_index, cells in enumerate(rows):
+        if (start_line and row_index < start_line) or len(cells) != expected_cells:
+            continue
+
+        date = _date_format(cells[0])
+        if date is None:
+            continue
+
+        values = cells[1:]
+        if has_hour:
+            hour_match = HOUR_PATTERN.match(values[0])
+            if not hour_match:
+                continue
+            hours.append(int(hour_match.group(1)))
+            values = values[1:]
+
+        years.append(date[0])
+        months.append(date[1])
+        days.append(date[2])
+        for column, value in zip(measurements, values):
+            column.append(value)
+
+    columns = {
+        "year": np.array(years, dtype=dtypes["year"]),
+        "month": np.array(months, dtype=dtypes["month"]),
+        "day": np.array(days, dtype=dtypes["day"]),
+    }
+    if has_hour:
+        columns["hour"] = np.array(hours, dtype=dtypes["hour"])
+
+    masks = {}
+    for field, values in zip(measurement_fields, measurements):
+        columns[field] = _decode_measurements(values, dtypes[field])
+        masks[field] = np.isnan(columns[field])
+
+    return ColumnarTable(headers, columns, masks)
+
+
+def decode_table_html(html_content: str, headers: List[str], start_line: Optional[int] = 0) -> ColumnarTable:
+    """
+    Decodifica el HTML de una tabla mensual en columnas tipadas.
+
+    Args:
+        html_content: HTML de la tabla de datos
+        headers: Headers CSV de la estación
+        start_line: Índice de la primera fila de datos
+
+    Returns:
+        ColumnarTable con los datos del mes
+    """
+    return decode_table_rows(extract_table_rows(html_content), headers, start_line)
+
+
+def concat_tables(tables: Iterable[ColumnarTable]) -> ColumnarTable:
+    """
+    Concatena varias tablas mensuales de la misma estación en una sola.
+
+    Raises:
+        ValueError: Si la lista está vacía o las tablas tienen campos distintos
+    """
+    tables = list(tables)
+    if not tables:
+        raise ValueError("No hay tablas para concatenar")
+
+    fields = tables[0].fields
+    if any(table.fields != fields for table in tables[1:]):
+        raise ValueError("Las tablas a concatenar deben tener los mismos campos")
+
+    columns = {field: np.concatenate([table.columns[field] for table in tables]) for field in fields}
+    masks = {field: np.concatenate([table.masks[field] for table in tables]) for field in tables[0].masks}
+    return ColumnarTable(tables[0].headers, columns, masks)
+
+
+def month_numbers(table: ColumnarTable) -> np.ndarray:
+    """Meses transcurridos desde enero de 1970 en cada fila"""
+    return (table["year"].astype(np.int64) - 1970) * 12 + table["month"].astype(np.int64) - 1
+
+
+def day_numbers(table: ColumnarTable) -> np.ndarray:
+    """Días transcurridos desde el 1 de enero de 1970 en cada fila"""
+    first_days = month_numbers(table).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    return first_days + table["day"].astype(np.int64) - 1
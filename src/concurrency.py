@@ -0,0 +1,37 @@
+"""
+Utilidades de concurrencia para el procesamiento de opciones en paralelo.
+"""
+
+from typing import Any, Dict, List
+
+
+class ReorderBuffer:
+    """
+    Reordena resultados que llegan fuera de orden.
+
+    Cada resultado se identifica con el índice de su opción dentro de la lista
+    filtrada. Los resultados solo se liberan cuando todos los índices anteriores
+    ya fueron liberados, de modo que el consumidor los recibe en orden cronológico.
+    """
+
+    def __init__(self, start_index: int = 0):
+        self.next_index = start_index
+        self.pending: Dict[int, Any] = {}
+
+    def push(self, index: int, item: Any) -> List[Any]:
+        """
+        Registra el resultado de un índice y retorna los resultados listos en orden
+        """
+        if index < self.next_index or index in self.pending:
+            raise ValueError(f"Índice duplicado en el buffer de reordenamiento: {index}")
+
+        self.pending[index] = item
+
+        ready = []
+        while self.next_index in self.pending:
+            ready.append(self.pending.pop(self.next_index))
+            self.next_index += 1
+        return ready
+
+    def __len__(self) -> int:
+        return len(self.pending)
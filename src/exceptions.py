@@ -20,4 +20,8 @@ class SelectNotFoundError(ScrapingError):
 
 class OptionProcessingError(ScrapingError):
     """Error al procesar una opción específica"""
+    pass
+
+class ClearanceExpiredError(ScrapingError):
+    """Error cuando la autorización de Cloudflare ya no es válida para peticiones HTTP directas"""
     pass
\ No newline at end of file
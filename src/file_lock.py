@@ -0,0 +1,41 @@
+"""
+Bloqueo exclusivo entre procesos para archivos compartidos que se leen, combinan y reemplazan.
+
+Varios workers (worker.py) o navegadores pueden guardar meses de la misma estación a la vez.
+El manifiesto de sincronización y las particiones Parquet se reescriben completos: sin un
+bloqueo, el último en escribir descartaría los meses que guardó el otro. El bloqueo se toma
+sobre un archivo aparte que se conserva entre ejecuciones.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def exclusive_lock(lock_path: str) -> Iterator[None]:
+    """
+    Espera el bloqueo exclusivo de `lock_path` y lo mantiene durante el bloque `with`.
+    Se libera al salir o si el proceso termina
+    """
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
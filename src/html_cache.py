@@ -0,0 +1,176 @@
+"""
+Caché en disco del HTML crudo de las tablas, por estación y periodo YYYYMM.
+
+El contenido se guarda comprimido y direccionado por su hash SHA-256 en
+`objects/`, de modo que tablas idénticas ocupan un solo archivo. Cada par
+(estación, periodo) tiene una referencia en `refs/<código>/<YYYYMM>.json` con el
+hash y la fecha de almacenamiento. Al no existir un índice global, varios
+procesos pueden escribir en la misma caché sin coordinarse.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import settings
+import time
+from collections import Counter
+from typing import Iterator, List, Optional, Tuple
+
+
+class HtmlCache:
+    """
+    Caché comprimida del HTML de las tablas con expiración y límite de tamaño
+    """
+
+    def __init__(self, directory: str = settings.HTML_CACHE_DIR,
+                 ttl_days: Optional[float] = settings.HTML_CACHE_TTL_DAYS,
+                 max_bytes: Optional[int] = settings.HTML_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(directory, "objects")
+        self.refs_dir = os.path.join(directory, "refs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    def _ref_path(self, station_code: str, period: str) -> str:
+        return os.path.join(self.refs_dir, station_code.upper(), f"{period}.json")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _read_ref(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_expired(self, ref: dict, now: Optional[float] = None) -> bool:
+        return self.ttl_seconds is not None and (now or time.time()) - ref["stored_at"] > self.ttl_seconds
+
+    def put(self, station_code: str, period: str, html_content: str, reconstructed: bool = False) -> str:
+        """
+        Guarda el HTML de la tabla de un periodo y retorna su hash. `reconstructed` indica que no es
+        la respuesta del servidor sino una tabla mínima armada con las filas ya extraídas
+        """
+        data = html_content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, gzip.compress(data, compresslevel=6))
+
+        ref = {"sha256": digest, "stored_at": time.time(), "size": len(data)}
+        if reconstructed:
+            ref["reconstructed"] = True
+        self._write_atomic(self._ref_path(station_code, period), json.dumps(ref).encode('utf-8'))
+        return digest
+
+    def get(self, station_code: str, period: str) -> Optional[str]:
+        """
+        Retorna el HTML guardado de un periodo, o None si no existe o expiró
+        """
+        ref = self._read_ref(self._ref_path(station_code, period))
+        if ref is None or self._is_expired(ref):
+            return None
+        try:
+            with open(self._object_path(ref["sha256"]), 'rb') as f:
+                return gzip.decompress(f.read()).decode('utf-8')
+        except OSError:
+            return None
+
+    def stations(self) -> List[str]:
+        """Códigos de las estaciones con tablas en la caché"""
+        return sorted(entry.name for entry in os.scandir(self.refs_dir) if entry.is_dir())
+
+    def periods(self, station_code: str) -> List[str]:
+        """Periodos YYYYMM vigentes de una estación, en orden cronológico"""
+        station_dir = os.path.join(self.refs_dir, station_code.upper())
+        if not os.path.isdir(station_dir):
+            return []
+        now = time.time()
+        periods = []
+        for entry in os.scandir(station_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            ref = self._read_ref(entry.path)
+            if ref is not None and not self._is_expired(ref, now):
+                periods.append(entry.name[:-len(".json")])
+        return sorted(periods)
+
+    def _iter_refs(self) -> Iterator[Tuple[str, dict]]:
+        for station_dir in os.scandir(self.refs_dir):
+            if not station_dir.is_dir():
+                continue
+            for entry in os.scandir(station_dir.path):
+                if entry.name.endswith(".json"):
+                    ref = self._read_ref(entry.path)
+                    if ref is not None:
+                        yield entry.path, ref
+
+    def evict(self) -> int:
+        """
+        Elimina las referencias expiradas y, si la caché supera `max_bytes`, las más
+        antiguas hasta respetar el límite. Luego borra los objetos sin referencias.
+
+        Returns:
+            Número de referencias eliminadas
+        """
+        now = time.time()
+        live, removed = [], 0
+        for path, ref in self._iter_refs():
+            if self._is_expired(ref, now):
+                removed += self._remove(path)
+            else:
+                live.append((ref["stored_at"], path, ref["sha256"]))
+
+        object_sizes = {}
+        for prefix_dir in os.scandir(self.objects_dir):
+            if prefix_dir.is_dir():
+                for entry in os.scandir(prefix_dir.path):
+                    if not entry.name.endswith(".html.gz"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # Otro proceso lo eliminó
+                    object_sizes[entry.name.split('.', 1)[0]] = (entry.path, stat.st_size, stat.st_mtime)
+
+        ref_counts = Counter(digest for _, _, digest in live)
+        if self.max_bytes is not None:
+            total = sum(size for digest, (_, size, _) in object_sizes.items() if digest in ref_counts)
+            live.sort()
+            for _, path, digest in live:
+                if total <= self.max_bytes:
+                    break
+                removed += self._remove(path)
+                ref_counts[digest] -= 1
+                if ref_counts[digest] == 0:
+                    del ref_counts[digest]
+                    total -= object_sizes.get(digest, (None, 0, None))[1]
+
+        # Los objetos recientes pueden pertenecer a una escritura en curso de otro proceso
+        for digest, (path, _, modified_at) in object_sizes.items():
+            if digest not in ref_counts and now - modified_at > 60:
+                self._remove(path)
+
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        """Elimina un archivo; False si otro proceso (otro evict) ya lo eliminó"""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
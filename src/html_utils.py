@@ -1,11 +1,35 @@
 import settings
 import re
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from html import escape, unescape
+from typing import List, Optional, Union
 
 # Constante para el parser HTML
 HTML_PARSER = 'html.parser'
 
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DATE_PATTERN = re.compile(r'^(\d{4})([-/])(\d{2})\2(\d{2})$')
+
+# Tokens del HTML: comentarios, etiquetas de apertura/cierre y texto
+TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->|<(/?)([a-zA-Z][^\s/>]*)(?:[^>"\']|"[^"]*"|\'[^\']*\')*>|([^<]+|<)',
+    re.DOTALL
+)
+CELL_TAGS = ('td', 'th')
+# Bloques cuyo contenido no es texto visible: se reemplazan por un comentario vacío,
+# que separa el texto anterior del siguiente igual que la etiqueta original
+RAW_TEXT_PATTERN = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+EMPTY_COMMENT = '<!---->'
+
+# Contenido de una tabla descargada: su HTML o sus filas ya extraídas en la página
+TableContent = Union[str, List[List[str]]]
+
+# Separadores del texto que retorna la extracción de filas en la página (ver split_table_rows)
+ROW_SEPARATOR = '\x1e'
+CELL_TERMINATOR = '\x1f'
+
+# Primera celda con fecha YYYY-MM-DD o YYYY/MM/DD dentro del HTML de una tabla
+FIRST_DATE_CELL_PATTERN = re.compile(r'<t[dh][^>]*>\s*(?:<[^>]+>\s*)*(\d{4})([-/])(\d{2})\2\d{2}\s*<')
+
 def extract_select_options(html_content: str, select_id: Optional[str] = None, select_name: Optional[str] = None) -> List[dict]:
     """
     Extrae los valores y textos de las opciones de un select.
@@ -21,7 +45,8 @@ def extract_select_options(html_content: str, select_id: Optional[str] = None, s
     Raises:
         ValueError: Si no se encuentra ningún select con los criterios especificados
     """
-    
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html_content, HTML_PARSER)
     
     # Buscar el select específico
@@ -61,21 +86,145 @@ def extract_select_options(html_content: str, select_id: Optional[str] = None, s
     
     return result
 
+def table_period(html_content: str) -> Optional[str]:
+    """
+    Retorna el periodo YYYYMM de la primera fecha de la tabla, o None si la tabla no contiene fechas.
+    """
+    match = FIRST_DATE_CELL_PATTERN.search(html_content)
+    if not match:
+        return None
+    return f"{match.group(1)}{match.group(3)}"
+
+def rows_period(rows: List[List[str]]) -> Optional[str]:
+    """
+    Equivalente a `table_period` para filas ya extraídas: periodo YYYYMM de la primera celda con fecha
+    """
+    for cells in rows:
+        for cell in cells:
+            match = DATE_PATTERN.match(cell)
+            if match:
+                return f"{match.group(1)}{match.group(3)}"
+    return None
+
+def extract_table_html(html_content: str, table_id: str) -> Optional[str]:
+    """
+    Extrae el HTML de la tabla con el ID indicado desde una página completa.
+    Retorna None si la tabla no existe.
+    """
+    match = re.search(rf'<table\b[^>]*\bid=["\']?{re.escape(table_id)}\b', html_content, re.IGNORECASE)
+    if not match:
+        return None
+    end = html_content.lower().find('</table>', match.end())
+    if end == -1:
+        return html_content[match.start():]
+    return html_content[match.start():end + len('</table>')]
+
 def _date_format(date_str: str) -> Optional[tuple]:
     """Verifica si una cadena es una fecha válida en formato YYYY-MM-DD o YYYY/MM/DD, y extraer año, mes, día"""
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str) or re.match(r'^\d{4}/\d{2}/\d{2}$', date_str):
-        year, month, day = date_str.split('-') if '-' in date_str else date_str.split('/')
-        if 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-            return int(year), int(month), int(day)
+    match = DATE_PATTERN.match(date_str)
+    if match:
+        year, month, day = int(match.group(1)), int(match.group(3)), int(match.group(4))
+        if 1 <= month <= 12 and 1 <= day <= 31:
+            return year, month, day
     return None
 
-def _process_table_row(row, row_index, separator):
-    cells = row.find_all(['td', 'th'])
+def extract_table_rows(html_content: str) -> List[List[str]]:
+    """
+    Extrae el texto de las celdas de cada fila de la primera tabla del HTML.
+
+    Recorre los tokens del HTML con una expresión regular precompilada, sin construir
+    el árbol DOM. El texto de cada celda es equivalente a `cell.get_text(strip=True)`
+    con los espacios internos colapsados: cada texto entre dos etiquetas o comentarios
+    se recorta por separado y se omite el contenido de <script> y <style>. Las filas
+    de una tabla anidada no se separan: su texto queda en la celda que la contiene.
+
+    Args:
+        html_content (str): El contenido HTML que contiene la tabla
+
+    Returns:
+        List[List[str]]: Una lista por fila (incluidas las de encabezado) con el texto de sus celdas
+    """
+    rows: List[List[str]] = []
+    row: Optional[List[str]] = None
+    cell: Optional[List[str]] = None
+    pending = ''
+    table_depth = 0
+
+    for closing, tag, text in TOKEN_PATTERN.findall(RAW_TEXT_PATTERN.sub(EMPTY_COMMENT, html_content)):
+        if text:
+            # Un '<' suelto llega como token aparte: se une al texto contiguo antes de recortarlo
+            if cell is not None:
+                pending += text
+            continue
+        if pending:
+            text = (unescape(pending) if '&' in pending else pending).strip()
+            if text:
+                cell.append(text)
+            pending = ''
+        if not tag:
+            continue
+
+        tag = tag.lower()
+        if tag == 'table':
+            table_depth += -1 if closing else 1
+            if not table_depth:
+                break
+        elif table_depth != 1:
+            continue
+        elif tag == 'tr':
+            if cell is not None:
+                row.append(WHITESPACE_PATTERN.sub(' ', ''.join(cell)))
+                cell = None
+            if row is not None:
+                rows.append(row)
+            row = None if closing else []
+        elif tag in CELL_TAGS and row is not None:
+            if cell is not None:
+                row.append(WHITESPACE_PATTERN.sub(' ', ''.join(cell)))
+            cell = None if closing else []
+
+    if pending:
+        text = (unescape(pending) if '&' in pending else pending).strip()
+        if text:
+            cell.append(text)
+    if row is not None:
+        if cell is not None:
+            row.append(WHITESPACE_PATTERN.sub(' ', ''.join(cell)))
+        rows.append(row)
+
+    return rows
+
+def split_table_rows(payload: str) -> List[List[str]]:
+    """
+    Convierte el texto retornado por el script de extracción en la página en filas de celdas.
+
+    Cada fila llega separada por ROW_SEPARATOR y cada celda termina en CELL_TERMINATOR, de modo
+    que una fila vacía y una fila con una sola celda vacía se distinguen. El texto de las celdas
+    ya viene normalizado igual que en `extract_table_rows`.
+    """
+    if not payload:
+        return []
+    return [row.split(CELL_TERMINATOR)[:-1] for row in payload.split(ROW_SEPARATOR)]
+
+def table_rows_to_html(rows: List[List[str]], table_id: str = settings.TABLE_ID) -> str:
+    """
+    Reconstruye una tabla HTML mínima a partir de filas extraídas, para guardarla en la caché.
+    `extract_table_rows` sobre el resultado retorna las mismas filas.
+    """
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{escape(cell, quote=False)}</td>' for cell in cells) + '</tr>\n'
+        for cells in rows
+    )
+    return f'<table id="{table_id}">\n{body}</table>'
+
+def _normalize_row(cells: List[str], row_index: int, separator: str) -> Optional[List[str]]:
+    """
+    Normaliza el texto de las celdas de una fila: separa la fecha en año, mes y día
+    y reemplaza los valores sin dato (S/D) por 0.0
+    """
     row_data = []
 
-    for cell_idx, cell in enumerate(cells):
-        cell_text = cell.get_text(strip=True)
-        cell_text = re.sub(r'\s+', ' ', cell_text)
+    for cell_idx, cell_text in enumerate(cells):
         if separator in cell_text:
             cell_text = f'"{cell_text}"'
 
@@ -90,9 +239,36 @@ def _process_table_row(row, row_index, separator):
             row_data.append("0.0" if cell_text == "S/D" else cell_text)
     return row_data if row_data and any(cell.strip() for cell in row_data) else None
 
+def _process_table_row(row, row_index, separator):
+    cells = [WHITESPACE_PATTERN.sub(' ', cell.get_text(strip=True)) for cell in row.find_all(['td', 'th'], recursive=False)]
+    return _normalize_row(cells, row_index, separator)
+
+def table_rows_to_csv(rows: List[List[str]], separator: str = settings.CSV_SEPARATOR, start_line: Optional[int] = 0) -> str:
+    """
+    Convierte las filas extraídas de una tabla a formato CSV.
+
+    Args:
+        rows (List[List[str]]): Texto de las celdas por fila, incluidas las de encabezado
+        separator (str): Separador a usar (por defecto ';')
+        start_line (int, optional): Índice de la primera fila a convertir
+
+    Returns:
+        str: Contenido CSV como string
+    """
+    csv_lines = []
+
+    for row_index, cells in enumerate(rows):
+        if start_line and row_index < start_line:
+            continue
+        row_data = _normalize_row(cells, row_index, separator)
+        if row_data:
+            csv_lines.append(separator.join(row_data))
+
+    return '\n'.join(csv_lines)
+
 def html_table_to_csv(html_content: str, separator: str = settings.CSV_SEPARATOR, start_line: Optional[int] = 0) -> str:
     """
-    Convierte una tabla HTML a formato CSV usando BeautifulSoup y retorna directamente el contenido CSV como string.
+    Convierte una tabla HTML a formato CSV con un tokenizador de expresiones regulares y retorna directamente el contenido CSV como string.
     
     Args:
         html_content (str): El contenido HTML que contiene la tabla
@@ -101,13 +277,23 @@ def html_table_to_csv(html_content: str, separator: str = settings.CSV_SEPARATOR
     Returns:
         str: Contenido CSV como string
     """
+    return table_rows_to_csv(extract_table_rows(html_content), separator, start_line)
+
+def html_table_to_csv_soup(html_content: str, separator: str = settings.CSV_SEPARATOR, start_line: Optional[int] = 0) -> str:
+    """
+    Implementación de referencia con BeautifulSoup de `html_table_to_csv`.
+    Se conserva para verificar que ambas produzcan el mismo CSV y para comparar rendimiento.
+    """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html_content, HTML_PARSER)
     table = soup.find('table')
     if not table:
         return ""
 
     csv_lines = []
-    rows = table.find_all('tr')
+    # Solo las filas de la tabla exterior; una tabla anidada queda como texto de su celda
+    rows = [row for row in table.find_all('tr') if row.find_parent('table') is table]
 
     for row_index, row in enumerate(rows):
         if start_line and row_index < start_line:
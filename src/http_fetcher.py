@@ -0,0 +1,147 @@
+"""
+Descarga de tablas mediante peticiones HTTP directas.
+
+El navegador se usa una sola vez para superar Cloudflare Turnstile; luego se
+reutilizan sus cookies y su user agent para solicitar el contenido del iframe
+de cada periodo con un cliente HTTP asíncrono con conexiones persistentes.
+"""
+
+import settings
+from typing import Dict
+from urllib.parse import urljoin, urlparse, parse_qsl, urlencode, urlunparse
+from src.exceptions import ClearanceExpiredError, TableNotFoundError
+from src.html_utils import extract_table_html, table_period
+
+# Marcadores de la página de desafío de Cloudflare
+CHALLENGE_MARKERS = ("challenge-platform", "cf-turnstile", "Just a moment...", "cf_chl_opt")
+CHALLENGE_STATUS_CODES = (403, 429, 503)
+
+
+def build_period_url(iframe_url: str, period: str, param: str = settings.HTTP_PERIOD_PARAM) -> str:
+    """
+    Construye la URL del contenido del iframe para un periodo YYYYMM
+    """
+    parsed = urlparse(iframe_url)
+    query = parse_qsl(parsed.query, keep_blank_values=True)
+    if any(key == param for key, _ in query):
+        query = [(key, period if key == param else value) for key, value in query]
+    else:
+        query.append((param, period))
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def cookie_matches_host(host: str, domain: str) -> bool:
+    """
+    Retorna True si una cookie del dominio `domain` se envía a `host`: el mismo dominio o un
+    subdominio suyo, respetando los puntos (una cookie de amhi.gob.pe no va a senamhi.gob.pe)
+    """
+    domain = domain.lstrip(".").lower()
+    host = host.lower()
+    return bool(domain) and (host == domain or host.endswith(f".{domain}"))
+
+
+def is_challenge_response(status_code: int, body: str) -> bool:
+    """Retorna True si la respuesta corresponde a un desafío de Cloudflare"""
+    if status_code in CHALLENGE_STATUS_CODES:
+        return True
+    return any(marker in body for marker in CHALLENGE_MARKERS)
+
+
+class HttpTableFetcher:
+    """
+    Cliente HTTP que reutiliza la autorización de Cloudflare obtenida por el navegador
+    """
+
+    def __init__(self, iframe_url: str, user_agent: str, cookies: Dict[str, str],
+                 max_connections: int = settings.HTTP_MAX_CONNECTIONS,
+                 timeout: float = settings.HTTP_TIMEOUT):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("El modo HTTP requiere httpx: pip install httpx") from e
+
+        self.iframe_url = iframe_url
+        self.expired = False
+        self.refresh_count = 0
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent, "Referer": settings.BASE_URL},
+            cookies=cookies,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            follow_redirects=True,
+        )
+
+    @staticmethod
+    async def capture_clearance(browser, page, iframe_with_table) -> tuple[str, str, Dict[str, str]]:
+        """
+        Obtiene desde el navegador la URL del iframe, el user agent y las cookies de la sesión
+        """
+        try:
+            iframe_url = await iframe_with_table.apply("(frame) => frame.contentWindow.location.href")
+        except Exception:
+            iframe_url = None
+        if not iframe_url or not iframe_url.startswith("http"):
+            iframe_url = urljoin(settings.BASE_URL, iframe_with_table.attrs.get("src", ""))
+
+        user_agent = await page.evaluate("navigator.userAgent")
+
+        host = urlparse(iframe_url).hostname or ""
+        cookies = {}
+        for cookie in await browser.cookies.get_all():
+            if cookie_matches_host(host, cookie.domain):
+                cookies[cookie.name] = cookie.value
+
+        return iframe_url, user_agent, cookies
+
+    @classmethod
+    async def from_browser(cls, browser, page, iframe_with_table) -> "HttpTableFetcher":
+        """Crea el cliente HTTP a partir de una sesión del navegador que ya superó Cloudflare"""
+        iframe_url, user_agent, cookies = await cls.capture_clearance(browser, page, iframe_with_table)
+        print(f"{settings.SUCCESS} Autorización capturada ({len(cookies)} cookies) para modo HTTP")
+        return cls(iframe_url, user_agent, cookies)
+
+    async def refresh_clearance(self, browser, page, iframe_with_table) -> None:
+        """
+        Actualiza las cookies desde el navegador tras detectar una autorización vencida.
+        Después de HTTP_MAX_CLEARANCE_REFRESHES renovaciones el cliente queda deshabilitado.
+        """
+        self.refresh_count += 1
+        if self.refresh_count > settings.HTTP_MAX_CLEARANCE_REFRESHES:
+            self.expired = True
+            print(f"{settings.WARNING} Autorización renovada demasiadas veces, se continúa solo con el navegador")
+            return
+
+        _, _, cookies = await self.capture_clearance(browser, page, iframe_with_table)
+        self.client.cookies.clear()
+        self.client.cookies.update(cookies)
+        self.expired = False
+
+    async def fetch_table(self, period: str) -> str:
+        """
+        Descarga el HTML de la tabla de datos de un periodo YYYYMM
+
+        Raises:
+            ClearanceExpiredError: Si Cloudflare vuelve a exigir el desafío
+            TableNotFoundError: Si la respuesta no contiene la tabla esperada
+        """
+        response = await self.client.get(build_period_url(self.iframe_url, period))
+        body = response.text
+
+        if is_challenge_response(response.status_code, body):
+            self.expired = True
+            raise ClearanceExpiredError(f"{settings.WARNING} Autorización de Cloudflare vencida (HTTP {response.status_code})")
+        response.raise_for_status()
+
+        table_html = extract_table_html(body, settings.TABLE_ID)
+        if table_html is None:
+            raise TableNotFoundError(f"{settings.ERROR} Tabla no encontrada en la respuesta para {period}")
+
+        found_period = table_period(table_html)
+        if found_period is not None and found_period != period:
+            raise TableNotFoundError(f"{settings.ERROR} La respuesta corresponde a {found_period} y no a {period}")
+
+        return table_html
+
+    async def aclose(self) -> None:
+        """Cierra las conexiones del cliente"""
+        await self.client.aclose()
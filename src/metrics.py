@@ -0,0 +1,282 @@
+"""
+Métricas de tiempo por fase del scraping.
+
+Cada fase se mide con `recorder.span(...)` y se acumula en un histograma por fase;
+además, cada estación guarda el total de sus fases, el tiempo de descarga de cada
+opción y los registros obtenidos. Al terminar se exporta un reporte JSON y un
+archivo de texto en formato Prometheus (para el textfile collector de node_exporter),
+que permite alertar sobre regresiones de latencia. Cada proceso escribe sus propios
+archivos, con su pid en el nombre y en la etiqueta `process` de cada serie, para que
+varios workers en paralelo no se sobrescriban.
+
+Fases registradas:
+    browser_start, page_load, tab_click, iframe_wait, option_select, table_wait,
+    table_read, http_fetch, parse, write, page_reset (recarga de la página al
+    reintentar), option (descarga completa de una opción) y station (estación completa).
+"""
+
+import bisect
+import contextvars
+import json
+import os
+import time
+import settings
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+METRIC_PREFIX = "senamhi_scraper"
+
+# Estación en curso; las tareas de asyncio heredan el valor de quien las crea
+_current_station: contextvars.ContextVar[Optional["StationMetrics"]] = contextvars.ContextVar(
+    "metrics_station", default=None)
+
+
+class Histogram:
+    """
+    Histograma de duraciones con límites fijos (semántica `le` de Prometheus)
+    """
+
+    def __init__(self, buckets: Sequence[float] = settings.METRICS_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # El último cuenta los valores sobre el mayor límite
+        self.count = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.count == 1 else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima un cuantil interpolando dentro del intervalo que lo contiene,
+        acotado por los valores mínimo y máximo observados
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = max(self.buckets[index - 1] if index else 0.0, self.min)
+                upper = min(self.buckets[index] if index < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def cumulative_counts(self) -> List[int]:
+        counts, total = [], 0
+        for count in self.counts[:-1]:
+            total += count
+            counts.append(total)
+        return counts
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 6),
+            "mean_s": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50_s": round(self.quantile(0.50), 6),
+            "p95_s": round(self.quantile(0.95), 6),
+            "p99_s": round(self.quantile(0.99), 6),
+            "min_s": round(self.min, 6),
+            "max_s": round(self.max, 6),
+        }
+
+
+class StationMetrics:
+    """
+    Tiempos acumulados de una estación
+    """
+
+    def __init__(self, code: str):
+        self.code = code
+        self.started_at = datetime.now()
+        self.seconds = 0.0
+        self.success: Optional[bool] = None
+        self.records = 0
+        self.phases: Dict[str, List[float]] = {}   # fase -> [cantidad, segundos]
+        self.options: Dict[str, float] = {}        # periodo YYYYMM -> segundos de descarga
+
+    def add(self, phase: str, seconds: float, period: Optional[str] = None) -> None:
+        totals = self.phases.setdefault(phase, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        if phase == "option" and period:
+            self.options[period] = round(self.options.get(period, 0.0) + seconds, 6)
+
+    def to_dict(self) -> dict:
+        return {
+            "station": self.code,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "seconds": round(self.seconds, 6),
+            "success": self.success,
+            "records": self.records,
+            "phases": {phase: {"count": count, "sum_s": round(total, 6)} for phase, (count, total) in self.phases.items()},
+            "options": self.options,
+        }
+
+
+class MetricsRecorder:
+    """
+    Registro de las fases de una ejecución del scraper
+    """
+
+    def __init__(self, buckets: Sequence[float] = settings.METRICS_BUCKETS, enabled: bool = settings.METRICS_ENABLED):
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        """Descarta las mediciones anteriores"""
+        self.started_at = datetime.now()
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Counter = Counter()
+        self.stations: List[StationMetrics] = []
+
+    def observe(self, phase: str, seconds: float, period: Optional[str] = None) -> None:
+        """Registra una duración en el histograma de la fase y en la estación en curso"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        station = _current_station.get()
+        if station is not None:
+            station.add(phase, seconds, period)
+
+    @contextmanager
+    def span(self, phase: str, period: Optional[str] = None) -> Iterator[None]:
+        """
+        Mide el bloque como una fase; también sirve alrededor de un `await`.
+        Si el bloque lanza una excepción, la duración se registra igual y se cuenta el error.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if self.enabled:
+                self.errors[phase] += 1
+            raise
+        finally:
+            self.observe(phase, time.perf_counter() - start, period)
+
+    @contextmanager
+    def station(self, code: str) -> Iterator[StationMetrics]:
+        """
+        Asocia las fases medidas dentro del bloque a una estación y mide su duración total
+        """
+        station = StationMetrics(code)
+        if self.enabled:
+            self.stations.append(station)
+        token = _current_station.set(station)
+        start = time.perf_counter()
+        try:
+            with self.span("station"):
+                yield station
+        finally:
+            station.seconds = time.perf_counter() - start
+            _current_station.reset(token)
+
+    def keep_latest_stations(self) -> None:
+        """Conserva solo la última medición de cada estación (procesos de larga duración)"""
+        self.stations = list({station.code: station for station in self.stations}.values())
+
+    def summary(self) -> Dict[str, dict]:
+        """Resumen de cada fase (cantidad, suma, media, p50/p95/p99, mínimo y máximo)"""
+        return {phase: histogram.to_dict() for phase, histogram in sorted(self.histograms.items())}
+
+    def to_dict(self) -> dict:
+        finished_at = datetime.now()
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": finished_at.isoformat(timespec="seconds"),
+            "elapsed_s": round((finished_at - self.started_at).total_seconds(), 3),
+            "phases": self.summary(),
+            "errors": dict(self.errors),
+            "stations": [station.to_dict() for station in self.stations],
+        }
+
+    def to_prometheus(self, process: Optional[str] = None) -> str:
+        """
+        Métricas en el formato de texto de Prometheus. Los histogramas se etiquetan solo
+        por fase; por estación se exportan indicadores simples para limitar las series.
+        Con `process`, cada serie lleva además la etiqueta process (los archivos de varios
+        procesos en el mismo directorio del textfile collector no pueden repetir series).
+        """
+        owner = f'process="{process}",' if process else ""
+        name = f"{METRIC_PREFIX}_phase_duration_seconds"
+        lines = [f"# HELP {name} Duración de cada fase del scraping",
+                 f"# TYPE {name} histogram"]
+        for phase, histogram in sorted(self.histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                lines.append(f'{name}_bucket{{{owner}phase="{phase}",le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{owner}phase="{phase}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{owner}phase="{phase}"}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{{owner}phase="{phase}"}} {histogram.count}')
+
+        name = f"{METRIC_PREFIX}_phase_errors_total"
+        lines += [f"# HELP {name} Fases interrumpidas por una excepción", f"# TYPE {name} counter"]
+        lines += [f'{name}{{{owner}phase="{phase}"}} {count}' for phase, count in sorted(self.errors.items())]
+
+        # Solo el último resultado de cada estación
+        stations = {station.code: station for station in self.stations}
+        gauges = (
+            ("station_duration_seconds", "Duración del último scraping de la estación", lambda s: f"{s.seconds:.6f}"),
+            ("station_records", "Registros obtenidos en el último scraping", lambda s: s.records),
+            ("station_options", "Opciones descargadas en el último scraping", lambda s: len(s.options)),
+            ("station_success", "1 si el último scraping terminó sin errores", lambda s: int(bool(s.success))),
+        )
+        for suffix, help_text, value in gauges:
+            name = f"{METRIC_PREFIX}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f'{name}{{{owner}station="{code}"}} {value(station)}' for code, station in sorted(stations.items())]
+
+        name = f"{METRIC_PREFIX}_last_run_timestamp_seconds"
+        labels = f'{{process="{process}"}}' if process else ""
+        lines += [f"# HELP {name} Fin de la última ejecución (epoch)", f"# TYPE {name} gauge",
+                  f"{name}{labels} {time.time():.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, directory: str = settings.METRICS_DIR,
+                      prometheus_file: Optional[str] = settings.METRICS_PROMETHEUS_FILE) -> List[str]:
+        """
+        Guarda el reporte JSON de la ejecución y actualiza el archivo para Prometheus del proceso.
+        Ambos nombres llevan el pid: varios workers pueden terminar en el mismo segundo, y el
+        textfile collector reúne los archivos `.prom` de todos los procesos
+
+        Returns:
+            Rutas de los archivos escritos
+        """
+        if not self.enabled:
+            return []
+        pid = os.getpid()
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"metrics-{self.started_at:%Y%m%d-%H%M%S}-{pid}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        paths = [json_path]
+
+        if prometheus_file:
+            root, extension = os.path.splitext(prometheus_file)
+            prometheus_file = f"{root}-{pid}{extension}"
+            # node_exporter podría leer un archivo a medio escribir: se escribe aparte y se reemplaza.
+            # open() respeta la umask, así que node_exporter puede leerlo aunque corra con otro usuario
+            os.makedirs(os.path.dirname(prometheus_file) or ".", exist_ok=True)
+            temp_path = f"{prometheus_file}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus(process=str(pid)))
+            os.replace(temp_path, prometheus_file)
+            paths.append(prometheus_file)
+        return paths
+
+
+# Registro compartido por el scraper
+recorder = MetricsRecorder()
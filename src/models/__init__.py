@@ -13,6 +13,9 @@ from .data_schema import (
     get_headers_for_station_type,
     get_expected_columns_count,
     validate_csv_row,
+    get_field_names,
+    get_column_dtypes,
+    COLUMN_FIELDS,
     METEOROLOGICAL_CONVENTIONAL_HEADERS,
     METEOROLOGICAL_AUTOMATIC_HEADERS,
     HYDROLOGICAL_CONVENTIONAL_HEADERS,
@@ -45,8 +48,11 @@ __all__ = [
     "get_headers_for_station_type",
     "get_expected_columns_count", 
     "validate_csv_row",
+    "get_field_names",
+    "get_column_dtypes",
     
     # Headers constants
+    "COLUMN_FIELDS",
     "METEOROLOGICAL_CONVENTIONAL_HEADERS",
     "METEOROLOGICAL_AUTOMATIC_HEADERS",
     "HYDROLOGICAL_CONVENTIONAL_HEADERS", 
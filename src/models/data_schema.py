@@ -3,7 +3,7 @@ Esquemas de datos CSV para diferentes tipos de estaciones.
 Separado del modelo Station para mantener la separación de responsabilidades.
 """
 
-from typing import List
+from typing import Dict, List
 from .station import StationType, StationStatus
 
 
@@ -53,6 +53,37 @@ HYDROLOGICAL_AUTOMATIC_HEADERS = [
 ]
 
 
+# Nombre de campo (sin acentos ni unidades) de cada header, usado en formatos tipados
+COLUMN_FIELDS = {
+    "Año": "year",
+    "Mes": "month",
+    "Día": "day",
+    "Hora": "hour",
+    "Temp. Máx (°C)": "temp_max",
+    "Temp. Mín (°C)": "temp_min",
+    "Humedad (%)": "humidity",
+    "Precipitación (mm)": "precipitation",
+    "Temperatura (°C)": "temperature",
+    "Dir. Viento (°)": "wind_direction",
+    "Vel. Viento (m/s)": "wind_speed",
+    "Nivel del río (m) 06": "river_level_06",
+    "Nivel del río (m) 10": "river_level_10",
+    "Nivel del río (m) 14": "river_level_14",
+    "Nivel del río (m) 18": "river_level_18",
+    "Nivel del río (m)": "river_level",
+    "Precipitación (mm/hora)": "precipitation",
+}
+
+# Tipos de dato de las columnas de fecha/hora; el resto son mediciones
+TIME_FIELD_DTYPES = {
+    "year": "int16",
+    "month": "int16",
+    "day": "int16",
+    "hour": "uint8",
+}
+MEASUREMENT_DTYPE = "float32"
+
+
 def get_headers_for_station_type(station_type: StationType, status: StationStatus) -> List[str]:
     """
     Retorna los headers CSV apropiados según el tipo y estado de la estación.
@@ -112,4 +143,39 @@ def validate_csv_row(row: List[str], station_type: StationType, status: StationS
         True si la fila es válida, False en caso contrario
     """
     expected_count = get_expected_columns_count(station_type, status)
-    return len(row) == expected_count
\ No newline at end of file
+    return len(row) == expected_count
+
+
+def get_field_names(headers: List[str]) -> List[str]:
+    """
+    Retorna los nombres de campo correspondientes a una lista de headers.
+
+    Args:
+        headers: Headers CSV de la estación
+
+    Returns:
+        Lista de nombres de campo en el mismo orden
+
+    Raises:
+        ValueError: Si algún header no tiene nombre de campo definido
+    """
+    try:
+        return [COLUMN_FIELDS[header] for header in headers]
+    except KeyError as e:
+        raise ValueError(f"Header sin nombre de campo definido: {e.args[0]}") from e
+
+
+def get_column_dtypes(headers: List[str]) -> Dict[str, str]:
+    """
+    Retorna el tipo de dato de cada campo para la decodificación columnar.
+
+    Args:
+        headers: Headers CSV de la estación
+
+    Returns:
+        Diccionario campo -> tipo de dato (int16, uint8 o float32)
+    """
+    return {
+        field: TIME_FIELD_DTYPES.get(field, MEASUREMENT_DTYPE)
+        for field in get_field_names(headers)
+    }
\ No newline at end of file
@@ -129,6 +129,9 @@ class ScrapingResult(BaseModel):
     records_count: int = Field(0, description="Número de registros procesados")
     files_generated: List[str] = Field(default_factory=list, description="Archivos generados")
     errors: List[str] = Field(default_factory=list, description="Errores encontrados")
+    completed_periods: List[str] = Field(default_factory=list, description="Periodos YYYYMM guardados o ya sincronizados")
+    unavailable_periods: List[str] = Field(default_factory=list, description="Periodos solicitados que el sitio no ofrece")
+    empty_periods: List[str] = Field(default_factory=list, description="Periodos completados cuya tabla no tiene filas de datos")
     processing_time: Optional[float] = Field(None, description="Tiempo de procesamiento en segundos")
     timestamp: datetime = Field(default_factory=datetime.now, description="Timestamp de la operación")
     
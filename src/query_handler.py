@@ -2,9 +2,12 @@ import settings
 from typing import List, Dict
 import re
 import os
-from src.html_utils import extract_select_options, html_table_to_csv
+from src.html_utils import TableContent, extract_select_options, extract_table_rows, table_rows_to_csv, table_rows_to_html
+from src.metrics import recorder
 from src.models.station import Station
 from src.station_service import find_station_by_code
+from src.sync_manifest import SyncManifest
+from src.writers import StreamingCSVWriter
 
 class QueryModeHandler:
     """
@@ -70,6 +73,16 @@ class QueryModeHandler:
                 
         print(f"📅 Filtro por periodo {start_year}-{end_year}: {len(filtered)} opciones encontradas")
         return filtered
+
+    def filter_by_periods(self, periods: List[str]) -> List[Dict[str, str]]:
+        """
+        Filtra opciones por una lista de periodos YYYYMM (p. ej. tareas de la cola de trabajo)
+        """
+        targets = set(periods)
+        filtered = [opt for opt in self.get_valid_options() if opt['value'] in targets]
+
+        print(f"📅 Filtro por lista: {len(filtered)} de {len(targets)} periodos encontrados")
+        return filtered
         
     def get_available_years(self) -> List[int]:
         """
@@ -95,25 +108,123 @@ class CSVManager:
         self.csv_data_buffer = []
         self.headers = []
         self.start_line = 1  # Línea inicial para procesar (después de encabezados)
+        self.station_code = None
+        self.html_cache = None  # HtmlCache opcional donde se guarda el HTML crudo de cada tabla
+        self.consolidated_writer = None  # StreamingCSVWriter activo en modo consolidado
+        self.table_writers = []  # Salidas adicionales que reciben cada mes como tabla columnar (p. ej. Parquet)
+        self.records_count = 0  # Filas de datos guardadas
+        self.saved_periods = []  # Periodos cuyas filas quedaron escritas (archivo individual o consolidado)
+        self.empty_periods = []  # Periodos con tabla válida pero sin filas de datos (huecos de la estación)
 
         os.makedirs(output_dir, exist_ok=True)
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def add_table_data(self, table_html: str, option_value: str) -> None:
+        self.manifest = SyncManifest(self.output_dir)
+
+    def _table_rows(self, table: TableContent) -> List[List[str]]:
+        """
+        Filas de celdas de una tabla recibida como HTML o ya extraída en la página
+        """
+        return extract_table_rows(table) if isinstance(table, str) else table
+
+    def _cache_table(self, table: TableContent, option_value: str) -> None:
+        """
+        Guarda el HTML crudo de la tabla en la caché, si está configurada.
+        Si la tabla llega como filas ya extraídas, se guarda una tabla HTML mínima equivalente,
+        marcada en la caché como reconstruida (scrape_station lee el HTML completo con la caché activa).
+        """
+        if self.html_cache is None or not self.station_code:
+            return
+        try:
+            with recorder.span("write"):
+                if isinstance(table, str):
+                    self.html_cache.put(self.station_code, option_value, table)
+                else:
+                    self.html_cache.put(self.station_code, option_value, table_rows_to_html(table), reconstructed=True)
+        except OSError as e:
+            print(f"{settings.WARNING} No se pudo guardar la tabla {option_value} en la caché: {e}")
+
+    def open_consolidated_file(self, filename: str) -> None:
+        """
+        Inicia la escritura incremental del archivo consolidado.
+
+        A partir de aquí, add_table_data escribe cada mes directamente en el archivo
+        temporal en lugar de acumularlo en memoria.
+        """
+        filepath = os.path.join(self.output_dir, filename)
+        self.consolidated_writer = StreamingCSVWriter(filepath, self.headers).open()
+
+    def _write_tables(self, rows: List[List[str]], option_value: str) -> None:
+        """
+        Decodifica la tabla una sola vez y la entrega a las salidas adicionales
+        """
+        if not self.table_writers:
+            return
+        from src.columnar import decode_table_rows
+
+        try:
+            with recorder.span("parse"):
+                table = decode_table_rows(rows, self.headers, self.start_line)
+        except Exception as e:
+            print(f"{settings.ERROR} Error decodificando tabla {option_value}: {e}")
+            return
+        for writer in self.table_writers:
+            try:
+                with recorder.span("write"):
+                    writer.write_table(option_value, table)
+            except Exception as e:
+                print(f"{settings.ERROR} Error escribiendo {option_value} en {type(writer).__name__}: {e}")
+
+    def close_table_writers(self, publish: bool = True) -> List[str]:
+        """
+        Cierra las salidas adicionales y retorna los archivos generados.
+        Con `publish=False` (tras un error) las exportaciones de archivo único no se publican
+        con su nombre final: quedan como archivo parcial, igual que el consolidado `.part`
+        """
+        files = []
+        for writer in self.table_writers:
+            try:
+                if not publish and hasattr(writer, "abort"):
+                    writer.abort()
+                    continue
+                files.extend(writer.close())
+            except Exception as e:
+                print(f"{settings.ERROR} Error cerrando {type(writer).__name__}: {e}")
+        self.table_writers = []
+        return files
+
+    def add_table_data(self, table: TableContent, option_value: str) -> bool:
         """
-        Añade datos de una tabla al buffer
+        Añade datos de una tabla (HTML o filas) al archivo consolidado en curso o, si no hay uno abierto, al buffer.
+        Retorna False si no se pudo escribir. Una tabla sin filas no es un error: el mes queda en `empty_periods`
         """
+        self._cache_table(table, option_value)
         try:
-            csv_content = html_table_to_csv(table_html, separator=settings.CSV_SEPARATOR, start_line=self.start_line)
+            with recorder.span("parse"):
+                rows = self._table_rows(table)
+                csv_content = table_rows_to_csv(rows, separator=settings.CSV_SEPARATOR, start_line=self.start_line)
+                processed_lines = self._process_csv_lines(csv_content) if csv_content else []
+            self._write_tables(rows, option_value)
             if csv_content:
-                processed_lines = self._process_csv_lines(csv_content)
-                # Comprobar si el buffer ya tiene encabezados
-                if not self.csv_data_buffer and self.headers:
-                    self.csv_data_buffer.append(settings.CSV_SEPARATOR.join(self.headers))  # Añadir encabezados al inicio
-                self.csv_data_buffer.extend(processed_lines)
-                print(f"{settings.SUCCESS} Datos añadidos al buffer para periodo {option_value}: {len(processed_lines)} filas")
+                self.records_count += len(processed_lines)
+                if self.consolidated_writer is not None:
+                    with recorder.span("write"):
+                        self.consolidated_writer.write_lines(option_value, processed_lines)
+                    print(f"{settings.SUCCESS} Datos añadidos al consolidado para periodo {option_value}: {len(processed_lines)} filas")
+                else:
+                    # Comprobar si el buffer ya tiene encabezados
+                    if not self.csv_data_buffer and self.headers:
+                        self.csv_data_buffer.append(settings.CSV_SEPARATOR.join(self.headers))  # Añadir encabezados al inicio
+                    self.csv_data_buffer.extend(processed_lines)
+                    print(f"{settings.SUCCESS} Datos añadidos al buffer para periodo {option_value}: {len(processed_lines)} filas")
+                self.saved_periods.append(option_value)
+                return True
+            print(f"{settings.WARNING} La tabla de {option_value} no tiene filas de datos")
+            self.empty_periods.append(option_value)
+            return True
         except Exception as e:
             print(f"{settings.ERROR} Error procesando tabla para {option_value}: {e}")
+        return False
 
     def _process_csv_lines(self, csv_content: str) -> List[str]:
         """
@@ -128,20 +239,32 @@ class CSVManager:
                     
         return processed_lines
             
-    def save_individual_file(self, table_html: str, option_value: str) -> str:
+    def save_individual_file(self, table: TableContent, option_value: str) -> str:
         """
-        Guarda una tabla individual en un archivo CSV
+        Guarda una tabla individual (HTML o filas) en un archivo CSV.
+        Retorna la ruta del archivo, o "" si no se escribió: por un error o porque la tabla
+        no tenía filas (en ese caso el mes queda en `empty_periods` y no se crea archivo)
         """
         filename = f"{self.filename}-{option_value}.csv"
         filepath = os.path.join(self.output_dir, filename)
+        self._cache_table(table, option_value)
         
         try:
-            csv_content = html_table_to_csv(table_html, separator=settings.CSV_SEPARATOR, start_line=self.start_line)
+            with recorder.span("parse"):
+                rows = self._table_rows(table)
+                csv_content = table_rows_to_csv(rows, separator=settings.CSV_SEPARATOR, start_line=self.start_line)
+            self._write_tables(rows, option_value)
             if csv_content:
-                with open(filepath, 'w', encoding=settings.CSV_ENCODING) as f:
-                    f.write(settings.CSV_SEPARATOR.join(self.headers) + "\n" + csv_content)
+                with recorder.span("write"):
+                    with open(filepath, 'w', encoding=settings.CSV_ENCODING) as f:
+                        f.write(settings.CSV_SEPARATOR.join(self.headers) + "\n" + csv_content)
+                    self.manifest.record(option_value, csv_content, filename)
+                self.records_count += len(self._process_csv_lines(csv_content))
+                self.saved_periods.append(option_value)
                 print(f"{settings.SUCCESS} Archivo individual guardado: {filename}")
                 return filepath
+            print(f"{settings.WARNING} La tabla de {option_value} no tiene filas de datos")
+            self.empty_periods.append(option_value)
         except Exception as e:
             print(f"{settings.ERROR} Error guardando archivo {filename}: {e}")
         
@@ -149,8 +272,11 @@ class CSVManager:
         
     def save_consolidated_file(self, filename: str) -> str:
         """
-        Guarda todos los datos del buffer en un archivo consolidado
+        Publica el archivo consolidado en curso o guarda los datos del buffer
         """
+        if self.consolidated_writer is not None:
+            return self._commit_consolidated_writer()
+
         if not self.csv_data_buffer:
             print(f"{settings.ERROR} No hay datos en el buffer para guardar")
             return ""
@@ -168,6 +294,41 @@ class CSVManager:
         except Exception as e:
             print(f"{settings.ERROR} Error guardando archivo consolidado: {e}")
             return ""
+
+    def _commit_consolidated_writer(self) -> str:
+        writer = self.consolidated_writer
+        self.consolidated_writer = None
+        filename = os.path.basename(writer.filepath)
+
+        if not writer.periods:
+            writer.close(keep_partial=False)
+            print(f"{settings.ERROR} No hay datos para guardar en el archivo consolidado")
+            return ""
+
+        try:
+            filepath = writer.commit()
+            print(f"{settings.SUCCESS} Archivo consolidado guardado: {filename}")
+            print(f"📊 Contiene {writer.line_count} líneas")
+            return filepath
+        except Exception as e:
+            writer.close()
+            print(f"{settings.ERROR} Error guardando archivo consolidado: {e}")
+            return ""
+
+    def close_consolidated_file(self) -> None:
+        """
+        Cierra un archivo consolidado sin publicarlo (por ejemplo, tras un error),
+        conservando los meses ya escritos en el archivo `.part`
+        """
+        if self.consolidated_writer is None:
+            return
+        writer = self.consolidated_writer
+        self.consolidated_writer = None
+        writer.close()
+        if writer.periods:
+            print(f"{settings.WARNING} Consolidado incompleto: {len(writer.periods)} meses en {writer.temp_path}")
+        else:
+            writer.close(keep_partial=False)
             
     def clear_buffer(self):
         """
@@ -305,4 +466,18 @@ def get_period_params(filename: str) -> Dict:
             }
             
         except ValueError:
-            print(f"{settings.ERROR} Por favor ingresa números válidos.")
\ No newline at end of file
+            print(f"{settings.ERROR} Por favor ingresa números válidos.")
+
+def get_export_filename(query_params: Dict, filename: str, extension: str) -> str:
+    """
+    Nombre del archivo exportado (JSON, XLSX) para el rango consultado, con el mismo
+    patrón que los archivos consolidados
+    """
+    if query_params['mode'] == 'month':
+        return f"{filename}-{query_params['year']:04d}{query_params['month']:02d}.{extension}"
+    if query_params['mode'] == 'year':
+        return f"{filename}-{query_params['year']}.{extension}"
+    if query_params['mode'] == 'periods':
+        periods = sorted(query_params['periods'])
+        return f"{filename}-{periods[0]}-{periods[-1]}.{extension}"
+    return f"{filename}-{query_params['start_year']}-{query_params['end_year']}.{extension}"
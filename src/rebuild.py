@@ -0,0 +1,137 @@
+"""
+Regeneración de archivos de salida a partir de la caché de HTML crudo.
+
+Permite aplicar correcciones del parser o nuevos formatos de salida a todo el
+archivo histórico sin volver a descargar las tablas. Cada estación se procesa en
+un proceso independiente.
+"""
+
+import os
+import settings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+from src.html_cache import HtmlCache
+from src.query_handler import CSVManager
+from src.station_service import find_station_by_code, get_headers_for_station, get_table_start_line
+
+
+def _filter_periods(periods: List[str], start_year: Optional[int], end_year: Optional[int]) -> List[str]:
+    return [
+        period for period in periods
+        if (start_year is None or int(period[:4]) >= start_year)
+        and (end_year is None or int(period[:4]) <= end_year)
+    ]
+
+
+def rebuild_station(station_code: str, cache_dir: str = settings.HTML_CACHE_DIR,
+                    output_dir: str = settings.CSV_DIR, start_year: Optional[int] = None,
+                    end_year: Optional[int] = None, consolidated: bool = False,
+                    parquet_dir: Optional[str] = None, sqlite_path: Optional[str] = None) -> dict:
+    """
+    Regenera los CSV de una estación desde la caché.
+
+    Args:
+        station_code: Código de la estación
+        cache_dir: Directorio de la caché de HTML
+        output_dir: Directorio base de salida
+        start_year: Primer año a regenerar (opcional)
+        end_year: Último año a regenerar (opcional)
+        consolidated: Generar un único archivo en lugar de uno por mes
+        parquet_dir: Directorio del dataset Parquet a regenerar también (opcional)
+        sqlite_path: Almacén SQLite donde cargar también los meses (opcional)
+
+    Returns:
+        Resumen con la estación, los meses regenerados, los archivos generados, los meses que
+        no se pudieron leer o escribir y el error si lo hubo
+    """
+    summary = {"station": station_code, "months": 0, "files": [], "failed": [], "error": None}
+
+    station = find_station_by_code(station_code)
+    if not station:
+        summary["error"] = "Estación no encontrada"
+        return summary
+
+    cache = HtmlCache(cache_dir, ttl_days=None, max_bytes=None)
+    periods = _filter_periods(cache.periods(station_code), start_year, end_year)
+    if not periods:
+        summary["error"] = "Sin tablas en la caché para el rango indicado"
+        return summary
+
+    csv_manager = CSVManager(station.name.replace(" ", ""), output_dir)
+    csv_manager.headers = get_headers_for_station(station)
+    csv_manager.start_line = get_table_start_line(station)
+    if parquet_dir:
+        from src.writers.parquet_writer import ParquetDatasetWriter
+        csv_manager.table_writers.append(ParquetDatasetWriter(station.code, csv_manager.headers, parquet_dir))
+    if sqlite_path:
+        from src.writers.sqlite_writer import SQLiteObservationWriter
+        csv_manager.table_writers.append(SQLiteObservationWriter(station.code, sqlite_path))
+
+    if consolidated:
+        first_year, last_year = periods[0][:4], periods[-1][:4]
+        suffix = first_year if first_year == last_year else f"{first_year}-{last_year}"
+        consolidated_filename = f"{csv_manager.filename}-{suffix}.csv"
+        csv_manager.open_consolidated_file(consolidated_filename)
+
+    for period in periods:
+        table_html = cache.get(station_code, period)
+        if table_html is None:
+            summary["failed"].append(period)
+            continue
+        if consolidated:
+            written = csv_manager.add_table_data(table_html, period)
+        else:
+            filepath = csv_manager.save_individual_file(table_html, period)
+            if filepath:
+                summary["files"].append(filepath)
+            # Un mes sin filas no genera archivo pero tampoco es un error
+            written = bool(filepath) or period in csv_manager.empty_periods
+        if written:
+            summary["months"] += 1
+        else:
+            summary["failed"].append(period)
+
+    if consolidated:
+        filepath = csv_manager.save_consolidated_file(consolidated_filename)
+        if filepath:
+            summary["files"].append(filepath)
+        elif csv_manager.saved_periods:
+            # Los meses añadidos al consolidado no llegaron a escribirse
+            summary["months"] -= len(csv_manager.saved_periods)
+            summary["failed"] = sorted(summary["failed"] + csv_manager.saved_periods)
+
+    summary["files"].extend(csv_manager.close_table_writers())
+    return summary
+
+
+def rebuild_from_cache(station_codes: Optional[List[str]] = None, cache_dir: str = settings.HTML_CACHE_DIR,
+                       output_dir: str = settings.CSV_DIR, start_year: Optional[int] = None,
+                       end_year: Optional[int] = None, consolidated: bool = False,
+                       workers: Optional[int] = None, parquet_dir: Optional[str] = None,
+                       sqlite_path: Optional[str] = None) -> List[dict]:
+    """
+    Regenera los CSV de varias estaciones en paralelo con un pool de procesos.
+
+    Args:
+        station_codes: Estaciones a regenerar (por defecto, todas las de la caché)
+        workers: Número de procesos (por defecto, uno por CPU)
+        parquet_dir: Directorio del dataset Parquet a regenerar también (opcional)
+        sqlite_path: Almacén SQLite donde cargar también los meses (opcional)
+
+    Returns:
+        Lista de resúmenes por estación
+    """
+    if station_codes is None:
+        station_codes = HtmlCache(cache_dir, ttl_days=None, max_bytes=None).stations()
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(rebuild_station, code, cache_dir, output_dir, start_year, end_year, consolidated,
+                            parquet_dir, sqlite_path)
+            for code in station_codes
+        ]
+        for future in as_completed(futures):
+            summaries.append(future.result())
+
+    return sorted(summaries, key=lambda summary: summary["station"])
@@ -0,0 +1,162 @@
+"""
+Planificador de actualizaciones continuas del mes en curso.
+
+Las estaciones AUTOMATICA y REAL publican datos nuevos constantemente. El planificador
+mantiene cada estación con la hora de su última actualización exitosa y el intervalo
+objetivo de su estado (REFRESH_INTERVALS). Su prioridad es el atraso relativo:
+
+    prioridad = (ahora - última actualización) / intervalo
+
+Una estación vence al llegar a 1, y entre las vencidas se atienden primero las de mayor
+prioridad, sin superar el presupuesto global de actualizaciones simultáneas. Tras un error
+la estación espera un tiempo creciente (RetryPolicy) antes de volver a intentarse. El
+estado se guarda en un archivo JSON, de modo que un reinicio continúa donde quedó.
+"""
+
+import heapq
+import json
+import os
+import time
+import settings
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from src.retry import RetryPolicy
+
+
+def refresh_periods(now: float, last_success: float) -> List[str]:
+    """
+    Periodos YYYYMM a actualizar: el mes en curso y, si la última actualización fue en
+    otro mes, también el anterior para recoger sus últimos datos
+    """
+    current = datetime.fromtimestamp(now)
+    periods = [f"{current.year:04d}{current.month:02d}"]
+    last = datetime.fromtimestamp(last_success) if last_success else None
+    if last is not None and (last.year, last.month) != (current.year, current.month):
+        year, month = (current.year, current.month - 1) if current.month > 1 else (current.year - 1, 12)
+        periods.insert(0, f"{year:04d}{month:02d}")
+    return periods
+
+
+class StationSchedule:
+    """Estado de actualización de una estación"""
+
+    def __init__(self, code: str, interval: float, last_success: float = 0.0, last_attempt: float = 0.0,
+                 failures: int = 0, retry_at: float = 0.0):
+        self.code = code
+        self.interval = interval
+        self.last_success = last_success
+        self.last_attempt = last_attempt
+        self.failures = failures   # Fallos seguidos desde la última actualización exitosa
+        self.retry_at = retry_at   # No se reintenta antes de este instante (epoch)
+
+    def priority(self, now: float) -> float:
+        """Atraso relativo al intervalo; una estación nunca actualizada tiene el máximo atraso"""
+        return (now - self.last_success) / self.interval
+
+    def due_at(self) -> float:
+        return max(self.last_success + self.interval, self.retry_at)
+
+    def to_dict(self) -> dict:
+        return {"last_success": self.last_success, "last_attempt": self.last_attempt,
+                "failures": self.failures, "retry_at": self.retry_at}
+
+
+class RefreshScheduler:
+    """
+    Cola de prioridad de estaciones por atraso relativo, con estado persistente.
+
+    Uso (lo hace scheduler.py):
+        scheduler = RefreshScheduler()
+        scheduler.add(station.code, station.status)
+        for code in scheduler.due(limit=2):
+            scheduler.start(code)
+            ...
+            scheduler.finish(code, success=True)
+    """
+
+    def __init__(self, state_file: Optional[str] = settings.REFRESH_STATE_FILE,
+                 intervals: Optional[Dict[str, float]] = None, retry_policy: Optional[RetryPolicy] = None,
+                 clock: Callable[[], float] = time.time):
+        self.state_file = state_file
+        self.intervals = intervals or settings.REFRESH_INTERVALS
+        # Espera tras fallos seguidos: crece hasta el intervalo más corto
+        self.retry_policy = retry_policy or RetryPolicy(base_delay=settings.WORK_QUEUE_POLL_INTERVAL,
+                                                        max_delay=min(self.intervals.values()))
+        self.clock = clock
+        self.stations: Dict[str, StationSchedule] = {}
+        self.running: set = set()
+        self._saved = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("stations", {})
+        except (OSError, ValueError) as e:
+            print(f"{settings.WARNING} Estado del planificador ilegible, se parte de cero: {e}")
+            return {}
+
+    def save(self) -> None:
+        """Guarda el estado de todas las estaciones (escritura atómica)"""
+        if not self.state_file:
+            return
+        state = dict(self._saved)
+        state.update({code: schedule.to_dict() for code, schedule in self.stations.items()})
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        temp_path = f"{self.state_file}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"saved_at": self.clock(), "stations": state}, f, indent=2)
+        os.replace(temp_path, self.state_file)
+
+    def add(self, code: str, status: str) -> StationSchedule:
+        """Agrega una estación, recuperando su estado guardado si existe"""
+        saved = self._saved.get(code, {})
+        schedule = StationSchedule(code, self.intervals[status], **saved)
+        self.stations[code] = schedule
+        return schedule
+
+    def add_all(self, stations: Iterable) -> int:
+        count = 0
+        for station in stations:
+            if station.status in self.intervals:
+                self.add(station.code, station.status)
+                count += 1
+        return count
+
+    def due(self, limit: int) -> List[str]:
+        """Hasta `limit` estaciones vencidas que no se están actualizando, de mayor a menor prioridad"""
+        now = self.clock()
+        candidates = [schedule for code, schedule in self.stations.items()
+                      if code not in self.running and schedule.due_at() <= now]
+        return [schedule.code for schedule in heapq.nlargest(limit, candidates, key=lambda s: s.priority(now))]
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Tiempo hasta que venza la próxima estación libre; None si no hay estaciones libres"""
+        pending = [schedule.due_at() for code, schedule in self.stations.items() if code not in self.running]
+        return max(min(pending) - self.clock(), 0.0) if pending else None
+
+    def periods(self, code: str) -> List[str]:
+        return refresh_periods(self.clock(), self.stations[code].last_success)
+
+    def start(self, code: str) -> None:
+        self.running.add(code)
+        self.stations[code].last_attempt = self.clock()
+
+    def finish(self, code: str, success: bool) -> None:
+        """Registra el resultado de una actualización y guarda el estado"""
+        self.running.discard(code)
+        schedule = self.stations[code]
+        if success:
+            schedule.last_success = schedule.last_attempt
+            schedule.failures = 0
+            schedule.retry_at = 0.0
+        else:
+            schedule.failures += 1
+            schedule.retry_at = self.clock() + self.retry_policy.delay(schedule.failures)
+        self.save()
+
+    def overdue(self) -> int:
+        """Estaciones vencidas (incluidas las que esperan un reintento)"""
+        now = self.clock()
+        return sum(schedule.last_success + schedule.interval <= now for schedule in self.stations.values())
@@ -0,0 +1,109 @@
+"""
+Bloqueo de peticiones de red innecesarias mediante el dominio Fetch de CDP.
+
+La página de cada estación carga mapas, imágenes, fuentes y scripts de terceros
+que el scraper nunca usa; solo necesita el select y el iframe con la tabla. Antes
+de navegar se activa la intercepción en la pestaña: Chrome pausa únicamente las
+peticiones que coinciden con los tipos de recurso o patrones de URL configurados,
+y cada una se rechaza salvo que coincida con un patrón permitido (el desafío de
+Cloudflare y el contenido del iframe). El resto de peticiones no se intercepta.
+"""
+
+import settings
+from collections import Counter
+from fnmatch import fnmatchcase
+from typing import List, Optional, Sequence
+
+# Pestañas con la intercepción ya activa (un navegador del pool reutiliza su pestaña principal)
+_BLOCKER_ATTRIBUTE = "_request_blocker"
+
+
+class RequestBlocker:
+    """
+    Intercepción de peticiones de una pestaña de zendriver
+    """
+
+    def __init__(self, resource_types: Sequence[str] = settings.BLOCKED_RESOURCE_TYPES,
+                 url_patterns: Sequence[str] = settings.BLOCKED_URL_PATTERNS,
+                 allowed_patterns: Sequence[str] = settings.ALLOWED_URL_PATTERNS):
+        self.resource_types = list(resource_types)
+        self.url_patterns = list(url_patterns)
+        self.allowed_patterns = list(allowed_patterns)
+        self.blocked = Counter()   # Peticiones rechazadas por tipo de recurso
+        self.allowed = 0           # Peticiones pausadas que se dejaron pasar
+        self._tab = None
+
+    def is_allowed(self, url: str) -> bool:
+        return any(fnmatchcase(url, pattern) for pattern in self.allowed_patterns)
+
+    def request_patterns(self) -> List:
+        """Patrones de Fetch.enable: solo estas peticiones se pausan"""
+        from zendriver import cdp
+
+        patterns = [cdp.fetch.RequestPattern(url_pattern="*", resource_type=cdp.network.ResourceType(resource_type))
+                    for resource_type in self.resource_types]
+        patterns += [cdp.fetch.RequestPattern(url_pattern=pattern) for pattern in self.url_patterns]
+        return patterns
+
+    async def _on_request_paused(self, event, connection=None) -> None:
+        from zendriver import cdp
+
+        try:
+            if self.is_allowed(event.request.url):
+                self.allowed += 1
+                await self._tab.send(cdp.fetch.continue_request(request_id=event.request_id))
+            else:
+                self.blocked[event.resource_type.value] += 1
+                await self._tab.send(cdp.fetch.fail_request(request_id=event.request_id,
+                                                            error_reason=cdp.network.ErrorReason.BLOCKED_BY_CLIENT))
+        except Exception:
+            # La pestaña pudo navegar o cerrarse mientras la petición estaba pausada
+            pass
+
+    async def attach(self, tab) -> "RequestBlocker":
+        """
+        Activa la intercepción en una pestaña; debe hacerse antes de navegar
+        """
+        from zendriver import cdp
+
+        patterns = self.request_patterns()
+        self._tab = tab
+        if patterns:
+            tab.add_handler(cdp.fetch.RequestPaused, self._on_request_paused)
+            await tab.send(cdp.fetch.enable(patterns=patterns))
+        setattr(tab, _BLOCKER_ATTRIBUTE, self)
+        return self
+
+    def summary(self, since: Optional[Counter] = None) -> str:
+        """
+        Peticiones bloqueadas por tipo. La pestaña se reutiliza entre estaciones: con `since`
+        (una copia anterior de `blocked`) se cuentan solo las bloqueadas desde entonces
+        """
+        counts = self.blocked - since if since is not None else self.blocked
+        blocked = ", ".join(f"{resource_type}: {count}" for resource_type, count in counts.most_common())
+        return f"{sum(counts.values())} peticiones bloqueadas ({blocked or 'ninguna'})"
+
+
+async def open_tab(browser, new_tab: bool = False, enabled: Optional[bool] = None):
+    """
+    Retorna una pestaña lista para navegar, con la intercepción activa si está habilitada
+    (por defecto, según REQUEST_BLOCKING_ENABLED).
+
+    Sin `new_tab` se usa la pestaña principal del navegador, igual que `browser.get(url)`.
+    """
+    if enabled is None:
+        enabled = settings.REQUEST_BLOCKING_ENABLED
+    tab = browser.main_tab if not new_tab else None
+    if tab is None:
+        tab = await browser.get("about:blank", new_tab=new_tab)
+    if enabled and getattr(tab, _BLOCKER_ATTRIBUTE, None) is None:
+        try:
+            await RequestBlocker().attach(tab)
+        except Exception as e:
+            print(f"{settings.WARNING} No se pudo activar el bloqueo de peticiones: {e}")
+    return tab
+
+
+def get_blocker(tab) -> Optional[RequestBlocker]:
+    """Bloqueador activo en una pestaña, si lo hay"""
+    return getattr(tab, _BLOCKER_ATTRIBUTE, None)
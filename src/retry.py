@@ -0,0 +1,98 @@
+"""
+Reintentos de meses fallidos y cortacircuitos ante un sitio degradado.
+
+Los meses que fallan en la pasada principal no se descartan: quedan en una cola
+diferida y se reintentan al final, en rondas separadas por una espera exponencial
+con variación aleatoria. El cortacircuitos observa todos los resultados y, si el
+sitio falla de forma continua, pausa la descarga en lugar de agotar los meses
+restantes; tras demasiadas pausas se abandonan los meses pendientes.
+"""
+
+import asyncio
+import random
+import settings
+from typing import Optional
+
+
+class RetryPolicy:
+    """
+    Espera entre rondas de reintento: exponencial, con tope y variación aleatoria
+    """
+
+    def __init__(self, max_attempts: int = settings.RETRY_MAX_ATTEMPTS,
+                 base_delay: float = settings.RETRY_BASE_DELAY,
+                 max_delay: float = settings.RETRY_MAX_DELAY,
+                 jitter: float = settings.RETRY_JITTER,
+                 reset_after_failures: int = settings.RETRY_RESET_AFTER_FAILURES,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.reset_after_failures = reset_after_failures
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """
+        Espera antes de la ronda `attempt` (1 = primera ronda de reintentos)
+        """
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        # La variación evita que varias instancias reintenten al mismo tiempo
+        return delay * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+
+class CircuitBreaker:
+    """
+    Cortacircuitos compartido por los workers de una estación.
+
+    Tras `failure_threshold` fallos seguidos el circuito se abre y `wait` retiene a
+    los workers durante `cooldown` segundos. Los fallos que llegan mientras está
+    abierto (descargas ya en curso) no cuentan. Al superar `max_opens` aperturas el
+    circuito queda agotado y los meses restantes se dan por fallidos sin descargarlos.
+    """
+
+    def __init__(self, failure_threshold: int = settings.CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = settings.CIRCUIT_COOLDOWN,
+                 max_opens: int = settings.CIRCUIT_MAX_OPENS):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_opens = max_opens
+        self.consecutive_failures = 0
+        self.opens = 0
+        self.exhausted = False
+        self._open_until = 0.0
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    @property
+    def is_open(self) -> bool:
+        return self._now() < self._open_until
+
+    def record(self, success: bool) -> None:
+        """Registra el resultado de una descarga"""
+        if success:
+            self.consecutive_failures = 0
+            return
+        if self.exhausted or self.is_open:
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures < self.failure_threshold:
+            return
+
+        self.consecutive_failures = 0
+        if self.opens >= self.max_opens:
+            self.exhausted = True
+            print(f"{settings.ERROR} El sitio sigue fallando tras {self.opens} pausas; se abandonan los meses restantes")
+            return
+        self.opens += 1
+        self._open_until = self._now() + self.cooldown
+        print(f"{settings.WARNING} {self.failure_threshold} fallos seguidos: pausa de {self.cooldown:.0f} s "
+              f"({self.opens}/{self.max_opens})")
+
+    async def wait(self) -> None:
+        """Espera a que el circuito se cierre"""
+        remaining = self._open_until - self._now()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
@@ -0,0 +1,137 @@
+"""
+Índice espacial de estaciones.
+
+Agrupa las estaciones en una grilla regular de latitud/longitud para responder
+consultas por radio, por rectángulo y de vecinos más cercanos revisando solo las
+celdas cercanas. Las distancias se calculan con la fórmula de haversine.
+"""
+
+import math
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.models import Station, StationStatus, StationType
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia en kilómetros sobre la superficie terrestre entre dos coordenadas"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _enum_value(value: Union[Enum, str, None]) -> Optional[str]:
+    return value.value if isinstance(value, Enum) else value
+
+
+class StationSpatialIndex:
+    """
+    Grilla de celdas de `cell_size` grados con las estaciones de cada celda
+    """
+
+    def __init__(self, stations: Iterable[Station], cell_size: float = 0.5):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, List[Station]] = {}
+        for station in stations:
+            self.cells.setdefault(self._cell(station.latitude, station.longitude), []).append(station)
+
+        rows = [cell[0] for cell in self.cells] or [0]
+        cols = [cell[1] for cell in self.cells] or [0]
+        self._bounds = (min(rows), max(rows), min(cols), max(cols))
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    @staticmethod
+    def _matches(station: Station, station_type: Optional[str], status: Optional[str]) -> bool:
+        return ((station_type is None or station.station_type == station_type)
+                and (status is None or station.status == status))
+
+    def _stations_in_cells(self, row_range: range, col_range: range) -> Iterable[Station]:
+        for row in row_range:
+            for col in col_range:
+                yield from self.cells.get((row, col), ())
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                    station_type: Optional[Union[StationType, str]] = None,
+                    status: Optional[Union[StationStatus, str]] = None) -> List[Station]:
+        """Estaciones dentro del rectángulo indicado (límites incluidos)"""
+        station_type, status = _enum_value(station_type), _enum_value(status)
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+        return [
+            station for station in self._stations_in_cells(range(min_row, max_row + 1), range(min_col, max_col + 1))
+            if min_lat <= station.latitude <= max_lat and min_lon <= station.longitude <= max_lon
+            and self._matches(station, station_type, status)
+        ]
+
+    def within_radius(self, lat: float, lon: float, km: float,
+                      station_type: Optional[Union[StationType, str]] = None,
+                      status: Optional[Union[StationStatus, str]] = None) -> List[Tuple[Station, float]]:
+        """Estaciones a `km` kilómetros o menos del punto, ordenadas por distancia"""
+        station_type, status = _enum_value(station_type), _enum_value(status)
+        delta_lat = km / KM_PER_DEGREE
+        max_abs_lat = min(89.9, abs(lat) + delta_lat)
+        delta_lon = min(180.0, km / (KM_PER_DEGREE * math.cos(math.radians(max_abs_lat))))
+
+        min_row, min_col = self._cell(lat - delta_lat, lon - delta_lon)
+        max_row, max_col = self._cell(lat + delta_lat, lon + delta_lon)
+
+        result = []
+        for station in self._stations_in_cells(range(min_row, max_row + 1), range(min_col, max_col + 1)):
+            if not self._matches(station, station_type, status):
+                continue
+            distance = haversine_km(lat, lon, station.latitude, station.longitude)
+            if distance <= km:
+                result.append((station, distance))
+        result.sort(key=lambda item: item[1])
+        return result
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                station_type: Optional[Union[StationType, str]] = None,
+                status: Optional[Union[StationStatus, str]] = None) -> List[Tuple[Station, float]]:
+        """
+        Las `k` estaciones más cercanas al punto, ordenadas por distancia.
+
+        Recorre anillos de celdas alrededor del punto y se detiene cuando la k-ésima
+        distancia encontrada es menor que la distancia mínima posible a las celdas
+        aún no visitadas.
+        """
+        station_type, status = _enum_value(station_type), _enum_value(status)
+        center_row, center_col = self._cell(lat, lon)
+        min_row, max_row, min_col, max_col = self._bounds
+        max_ring = max(abs(center_row - min_row), abs(center_row - max_row),
+                       abs(center_col - min_col), abs(center_col - max_col))
+
+        found: List[Tuple[Station, float]] = []
+        for ring in range(max_ring + 1):
+            for row in range(center_row - ring, center_row + ring + 1):
+                edge_row = row in (center_row - ring, center_row + ring)
+                cols = range(center_col - ring, center_col + ring + 1) if edge_row else (center_col - ring, center_col + ring)
+                for col in cols:
+                    for station in self.cells.get((row, col), ()):
+                        if self._matches(station, station_type, status):
+                            found.append((station, haversine_km(lat, lon, station.latitude, station.longitude)))
+
+            if len(found) >= k:
+                found.sort(key=lambda item: item[1])
+                if found[k - 1][1] <= self._unvisited_distance(lat, lon, center_row, center_col, ring):
+                    break
+
+        found.sort(key=lambda item: item[1])
+        return found[:k]
+
+    def _unvisited_distance(self, lat: float, lon: float, center_row: int, center_col: int, ring: int) -> float:
+        """Cota inferior de la distancia del punto a cualquier celda fuera de los anillos visitados"""
+        size = self.cell_size
+        lat_gap = min(lat - (center_row - ring) * size, (center_row + ring + 1) * size - lat)
+        lon_gap = min(lon - (center_col - ring) * size, (center_col + ring + 1) * size - lon)
+        max_abs_lat = min(89.9, abs(lat) + (ring + 1) * size)
+        lon_gap_km = EARTH_RADIUS_KM * math.cos(math.radians(max_abs_lat)) * math.sin(math.radians(min(lon_gap, 90.0)))
+        return min(lat_gap * KM_PER_DEGREE, lon_gap_km)
@@ -0,0 +1,126 @@
+"""
+Registro indexado de estaciones.
+
+Construye una sola vez índices hash por código, código anterior y nombre
+normalizado, además de índices secundarios por categoría, tipo y estado, para
+responder búsquedas y filtros sin recorrer la lista completa de estaciones.
+"""
+
+import bisect
+import difflib
+import heapq
+import re
+import unicodedata
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from src.models import Station, StationCategory, StationStatus, StationType
+from src.spatial_index import StationSpatialIndex
+
+SPACES_PATTERN = re.compile(r'\s+')
+
+
+def normalize_name(name: str) -> str:
+    """Normaliza un nombre para búsquedas: sin tildes, en mayúsculas y con espacios simples"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return SPACES_PATTERN.sub(" ", without_accents).strip().upper()
+
+
+def normalize_code(code: str) -> str:
+    """Normaliza un código de estación para búsquedas: sin espacios alrededor y en mayúsculas"""
+    return code.strip().upper()
+
+
+def _enum_value(value: Union[Enum, str]) -> str:
+    """Los campos enum de Station se guardan como su valor (use_enum_values)"""
+    return value.value if isinstance(value, Enum) else value
+
+
+class StationRegistry:
+    """
+    Índices de búsqueda sobre la lista de estaciones
+    """
+
+    def __init__(self, stations: Iterable[Station]):
+        self.stations: List[Station] = list(stations)
+        self.by_code: Dict[str, Station] = {}
+        self.by_legacy_code: Dict[str, Station] = {}
+        self.by_name: Dict[str, List[Station]] = {}
+        self.by_category: Dict[str, List[Station]] = {}
+        self.by_type: Dict[str, List[Station]] = {}
+        self.by_status: Dict[str, List[Station]] = {}
+        # Posiciones de las estaciones por combinación (categoría, tipo, estado)
+        self._positions_by_profile: Dict[Tuple[str, str, str], List[int]] = {}
+        # Resultados de filtros ya resueltos; el registro no cambia tras construirse
+        self._filter_cache: Dict[Tuple[Optional[str], ...], List[Station]] = {}
+
+        for position, station in enumerate(self.stations):
+            # Las claves se normalizan igual que las consultas: un código con minúsculas también se encuentra
+            self.by_code[normalize_code(station.code)] = station
+            if station.legacy_code:
+                self.by_legacy_code[normalize_code(station.legacy_code)] = station
+            self.by_name.setdefault(normalize_name(station.name), []).append(station)
+            self.by_category.setdefault(_enum_value(station.category), []).append(station)
+            self.by_type.setdefault(_enum_value(station.station_type), []).append(station)
+            self.by_status.setdefault(_enum_value(station.status), []).append(station)
+            profile = (_enum_value(station.category), _enum_value(station.station_type), _enum_value(station.status))
+            self._positions_by_profile.setdefault(profile, []).append(position)
+
+        self._sorted_names = sorted(self.by_name)
+        self._spatial: Optional[StationSpatialIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    @property
+    def spatial(self) -> StationSpatialIndex:
+        """Índice espacial de las estaciones, construido en el primer uso"""
+        if self._spatial is None:
+            self._spatial = StationSpatialIndex(self.stations)
+        return self._spatial
+
+    def get(self, code: str) -> Optional[Station]:
+        """Busca una estación por su código"""
+        return self.by_code.get(normalize_code(code))
+
+    def get_by_legacy_code(self, legacy_code: str) -> Optional[Station]:
+        """Busca una estación por su código anterior (cod_old)"""
+        return self.by_legacy_code.get(normalize_code(legacy_code))
+
+    def find_by_name(self, name: str) -> List[Station]:
+        """Busca las estaciones cuyo nombre normalizado coincide exactamente"""
+        return list(self.by_name.get(normalize_name(name), []))
+
+    def find_by_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Station]:
+        """Busca las estaciones cuyo nombre normalizado empieza con el prefijo indicado"""
+        prefix = normalize_name(prefix)
+        result = []
+        index = bisect.bisect_left(self._sorted_names, prefix)
+        while index < len(self._sorted_names) and self._sorted_names[index].startswith(prefix):
+            result.extend(self.by_name[self._sorted_names[index]])
+            if limit is not None and len(result) >= limit:
+                return result[:limit]
+            index += 1
+        return result
+
+    def find_similar(self, name: str, limit: int = 5, cutoff: float = 0.75) -> List[Station]:
+        """Busca estaciones con nombres parecidos, tolerando errores de escritura"""
+        matches = difflib.get_close_matches(normalize_name(name), self._sorted_names, n=limit, cutoff=cutoff)
+        return [station for match in matches for station in self.by_name[match]]
+
+    def filter(self,
+               category: Optional[Union[StationCategory, str]] = None,
+               station_type: Optional[Union[StationType, str]] = None,
+               status: Optional[Union[StationStatus, str]] = None) -> List[Station]:
+        """
+        Filtra estaciones por categoría, tipo y/o estado usando los índices secundarios.
+        Los criterios no indicados no se aplican. El resultado conserva el orden original.
+        """
+        criteria = tuple(None if value is None else _enum_value(value) for value in (category, station_type, status))
+        if criteria not in self._filter_cache:
+            groups = [
+                positions for profile, positions in self._positions_by_profile.items()
+                if all(wanted is None or wanted == actual for wanted, actual in zip(criteria, profile))
+            ]
+            self._filter_cache[criteria] = [self.stations[position] for position in heapq.merge(*groups)]
+        return list(self._filter_cache[criteria])
@@ -1,30 +1,133 @@
 import settings
 from src.models import Station
+from src.station_registry import StationRegistry
+import hashlib
 import json
+import os
+import pickle
+import tempfile
 from urllib.parse import urlencode
 from typing import List, Optional
 
+# Versión del formato del snapshot; incrementar si cambia el modelo Station
+SNAPSHOT_VERSION = 1
+
+_stations: Optional[List[Station]] = None
+_registry: Optional[StationRegistry] = None
+
 def load_stations(path: str) -> list[Station]:
     with open(path, 'r', encoding=settings.CSV_ENCODING) as file:
         data_json = json.load(file)
     return [Station(**item) for item in data_json]
 
-stations = load_stations(settings.STATIONS_FILE)
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+def _snapshot_key() -> tuple:
+    """Identifica el formato del snapshot y los campos del modelo con que fue generado"""
+    return (SNAPSHOT_VERSION, tuple(Station.model_fields))
+
+def _read_snapshot(snapshot_path: str) -> Optional[dict]:
+    try:
+        with open(snapshot_path, 'rb') as file:
+            snapshot = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('key') != _snapshot_key():
+        return None
+    return snapshot
+
+def _write_snapshot(snapshot_path: str, snapshot: dict) -> None:
+    # Temporal de nombre único: varios procesos pueden regenerar el snapshot a la vez
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        print(f"{settings.WARNING} No se pudo guardar el snapshot de estaciones: {e}")
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def load_stations_cached(path: str = settings.STATIONS_FILE,
+                         snapshot_path: str = settings.STATIONS_SNAPSHOT_FILE) -> list[Station]:
+    """
+    Carga las estaciones desde un snapshot prevalidado junto al JSON.
+
+    El snapshot se reutiliza si el JSON conserva su fecha de modificación y tamaño,
+    o si su contenido (hash SHA-256) no cambió. En otro caso se valida el JSON
+    completo y se regenera el snapshot.
+    """
+    stat = os.stat(path)
+    snapshot = _read_snapshot(snapshot_path)
+
+    if snapshot and snapshot['mtime_ns'] == stat.st_mtime_ns and snapshot['size'] == stat.st_size:
+        return snapshot['stations']
+
+    source_hash = _file_sha256(path)
+    if snapshot and snapshot['sha256'] == source_hash:
+        # Solo cambió la fecha de modificación: se actualizan los metadatos
+        snapshot.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_snapshot(snapshot_path, snapshot)
+        return snapshot['stations']
+
+    stations = load_stations(path)
+    _write_snapshot(snapshot_path, {
+        'key': _snapshot_key(),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': source_hash,
+        'stations': stations,
+    })
+    return stations
+
+def get_stations() -> List[Station]:
+    """Retorna la lista de estaciones, cargándola en el primer uso"""
+    global _stations
+    if _stations is None:
+        _stations = load_stations_cached()
+    return _stations
+
+def get_registry() -> StationRegistry:
+    """Retorna el registro indexado de estaciones, construyéndolo en el primer uso"""
+    global _registry
+    if _registry is None:
+        _registry = StationRegistry(get_stations())
+    return _registry
+
+def __getattr__(name: str):
+    # Compatibilidad con el acceso directo a station_service.stations / registry
+    if name == 'stations':
+        return get_stations()
+    if name == 'registry':
+        return get_registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def find_station_by_code(code: str) -> Optional[Station]:
     """Busca una estación por su código"""
-    for est in stations:
-        if est.code == code:
-            return est
-    return None
+    return get_registry().get(code)
+
+def find_station_by_legacy_code(legacy_code: str) -> Optional[Station]:
+    """Busca una estación por su código anterior"""
+    return get_registry().get_by_legacy_code(legacy_code)
+
+def find_stations_by_name(name: str) -> List[Station]:
+    """Busca estaciones por nombre: coincidencia exacta, luego por prefijo y finalmente por similitud"""
+    registry = get_registry()
+    return registry.find_by_name(name) or registry.find_by_prefix(name) or registry.find_similar(name)
 
 def get_headers_for_station(station: Station) -> List[str]:
     """Obtiene los headers CSV apropiados para una estación"""
     return station.get_csv_headers()
 
-def create_station_url(station: Station) -> str:
+def get_table_start_line(station: Station) -> int:
+    """Índice de la primera fila de datos de la tabla (las automáticas tienen una sola fila de encabezado)"""
+    return 1 if station.status == "AUTOMATICA" else 2
+
+def create_station_url(station: Station, url_base: str = settings.BASE_URL) -> str:
     """Crea la URL para acceder a los datos de una estación"""
-    url_base = settings.BASE_URL
     params = {
         "cod": station.code,
         "estado": station.status,
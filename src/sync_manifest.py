@@ -0,0 +1,148 @@
+"""
+Manifiesto de meses descargados por estación para la sincronización incremental.
+
+Cada carpeta de estación en `output/csv/<Estación>/` guarda un `manifest.json` con
+los periodos YYYYMM ya descargados: archivo, número de filas, hash del contenido y
+fecha de descarga. Los meses cerrados hace más de `SYNC_FRESHNESS_DAYS` días no
+vuelven a cambiar en el sitio, por lo que no es necesario descargarlos de nuevo.
+
+Varios procesos pueden guardar meses de la misma estación (worker.py): cada escritura
+vuelve a leer el manifiesto bajo un bloqueo de archivo y solo reemplaza los periodos que
+registró, de modo que no descarta los que guardó otro proceso.
+"""
+
+import calendar
+import hashlib
+import json
+import os
+import tempfile
+import settings
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+from src.file_lock import exclusive_lock
+
+MANIFEST_FILENAME = "manifest.json"
+LOCK_FILENAME = ".manifest.lock"
+
+
+class SyncPlan(NamedTuple):
+    """Resultado de comparar las opciones del sitio con el manifiesto"""
+    to_fetch: List[Dict[str, str]]     # Opciones a descargar (faltantes o recientes)
+    missing: List[str]                 # Periodos sin descargar
+    stale: List[str]                   # Periodos descargados que aún pueden cambiar o están incompletos
+    skipped: List[str]                 # Periodos cerrados ya descargados
+    removed: List[str]                 # Periodos del manifiesto que ya no ofrece el sitio
+
+
+class SyncManifest:
+    """
+    Registro persistente de los periodos descargados de una estación
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_FILENAME)
+        self.lock_path = os.path.join(directory, LOCK_FILENAME)
+        self.entries: Dict[str, dict] = self._read()
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding=settings.CSV_ENCODING) as f:
+                return json.load(f).get("periods", {})
+        except (OSError, ValueError) as e:
+            print(f"{settings.WARNING} Manifiesto ilegible, se reconstruirá: {e}")
+            return {}
+
+    def get(self, period: str) -> Optional[dict]:
+        return self.entries.get(period)
+
+    def record(self, period: str, csv_content: str, filename: Optional[str] = None) -> None:
+        """
+        Registra la descarga de un periodo y guarda el manifiesto
+        """
+        self.entries[period] = {
+            "file": filename,
+            "rows": sum(1 for line in csv_content.split('\n') if line.strip()),
+            "sha256": hashlib.sha256(csv_content.encode(settings.CSV_ENCODING)).hexdigest(),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save([period])
+
+    def is_complete(self, period: str) -> bool:
+        """Un periodo está completo si tiene filas y su archivo individual sigue existiendo"""
+        entry = self.entries.get(period)
+        if not entry or entry.get("rows", 0) <= 0:
+            return False
+        filename = entry.get("file")
+        return filename is None or os.path.exists(os.path.join(self.directory, filename))
+
+    def save(self, periods: Optional[List[str]] = None) -> None:
+        """
+        Guarda el manifiesto de forma atómica, combinado con lo que otros procesos guardaron
+        desde que se leyó: se conservan sus periodos y se reemplazan solo `periods` (por
+        defecto, todos los de esta instancia)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with exclusive_lock(self.lock_path):
+            entries = self._read()
+            entries.update((period, self.entries[period]) for period in (self.entries if periods is None else periods))
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{MANIFEST_FILENAME}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding=settings.CSV_ENCODING) as f:
+                    json.dump({"periods": dict(sorted(entries.items()))}, f, indent=2)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        self.entries = entries
+
+
+def is_period_closed(period: str, freshness_days: int = settings.SYNC_FRESHNESS_DAYS,
+                     now: Optional[datetime] = None) -> bool:
+    """
+    Retorna True si el periodo YYYYMM terminó hace más de `freshness_days` días
+    """
+    year, month = int(period[:4]), int(period[4:6])
+    last_day = datetime(year, month, calendar.monthrange(year, month)[1])
+    return (now or datetime.now()) - last_day > timedelta(days=freshness_days)
+
+
+def plan_incremental_sync(options: List[Dict[str, str]], manifest: SyncManifest,
+                          valid_options: Optional[List[Dict[str, str]]] = None,
+                          freshness_days: int = settings.SYNC_FRESHNESS_DAYS,
+                          now: Optional[datetime] = None) -> SyncPlan:
+    """
+    Compara las opciones solicitadas con el manifiesto y decide cuáles descargar.
+
+    Args:
+        options: Opciones filtradas según el modo de consulta
+        manifest: Manifiesto de la estación
+        valid_options: Todas las opciones válidas del sitio, para detectar periodos retirados
+        freshness_days: Días tras el fin de mes durante los que un periodo aún puede cambiar
+        now: Fecha de referencia (por defecto, la actual)
+
+    Returns:
+        SyncPlan con las opciones a descargar y el detalle de la comparación
+    """
+    to_fetch, missing, stale, skipped = [], [], [], []
+
+    for option in options:
+        period = option['value']
+        if manifest.get(period) is None:
+            missing.append(period)
+            to_fetch.append(option)
+        elif not manifest.is_complete(period) or not is_period_closed(period, freshness_days, now):
+            stale.append(period)
+            to_fetch.append(option)
+        else:
+            skipped.append(period)
+
+    removed = []
+    if valid_options is not None:
+        offered = set(option['value'] for option in valid_options)
+        removed = sorted(period for period in manifest.entries if period not in offered)
+
+    return SyncPlan(to_fetch, missing, stale, skipped, removed)
@@ -0,0 +1,216 @@
+"""
+Cola de trabajo durable de tareas (estación, periodo YYYYMM) para repartir descargas entre procesos.
+
+La cola vive en un archivo SQLite que comparten todos los workers, en la misma máquina o
+en varias (el archivo debe estar en un sistema de archivos con bloqueos POSIX confiables).
+Cada worker reclama un lote de meses de una misma estación con un préstamo que vence tras
+`lease` segundos; mientras trabaja envía latidos que lo renuevan. Si el worker muere, el
+préstamo vence y los meses vuelven a quedar pendientes para otro. Al terminar, cada mes se
+registra una sola vez en `completions`: completar dos veces el mismo mes (por ejemplo, el
+worker original y el que lo retomó) no tiene efecto.
+
+Estados de una tarea: pending → leased → done | failed (tras `max_attempts` intentos).
+
+Las llamadas esperan el bloqueo del archivo hasta 30 s; desde asyncio se ejecutan con
+`asyncio.to_thread` para no detener el loop (ver worker.py). La conexión se comparte entre
+hilos y un candado serializa su uso dentro del proceso.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import settings
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from src.retry import RetryPolicy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    station_code  TEXT    NOT NULL,
+    period        TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    available_at  REAL    NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    last_error    TEXT,
+    PRIMARY KEY (station_code, period)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, available_at, station_code, period);
+CREATE TABLE IF NOT EXISTS completions (
+    station_code TEXT NOT NULL,
+    period       TEXT NOT NULL,
+    worker       TEXT NOT NULL,
+    outcome      TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (station_code, period)
+);
+"""
+
+STATUSES = ("pending", "leased", "done", "failed")
+
+
+class Task(NamedTuple):
+    """Mes de una estación reclamado por un worker"""
+    station_code: str
+    period: str        # YYYYMM
+    attempts: int      # Intentos, incluido el actual
+
+
+class WorkQueue:
+    """
+    Cola de tareas (estación, periodo) en SQLite con préstamos, latidos y completado idempotente.
+
+    Uso:
+        queue = WorkQueue("output/work_queue.sqlite")
+        queue.enqueue("472D30C8", ["202401", "202402"])
+        tasks = queue.claim("host-1")
+        ...
+        queue.complete("host-1", task.station_code, task.period)
+    """
+
+    def __init__(self, path: str = settings.WORK_QUEUE_FILE, lease: float = settings.WORK_QUEUE_LEASE,
+                 max_attempts: int = settings.WORK_QUEUE_MAX_ATTEMPTS, retry_policy: Optional[RetryPolicy] = None,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        # Espera antes de reintentar un mes fallido: crece con cada intento, hasta la vigencia de un préstamo
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=max_attempts,
+                                                        base_delay=settings.WORK_QUEUE_POLL_INTERVAL, max_delay=lease)
+        self.clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+        # check_same_thread=False: asyncio.to_thread puede usar un hilo distinto en cada llamada
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transacción con bloqueo de escritura desde el inicio: dos workers no reclaman la misma tarea"""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def enqueue(self, station_code: str, periods: Iterable[str]) -> int:
+        """
+        Agrega los meses de una estación; los que ya existen se conservan. Retorna cuántos se agregaron
+        """
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO tasks (station_code, period) VALUES (?, ?)",
+                           ((station_code, period) for period in periods))
+            return db.total_changes - before
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> int:
+        """Devuelve a pendientes los préstamos vencidos; agotados los intentos, la tarea falla"""
+        cursor = db.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_expires = NULL, last_error = 'Préstamo vencido sin latidos' "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, now))
+        return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        with self._transaction() as db:
+            return self._requeue_expired(db, self.clock())
+
+    def claim(self, worker: str, limit: int = settings.WORK_QUEUE_BATCH) -> List[Task]:
+        """
+        Reclama hasta `limit` meses pendientes de una misma estación (la primera con trabajo
+        disponible), para que el worker los descargue con una sola carga de la página
+        """
+        now = self.clock()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            row = db.execute(
+                "SELECT station_code FROM tasks WHERE status = 'pending' AND available_at <= ? "
+                "ORDER BY station_code, period LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return []
+            rows = db.execute(
+                "SELECT period, attempts FROM tasks WHERE station_code = ? AND status = 'pending' "
+                "AND available_at <= ? ORDER BY period LIMIT ?", (row[0], now, limit)).fetchall()
+            db.executemany(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                "WHERE station_code = ? AND period = ?",
+                ((worker, now + self.lease, row[0], period) for period, _ in rows))
+            return [Task(row[0], period, attempts + 1) for period, attempts in rows]
+
+    def heartbeat(self, worker: str, tasks: Iterable[Task]) -> int:
+        """
+        Renueva el préstamo de las tareas que el worker aún tiene. Retorna cuántas se renovaron;
+        una tarea que ya no se renueva fue retomada por otro worker tras vencer su préstamo
+        """
+        expires = self.clock() + self.lease
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany(
+                "UPDATE tasks SET lease_expires = ? WHERE station_code = ? AND period = ? "
+                "AND status = 'leased' AND lease_owner = ?",
+                ((expires, task.station_code, task.period, worker) for task in tasks))
+            return db.total_changes - before
+
+    def complete(self, worker: str, station_code: str, period: str, outcome: str = "downloaded") -> bool:
+        """
+        Registra el mes como terminado. Idempotente: retorna False si ya estaba registrado.
+        Se acepta aunque el préstamo haya vencido, porque los datos ya están guardados.
+        """
+        with self._transaction() as db:
+            inserted = db.execute(
+                "INSERT OR IGNORE INTO completions (station_code, period, worker, outcome, completed_at) "
+                "VALUES (?, ?, ?, ?, ?)", (station_code, period, worker, outcome, self.clock())).rowcount
+            db.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, last_error = NULL "
+                "WHERE station_code = ? AND period = ?", (station_code, period))
+            return bool(inserted)
+
+    def fail(self, worker: str, task: Task, error: str) -> str:
+        """
+        Libera un mes que no se pudo descargar: vuelve a pendientes tras una espera creciente,
+        o queda como fallido al agotar los intentos. Retorna el nuevo estado, o "lost" si el worker
+        ya no tenía el préstamo (otro worker retomó la tarea) y no se modificó nada
+        """
+        status = "failed" if task.attempts >= self.max_attempts else "pending"
+        available_at = self.clock() + self.retry_policy.delay(task.attempts)
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = ? WHERE station_code = ? AND period = ? AND status = 'leased' AND lease_owner = ?",
+                (status, available_at, error, task.station_code, task.period, worker)).rowcount
+        return status if updated else "lost"
+
+    def retry_failed(self) -> int:
+        """Vuelve a poner en la cola las tareas fallidas, con sus intentos reiniciados"""
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, available_at = 0 WHERE status = 'failed'").rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Tareas por estado"""
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._query("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+        return counts
+
+    def failures(self, limit: int = 20) -> List[tuple]:
+        """Últimos errores de las tareas fallidas: (estación, periodo, intentos, error)"""
+        return self._query(
+            "SELECT station_code, period, attempts, last_error FROM tasks WHERE status = 'failed' "
+            "ORDER BY station_code, period LIMIT ?", (limit,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
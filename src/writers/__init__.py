@@ -0,0 +1,35 @@
+"""
+Escritores de archivos de salida.
+
+Los escritores Parquet y SQLite dependen de numpy/pyarrow: se importan en el primer acceso
+para que usar solo el CSV no cargue esas dependencias.
+"""
+
+import importlib
+
+from .csv_writer import StreamingCSVWriter
+from .ndjson_writer import NDJSONWriter
+from .xlsx_writer import XLSXWriter
+
+# Nombre exportado -> submódulo que lo define
+_LAZY_EXPORTS = {
+    "ParquetDatasetWriter": ".parquet_writer",
+    "read_observations": ".parquet_writer",
+    "ObservationStore": ".sqlite_writer",
+    "SQLiteObservationWriter": ".sqlite_writer",
+}
+
+__all__ = [
+    "StreamingCSVWriter",
+    "ParquetDatasetWriter",
+    "read_observations",
+    "ObservationStore",
+    "SQLiteObservationWriter",
+    "NDJSONWriter",
+    "XLSXWriter",
+]
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,142 @@
+"""
+Escritura incremental del archivo consolidado.
+
+Las filas de cada mes se escriben en un archivo temporal apenas se procesan, con
+un buffer de escritura grande, y el archivo se renombra a su nombre final al
+terminar. La memoria usada no depende de la longitud del periodo consultado y, si
+el proceso se interrumpe, los meses ya procesados quedan en el archivo `.part`.
+
+Los meses que llegan fuera de orden (por ejemplo, recuperados en un reintento) se
+reubican al publicar el archivo, copiando cada bloque en orden cronológico.
+"""
+
+import codecs
+import os
+import settings
+from typing import Iterable, List, Optional, Tuple
+
+PARTIAL_SUFFIX = ".part"
+
+
+class StreamingCSVWriter:
+    """
+    Escritor de CSV consolidado que añade los meses a medida que llegan
+    """
+
+    def __init__(self, filepath: str, headers: Optional[List[str]] = None,
+                 separator: str = settings.CSV_SEPARATOR, encoding: str = settings.CSV_ENCODING,
+                 buffer_size: int = settings.CSV_WRITE_BUFFER_SIZE):
+        self.filepath = filepath
+        self.temp_path = f"{filepath}{PARTIAL_SUFFIX}"
+        self.headers = headers or []
+        self.separator = separator
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.line_count = 0
+        self.periods: List[str] = []
+        self._blocks: List[Tuple[str, int, int]] = []  # (periodo, inicio, fin) en bytes dentro del archivo temporal
+        self._file = None
+        self._size = 0  # Bytes escritos; tell() vaciaría el buffer en cada llamada
+        self._encoder = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self) -> "StreamingCSVWriter":
+        """
+        Crea el archivo temporal y escribe los encabezados
+        """
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        self._file = open(self.temp_path, 'w', encoding=self.encoding, buffering=self.buffer_size)
+        # Mismo codificador que el archivo para contar los bytes; el BOM (utf-8-sig) precede al primer bloque
+        self._encoder = codecs.getincrementalencoder(self.encoding)()
+        self._size = len(self._encoder.encode(""))
+        if self.headers:
+            self._write_line(self.separator.join(self.headers))
+        return self
+
+    def _write_line(self, line: str) -> None:
+        # Separador antes de cada línea: el archivo final no termina en salto de línea
+        self._file.write(f"\n{line}" if self.line_count else line)
+        # En modo texto "\n" se escribe como os.linesep
+        self._size += len(self._encoder.encode(f"{os.linesep}{line}" if self.line_count else line))
+        self.line_count += 1
+
+    def write_lines(self, period: str, lines: Iterable[str]) -> int:
+        """
+        Añade las filas de un periodo y retorna cuántas se escribieron
+        """
+        if self._file is None:
+            raise RuntimeError("El escritor consolidado no está abierto")
+        start = self._size
+        written = 0
+        for line in lines:
+            self._write_line(line)
+            written += 1
+        self.periods.append(period)
+        self._blocks.append((period, start, self._size))
+        return written
+
+    def _sort_blocks(self) -> None:
+        """
+        Reescribe el archivo temporal con los bloques de cada periodo en orden cronológico
+        """
+        encoder = codecs.getincrementalencoder(self.encoding)()
+        encoder.encode("")  # El BOM (utf-8-sig) va solo al inicio del archivo, no en cada salto de línea
+        newline = encoder.encode(os.linesep)
+        sorted_path = f"{self.temp_path}.sorted"
+        header_end = self._blocks[0][1]
+        with open(self.temp_path, 'rb') as source, open(sorted_path, 'wb', buffering=self.buffer_size) as target:
+            target.write(source.read(header_end))
+            first = not self.headers
+            for _, start, end in sorted(self._blocks):
+                source.seek(start)
+                block = source.read(end - start)
+                if not block:
+                    continue
+                # Cada bloque empieza con un salto de línea, salvo el primero de un archivo sin encabezados
+                if not block.startswith(newline):
+                    block = newline + block
+                if first:
+                    block = block[len(newline):]
+                    first = False
+                target.write(block)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(sorted_path, self.temp_path)
+        self.periods.sort()
+
+    def commit(self) -> str:
+        """
+        Vuelca el buffer al disco y renombra el archivo temporal a su nombre final
+        """
+        if self._file is None:
+            raise RuntimeError("El escritor consolidado no está abierto")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        if self.periods != sorted(self.periods):
+            self._sort_blocks()
+        os.replace(self.temp_path, self.filepath)
+        return self.filepath
+
+    def close(self, keep_partial: bool = True) -> None:
+        """
+        Cierra el archivo sin publicarlo; por defecto conserva los datos parciales
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not keep_partial and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __enter__(self) -> "StreamingCSVWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None and self.is_open:
+            self.commit()
+        else:
+            self.close()
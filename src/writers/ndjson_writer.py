@@ -0,0 +1,88 @@
+"""
+Exportación NDJSON: un objeto JSON por lectura, una lectura por línea.
+
+Cada mes se convierte a texto columna por columna con NumPy y se escribe apenas
+llega, por lo que la memoria no depende del tamaño del periodo exportado.
+
+A diferencia del CSV consolidado, las líneas no se reordenan: un mes recuperado en un
+reintento (retry_failed_options) queda después de los meses posteriores a él. Cada línea
+lleva su fecha, así que el consumidor debe ordenar por ella si necesita el orden cronológico.
+"""
+
+import json
+import os
+import settings
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from src.columnar import ColumnarTable
+
+
+def _column_text(table: "ColumnarTable", field: str) -> List[str]:
+    """Valores de una columna como texto JSON; `null` donde no hay dato"""
+    text = table.columns[field].astype(str)  # Representación más corta de cada float32 (15.9, no 15.899999...)
+    mask = table.masks.get(field)
+    if mask is not None and mask.any():
+        text = text.astype(object)
+        text[mask] = "null"
+    return text.tolist()
+
+
+class NDJSONWriter:
+    """
+    Escritor NDJSON de los meses de una estación, en orden de llegada
+    """
+
+    def __init__(self, filepath: str, station_code: Optional[str] = None,
+                 encoding: str = settings.CSV_ENCODING, buffer_size: int = settings.CSV_WRITE_BUFFER_SIZE):
+        self.filepath = filepath
+        self.temp_path = f"{filepath}.part"
+        self.station_code = station_code
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.record_count = 0
+        self._file = None
+
+    def write_table(self, period: str, table: "ColumnarTable") -> None:
+        """
+        Añade las lecturas de un periodo YYYYMM
+        """
+        if not len(table):
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+            self._file = open(self.temp_path, 'w', encoding=self.encoding, buffering=self.buffer_size)
+
+        prefix = "{"
+        if self.station_code is not None:
+            prefix += f'"station":{json.dumps(self.station_code)},'
+        keys = [json.dumps(field) for field in table.fields]
+        columns = [_column_text(table, field) for field in table.fields]
+
+        self._file.writelines(
+            prefix + ",".join(f"{key}:{value}" for key, value in zip(keys, values)) + "}\n"
+            for values in zip(*columns)
+        )
+        self.record_count += len(table)
+
+    def close(self) -> List[str]:
+        """
+        Publica el archivo y retorna su ruta (lista vacía si no se escribió nada)
+        """
+        if self._file is None:
+            return []
+        self._file.close()
+        self._file = None
+        os.replace(self.temp_path, self.filepath)
+        return [self.filepath]
+
+    def abort(self, keep_partial: bool = True) -> None:
+        """
+        Cierra el archivo sin publicarlo (por ejemplo, tras un error); por defecto conserva
+        las lecturas ya escritas en el archivo `.part`
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not keep_partial and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
@@ -0,0 +1,218 @@
+"""
+Salida columnar en Parquet, particionada por estación y año.
+
+Los archivos siguen la convención de particiones `station=<código>/year=<YYYY>/`,
+con un archivo por año. Los tipos de cada columna salen de `models/data_schema.py`
+y los valores sin dato se guardan como nulos. Al leer, la estación y el año se
+filtran por partición y el mes por las estadísticas de los grupos de filas, sin
+leer los datos que no cumplen el filtro.
+
+Los grupos de filas agrupan meses completos hasta reunir `PARQUET_ROW_GROUP_ROWS`
+filas: un grupo por mes (unas 30 filas en las estaciones convencionales) hace que
+los metadatos pesen más que los propios datos.
+"""
+
+import os
+import tempfile
+import settings
+from typing import TYPE_CHECKING, Dict, List, Optional
+from src.file_lock import exclusive_lock
+from src.models.data_schema import get_column_dtypes
+
+if TYPE_CHECKING:
+    from src.columnar import ColumnarTable
+
+PARQUET_FILENAME = "data.parquet"
+LOCK_FILENAME = ".data.parquet.lock"
+
+# La estación y el año van en la ruta, no dentro del archivo
+PARTITION_FIELDS = ("station", "year")
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("station", pa.string()), ("year", pa.int16())]), flavor="hive")
+
+
+def arrow_schema(headers: List[str]):
+    """
+    Esquema Arrow de los datos de una estación, sin las columnas de partición
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        (field, pa.from_numpy_dtype(dtype))
+        for field, dtype in get_column_dtypes(headers).items()
+        if field not in PARTITION_FIELDS
+    ])
+
+
+def table_to_arrow(table: "ColumnarTable", schema):
+    """
+    Convierte una tabla columnar en una tabla Arrow, con nulos donde no hay dato
+    """
+    import pyarrow as pa
+
+    return pa.table({
+        field.name: pa.array(table.columns[field.name], type=field.type, mask=table.masks.get(field.name))
+        for field in schema
+    }, schema=schema)
+
+
+class ParquetDatasetWriter:
+    """
+    Escribe los meses de una estación en su partición anual de Parquet.
+
+    Los meses de un año se guardan en memoria (como columnas tipadas) hasta que
+    llega otro año o se cierra el escritor. Entonces el archivo anual se reescribe
+    de forma atómica, conservando los meses previos que no se volvieron a descargar.
+    La lectura, combinación y reemplazo se hacen bajo un bloqueo de la partición, para
+    que dos workers que guardan la misma estación y año no descarten meses del otro.
+    """
+
+    def __init__(self, station_code: str, headers: List[str], root_dir: str = settings.PARQUET_DIR,
+                 compression: str = settings.PARQUET_COMPRESSION,
+                 row_group_rows: int = settings.PARQUET_ROW_GROUP_ROWS):
+        self.station_code = station_code
+        self.headers = headers
+        self.root_dir = root_dir
+        self.compression = compression
+        self.row_group_rows = row_group_rows
+        self.schema = arrow_schema(headers)
+        self.files_written: List[str] = []
+        self._year: Optional[int] = None
+        self._months: Dict[int, object] = {}
+
+    def partition_path(self, year: int) -> str:
+        return os.path.join(self.root_dir, f"station={self.station_code}", f"year={year}", PARQUET_FILENAME)
+
+    def write_table(self, period: str, table: "ColumnarTable") -> None:
+        """
+        Añade los datos de un periodo YYYYMM
+        """
+        year, month = int(period[:4]), int(period[4:6])
+        if self._year is not None and year != self._year:
+            self._flush_year()
+        self._year = year
+        self._months[month] = table_to_arrow(table, self.schema)
+
+    def _read_existing_months(self, path: str) -> Dict[int, object]:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        if not os.path.exists(path):
+            return {}
+        try:
+            existing = pq.read_table(path)
+        except Exception as e:
+            print(f"{settings.WARNING} No se pudo leer {path}, se reemplazará: {e}")
+            return {}
+        if existing.schema.remove_metadata() != self.schema:
+            print(f"{settings.WARNING} Esquema distinto en {path}, se reemplazará")
+            return {}
+
+        return {
+            month: existing.filter(pc.equal(existing.column("month"), month))
+            for month in pc.unique(existing.column("month")).to_pylist()
+        }
+
+    def _row_groups(self, months: Dict[int, object]) -> List[List[object]]:
+        """Agrupa meses consecutivos completos hasta reunir `row_group_rows` filas"""
+        groups, current, rows = [], [], 0
+        for month in sorted(months):
+            current.append(months[month])
+            rows += months[month].num_rows
+            if rows >= self.row_group_rows:
+                groups.append(current)
+                current, rows = [], 0
+        if current:
+            groups.append(current)
+        return groups
+
+    def _flush_year(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._year is None or not self._months:
+            return
+
+        path = self.partition_path(self._year)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Nombres ocultos: el lector de datasets ignora los archivos que empiezan con "."
+        with exclusive_lock(os.path.join(directory, LOCK_FILENAME)):
+            months = self._read_existing_months(path)
+            months.update(self._months)
+
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{PARQUET_FILENAME}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                with pq.ParquetWriter(temp_path, self.schema, compression=self.compression) as writer:
+                    for group in self._row_groups(months):
+                        # Un mes nunca se divide entre grupos: sus estadísticas permiten filtrar por fecha
+                        table = pa.concat_tables(group)
+                        writer.write_table(table, row_group_size=max(table.num_rows, 1))
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        self.files_written.append(path)
+        self._year = None
+        self._months = {}
+
+    def close(self) -> List[str]:
+        """
+        Escribe el año pendiente y retorna los archivos generados
+        """
+        self._flush_year()
+        return self.files_written
+
+
+def read_observations(root_dir: str = settings.PARQUET_DIR, stations: Optional[List[str]] = None,
+                      start_period: Optional[str] = None, end_period: Optional[str] = None,
+                      columns: Optional[List[str]] = None):
+    """
+    Lee las observaciones guardadas en Parquet con filtros por estación y fecha.
+
+    Args:
+        root_dir: Directorio raíz del dataset
+        stations: Códigos de estación (por defecto, todas)
+        start_period: Primer periodo YYYYMM incluido (opcional)
+        end_period: Último periodo YYYYMM incluido (opcional)
+        columns: Columnas a leer (por defecto, todas); `station` y `year` siempre están disponibles
+
+    Returns:
+        Tabla Arrow con las filas que cumplen el filtro
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root_dir, format="parquet", partitioning=_partitioning())
+
+    # Las estaciones tienen columnas distintas: se unifican los esquemas de todos los archivos
+    schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+    if not schemas:
+        return pa.table({})
+    schema = pa.unify_schemas(schemas + [_partitioning().schema])
+    dataset = ds.dataset(root_dir, format="parquet", partitioning=_partitioning(), schema=schema)
+
+    year, month = ds.field("year"), ds.field("month")
+    conditions = []
+    if stations:
+        conditions.append(ds.field("station").isin(stations))
+    if start_period:
+        start_year, start_month = int(start_period[:4]), int(start_period[4:6])
+        conditions.append((year > start_year) | ((year == start_year) & (month >= start_month)))
+    if end_period:
+        end_year, end_month = int(end_period[:4]), int(end_period[4:6])
+        conditions.append((year < end_year) | ((year == end_year) & (month <= end_month)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=columns, filter=expression)
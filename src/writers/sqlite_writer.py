@@ -0,0 +1,237 @@
+"""
+Almacén SQLite de observaciones con clave (estación, instante).
+
+Todas las estaciones comparten una tabla ancha `observations` con una columna REAL por
+campo de medición de `models/data_schema.py` (nula donde la estación no la tiene o la
+tabla indica `S/D`). La clave primaria (station, ts) es el orden físico de la tabla
+(WITHOUT ROWID): las filas de una estación quedan contiguas y ordenadas por fecha, y
+una consulta por rango recorre solo esas filas.
+
+`ts` son los segundos desde 1970 de la fecha y hora locales de la tabla, sin zona
+horaria (la medianoche en las estaciones diarias). Cada mes se guarda en una sola
+transacción con upsert: volver a descargar un periodo reemplaza sus valores en lugar
+de duplicar filas, y solo actualiza los campos que la estación reporta.
+"""
+
+import os
+import sqlite3
+import numpy as np
+import settings
+from datetime import date
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from src.models.data_schema import COLUMN_FIELDS, TIME_FIELD_DTYPES, MEASUREMENT_DTYPE
+
+if TYPE_CHECKING:
+    from src.columnar import ColumnarTable
+
+# Campos de medición de todas las estaciones, en el orden de data_schema.py
+MEASUREMENT_FIELDS = list(dict.fromkeys(
+    field for field in COLUMN_FIELDS.values() if field not in TIME_FIELD_DTYPES
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    station TEXT    NOT NULL,
+    ts      INTEGER NOT NULL,
+    {columns},
+    PRIMARY KEY (station, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stations (
+    station    TEXT PRIMARY KEY,
+    fields     TEXT NOT NULL,
+    first_ts   INTEGER,
+    last_ts    INTEGER
+);
+""".format(columns=",\n    ".join(f"{field} REAL" for field in MEASUREMENT_FIELDS))
+
+MMAP_SIZE = 256 * 1024 ** 2
+
+DateLike = Union[str, date, np.datetime64, None]
+
+
+def observation_times(table: "ColumnarTable") -> np.ndarray:
+    """Segundos desde 1970 de cada fila (fecha y hora locales de la tabla)"""
+    from src.columnar import day_numbers
+
+    seconds = day_numbers(table) * 86400
+    if "hour" in table.columns:
+        seconds += table["hour"].astype(np.int64) * 3600
+    return seconds
+
+
+def to_timestamp(value: DateLike, end: bool = False) -> Optional[int]:
+    """
+    Convierte una fecha ("2024", "2024-01", "2024-01-31", "2024-01-31T06:00", date, datetime64)
+    a segundos desde 1970. Con `end=True` retorna el inicio de la unidad siguiente, de modo que
+    "2024-01" como fin de rango incluye todo enero
+    """
+    if value is None:
+        return None
+    instant = np.datetime64(value)
+    if end:
+        instant = instant + np.timedelta64(1, np.datetime_data(instant.dtype)[0])
+    return int(instant.astype("datetime64[s]").astype(np.int64))
+
+
+class ObservationStore:
+    """
+    Observaciones de todas las estaciones en un archivo SQLite.
+
+    Uso:
+        with ObservationStore("output/observations.sqlite") as store:
+            store.upsert("472D30C8", table)
+            datos = store.query("472D30C8", "2020-01-01", "2023-12-31", ["temperature"])
+            datos["time"], datos["temperature"]
+    """
+
+    def __init__(self, path: str = settings.SQLITE_STORE_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # WAL: las consultas no bloquean la escritura de otros procesos (rebuild en paralelo, scraper)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        # Lecturas por mmap: las consultas por rango no copian cada página al caché de SQLite
+        self._connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "ObservationStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def upsert(self, station_code: str, table: "ColumnarTable") -> int:
+        """
+        Inserta o reemplaza las filas de una tabla en una sola transacción.
+        Retorna cuántas filas se escribieron
+        """
+        if not len(table):
+            return 0
+        fields = [field for field in table.fields if field in MEASUREMENT_FIELDS]
+        times = observation_times(table)
+
+        columns = []
+        for field in fields:
+            # float64: tolist() entrega el mismo valor que el float32, y None donde no hay dato
+            values = table.columns[field].astype(np.float64).astype(object)
+            values[table.masks[field]] = None
+            columns.append(values.tolist())
+
+        names = ", ".join(fields)
+        placeholders = ", ".join("?" * (len(fields) + 2))
+        updates = ", ".join(f"{field} = excluded.{field}" for field in fields)
+        sql = (f"INSERT INTO observations (station, ts{', ' if fields else ''}{names}) VALUES ({placeholders}) "
+               f"ON CONFLICT (station, ts) DO {'UPDATE SET ' + updates if fields else 'NOTHING'}")
+        rows = zip([station_code] * len(times), times.tolist(), *columns)
+
+        db = self._connection
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(sql, rows)
+            self._update_station(db, station_code, fields, int(times.min()), int(times.max()))
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return len(times)
+
+    @staticmethod
+    def _update_station(db: sqlite3.Connection, station_code: str, fields: List[str], first: int, last: int) -> None:
+        row = db.execute("SELECT fields, first_ts, last_ts FROM stations WHERE station = ?", (station_code,)).fetchone()
+        if row is not None:
+            known = row[0].split(",") if row[0] else []
+            fields = known + [field for field in fields if field not in known]
+            first, last = min(first, row[1]), max(last, row[2])
+        db.execute("INSERT OR REPLACE INTO stations (station, fields, first_ts, last_ts) VALUES (?, ?, ?, ?)",
+                   (station_code, ",".join(fields), first, last))
+
+    def stations(self) -> Dict[str, dict]:
+        """Estaciones guardadas: campos que reportan y rango de fechas"""
+        return {
+            station: {"fields": fields.split(",") if fields else [],
+                      "first": np.datetime64(first, "s"), "last": np.datetime64(last, "s")}
+            for station, fields, first, last in self._connection.execute(
+                "SELECT station, fields, first_ts, last_ts FROM stations ORDER BY station")
+        }
+
+    def query(self, station_code: str, start: DateLike = None, end: DateLike = None,
+              columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Lee las observaciones de una estación en un rango de fechas.
+
+        Args:
+            station_code: Código de la estación
+            start: Inicio del rango (opcional), p. ej. "2020-01-01" o "2020-01"
+            end: Fin del rango, incluido completo (opcional): "2023-12-31" llega hasta las 23:00 de ese día
+            columns: Campos de medición a leer (por defecto, los que reporta la estación)
+
+        Returns:
+            Diccionario con `time` (datetime64[s]) y un arreglo float32 por campo, NaN donde no hay dato
+
+        Raises:
+            ValueError: Si algún campo no existe
+        """
+        if columns is None:
+            row = self._connection.execute("SELECT fields FROM stations WHERE station = ?", (station_code,)).fetchone()
+            columns = row[0].split(",") if row and row[0] else []
+        unknown = [column for column in columns if column not in MEASUREMENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+
+        conditions, params = ["station = ?"], [station_code]
+        for operator, timestamp in ((">=", to_timestamp(start)), ("<", to_timestamp(end, end=True))):
+            if timestamp is not None:
+                conditions.append(f"ts {operator} ?")
+                params.append(timestamp)
+
+        select = ", ".join(["ts"] + columns)
+        cursor = self._connection.execute(
+            f"SELECT {select} FROM observations WHERE {' AND '.join(conditions)} ORDER BY ts", params)
+
+        # Las filas se vuelcan directo a un arreglo float64 (None → NaN), sin una lista intermedia;
+        # los segundos caben sin pérdida en un float64
+        data = np.fromiter(chain.from_iterable(cursor), dtype=np.float64).reshape(-1, len(columns) + 1)
+        result = {"time": data[:, 0].astype(np.int64).astype("datetime64[s]")}
+        for index, column in enumerate(columns, start=1):
+            result[column] = data[:, index].astype(MEASUREMENT_DTYPE)
+        return result
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class SQLiteObservationWriter:
+    """
+    Salida adicional (ver CSVManager.table_writers) que guarda cada mes en el almacén SQLite
+    """
+
+    def __init__(self, station_code: str, path: str = settings.SQLITE_STORE_FILE):
+        self.station_code = station_code
+        self.path = path
+        self.rows_written = 0
+        self._store: Optional[ObservationStore] = None
+
+    def write_table(self, period: str, table: "ColumnarTable") -> None:
+        """
+        Guarda las lecturas de un periodo YYYYMM
+        """
+        if not len(table):
+            return
+        if self._store is None:
+            self._store = ObservationStore(self.path)
+        self.rows_written += self._store.upsert(self.station_code, table)
+
+    def close(self) -> List[str]:
+        """
+        Cierra la conexión y retorna el archivo si se escribió algo
+        """
+        if self._store is None:
+            return []
+        self._store.close()
+        self._store = None
+        return [self.path] if self.rows_written else []
@@ -0,0 +1,91 @@
+"""
+Exportación a Excel con una hoja por año.
+
+Usa el modo de solo escritura de openpyxl: las filas se vuelcan a disco a medida
+que se añaden y la memoria no crece con el número de filas, lo que permite
+exportar periodos horarios de varios años.
+
+El modo de solo escritura no permite insertar filas: los meses quedan en orden de
+llegada. Un mes recuperado en un reintento (retry_failed_options) queda al final de la
+hoja de su año, y si es el primero de su año, esa hoja queda después de las siguientes.
+"""
+
+import os
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from src.columnar import ColumnarTable
+
+
+def _column_values(table: "ColumnarTable", field: str) -> list:
+    """Valores de una columna como tipos de Python; None donde no hay dato"""
+    column = table.columns[field]
+    if field == "hour":
+        return [f"{hour:02d}:00" for hour in column.tolist()]
+    if column.dtype.kind != 'f':
+        return column.tolist()
+    # Vía texto para conservar el valor mostrado por la tabla (15.9, no 15.899999...)
+    values = [float(value) for value in column.astype(str)]
+    mask = table.masks.get(field)
+    if mask is not None:
+        for index in mask.nonzero()[0].tolist():
+            values[index] = None
+    return values
+
+
+class XLSXWriter:
+    """
+    Escritor XLSX de los meses de una estación, con una hoja por año
+    """
+
+    def __init__(self, filepath: str, headers: List[str]):
+        from openpyxl import Workbook
+
+        self.filepath = filepath
+        self.headers = headers
+        self.row_count = 0
+        # openpyxl decide el formato por la extensión: el temporal conserva ".xlsx"
+        self.temp_path = os.path.join(os.path.dirname(filepath), f".{os.path.basename(filepath)}")
+        self._workbook = Workbook(write_only=True)
+        self._sheets = {}
+
+    def _sheet(self, year: str):
+        if year not in self._sheets:
+            sheet = self._workbook.create_sheet(title=year)
+            sheet.append(self.headers)
+            self._sheets[year] = sheet
+        return self._sheets[year]
+
+    def write_table(self, period: str, table: "ColumnarTable") -> None:
+        """
+        Añade las filas de un periodo YYYYMM a la hoja de su año
+        """
+        if not len(table):
+            return
+        sheet = self._sheet(period[:4])
+        for row in zip(*(_column_values(table, field) for field in table.fields)):
+            sheet.append(row)
+        self.row_count += len(table)
+
+    def close(self) -> List[str]:
+        """
+        Guarda el libro y retorna su ruta (lista vacía si no se escribió nada)
+        """
+        if self._workbook is None or not self._sheets:
+            self._workbook = None
+            return []
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        self._workbook.save(self.temp_path)
+        self._workbook = None
+        os.replace(self.temp_path, self.filepath)
+        return [self.filepath]
+
+    def abort(self, keep_partial: bool = True) -> None:
+        """
+        Descarta el libro sin publicarlo (por ejemplo, tras un error); con `keep_partial`
+        guarda las hojas ya escritas en el archivo temporal oculto
+        """
+        if self._workbook is not None and self._sheets and keep_partial:
+            os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+            self._workbook.save(self.temp_path)
+        self._workbook = None
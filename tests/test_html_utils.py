@@ -0,0 +1,47 @@
+"""
+Paridad del tokenizador de tablas (`html_table_to_csv`) con la implementación de referencia
+con BeautifulSoup (`html_table_to_csv_soup`), sobre tablas sintéticas y casos de borde.
+"""
+
+import pytest
+from benchmarks.generators import make_daily_table, make_hourly_table
+from src.html_utils import extract_table_rows, html_table_to_csv, html_table_to_csv_soup
+
+pytest.importorskip("bs4")
+
+HEADER = '<tr><th>AÑO / MES / DÍA</th><th>VALOR</th></tr>'
+
+EDGE_CASES = {
+    "menor_literal": '<td>1 < 2</td><td>a&lt;b <b>c</b></td>',
+    "script_y_style": '<td>10.5<script>if (a<b) { x = "</td>"; }</script></td><td> 3 <STYLE>td{}</STYLE> 4 </td>',
+    "comentarios": '<td>7.<!-- oculto -->5</td><td><!-- <td>9</td> -->8</td>',
+    "entidades_y_espacios": '<td>\n  12.0&nbsp;</td><td>S/D</td>',
+    "tabla_anidada": '<td>1.0</td><td><table><tr><td>in</td><td>2</td></tr></table>out</td>',
+    "atributos_con_mayor": '<td title="a > b">5.5</td><td class=\'x\'>6</td>',
+}
+
+
+def _table(cells: str) -> str:
+    return f'<table id="dataTable">{HEADER}<tr><td>2024-01-01</td>{cells}</tr><tr><td>2024-01-02</td><td>1</td></tr></table>'
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("make_table, start_line", [(make_daily_table, 2), (make_hourly_table, 1)])
+def test_fixture_tables_match_reference(make_table, start_line, seed):
+    html_content = make_table(2024, 2, missing_ratio=0.1, seed=seed)
+    for line in (0, start_line):
+        assert html_table_to_csv(html_content, start_line=line) == html_table_to_csv_soup(html_content, start_line=line)
+
+
+@pytest.mark.parametrize("cells", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_edge_cases_match_reference(cells):
+    html_content = _table(cells)
+    assert html_table_to_csv(html_content, start_line=1) == html_table_to_csv_soup(html_content, start_line=1)
+
+
+def test_edge_cases_text():
+    assert extract_table_rows(_table(EDGE_CASES["menor_literal"]))[1][1:] == ["1 < 2", "a<bc"]
+    assert extract_table_rows(_table(EDGE_CASES["script_y_style"]))[1][1:] == ["10.5", "34"]
+    assert extract_table_rows(_table(EDGE_CASES["tabla_anidada"])) == [
+        ["AÑO / MES / DÍA", "VALOR"], ["2024-01-01", "1.0", "in2out"], ["2024-01-02", "1"],
+    ]
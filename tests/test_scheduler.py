@@ -0,0 +1,61 @@
+"""
+Pruebas del bucle de scheduler.py con actualizaciones simuladas (sin navegador).
+"""
+
+import asyncio
+import scheduler as scheduler_cli
+from types import SimpleNamespace
+from src.refresh_scheduler import RefreshScheduler
+
+REFRESH_SECONDS = 0.2
+
+
+def make_scheduler(count: int) -> tuple:
+    scheduler = RefreshScheduler(state_file=None, intervals={"AUTOMATICA": 3600})
+    stations = {f"S{number}": SimpleNamespace(code=f"S{number}", name=f"Estación {number}", status="AUTOMATICA")
+                for number in range(count)}
+    scheduler.add_all(stations.values())
+    return scheduler, stations
+
+
+def test_saturated_budget_waits_for_running_refreshes(monkeypatch):
+    scheduler, stations = make_scheduler(3)
+    iterations = 0
+    due = scheduler.due
+
+    def counting_due(limit):
+        nonlocal iterations
+        iterations += 1
+        return due(limit)
+
+    async def fake_refresh(scheduler, pool, station):
+        await asyncio.sleep(REFRESH_SECONDS)
+        scheduler.finish(station.code, True)
+
+    monkeypatch.setattr(scheduler, "due", counting_due)
+    monkeypatch.setattr(scheduler_cli, "refresh_station", fake_refresh)
+
+    # Tres estaciones vencidas y dos lugares: la tercera espera a que termine una de las dos primeras
+    asyncio.run(scheduler_cli.run_scheduler(scheduler, pool=None, stations=stations, concurrency=2, once=True))
+
+    assert all(schedule.last_success for schedule in scheduler.stations.values())
+    assert iterations <= 5
+
+
+def test_stop_event_ends_loop_while_saturated(monkeypatch):
+    scheduler, stations = make_scheduler(3)
+
+    async def fake_refresh(scheduler, pool, station):
+        await asyncio.sleep(REFRESH_SECONDS)
+        scheduler.finish(station.code, True)
+
+    monkeypatch.setattr(scheduler_cli, "refresh_station", fake_refresh)
+
+    async def run():
+        stop = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, stop.set)
+        await scheduler_cli.run_scheduler(scheduler, pool=None, stations=stations, concurrency=2, stop=stop)
+
+    asyncio.run(run())
+    assert scheduler.running == set()
+    assert sum(1 for schedule in scheduler.stations.values() if schedule.last_success) == 2
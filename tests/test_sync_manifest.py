@@ -0,0 +1,43 @@
+"""
+Pruebas del manifiesto de sincronización con varios procesos guardando la misma estación.
+"""
+
+import json
+import multiprocessing
+import os
+from src.sync_manifest import MANIFEST_FILENAME, SyncManifest
+
+
+def record_periods(directory: str, year: int) -> None:
+    # Cada proceso parte del manifiesto que había al iniciar, como un CSVManager de worker.py
+    manifest = SyncManifest(directory)
+    for month in range(1, 13):
+        manifest.record(f"{year}{month:02d}", f"{year};{month};1.0\n", f"E-{year}{month:02d}.csv")
+
+
+def test_concurrent_processes_keep_each_others_periods(tmp_path):
+    directory = str(tmp_path)
+    SyncManifest(directory).record("199912", "1999;12;1.0\n")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=record_periods, args=(directory, year)) for year in range(2020, 2024)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    with open(os.path.join(directory, MANIFEST_FILENAME), encoding="utf-8") as f:
+        periods = json.load(f)["periods"]
+    assert len(periods) == 1 + 4 * 12
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_save_keeps_own_newer_entry(tmp_path):
+    first, second = SyncManifest(str(tmp_path)), SyncManifest(str(tmp_path))
+    first.record("202401", "a\n")
+    second.record("202401", "a\nb\n")
+    first.record("202402", "c\n")
+
+    assert SyncManifest(str(tmp_path)).get("202401")["rows"] == 2
+    assert set(first.entries) == {"202401", "202402"}
@@ -0,0 +1,168 @@
+"""
+Pruebas de la cola de trabajo con un reloj simulado: préstamos, latidos, vencimientos,
+fallos con reintento y completado idempotente.
+"""
+
+import asyncio
+import pytest
+from src.retry import RetryPolicy
+from src.work_queue import Task, WorkQueue
+
+LEASE = 600
+PERIODS = ["202401", "202402", "202403"]
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    # Espera fija de 10 s antes de reintentar, sin variación aleatoria
+    policy = RetryPolicy(max_attempts=2, base_delay=10, max_delay=10, jitter=0)
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease=LEASE, max_attempts=2, retry_policy=policy, clock=clock)
+    yield queue
+    queue.close()
+
+
+def task_row(queue: WorkQueue, period: str) -> tuple:
+    return queue._query("SELECT status, attempts, lease_owner, lease_expires, available_at FROM tasks "
+                        "WHERE station_code = 'S1' AND period = ?", (period,))[0]
+
+
+def test_enqueue_ignores_existing_tasks(queue):
+    assert queue.enqueue("S1", PERIODS) == 3
+    assert queue.enqueue("S1", PERIODS + ["202404"]) == 1
+    assert queue.stats()["pending"] == 4
+
+
+def test_claim_leases_one_station_in_period_order(queue, clock):
+    queue.enqueue("S2", ["202401"])
+    queue.enqueue("S1", list(reversed(PERIODS)))
+
+    tasks = queue.claim("w1", limit=2)
+
+    assert tasks == [Task("S1", "202401", 1), Task("S1", "202402", 1)]
+    assert task_row(queue, "202401")[:4] == ("leased", 1, "w1", clock.now + LEASE)
+    assert queue.claim("w2", limit=5) == [Task("S1", "202403", 1)]
+    assert queue.claim("w3", limit=5) == [Task("S2", "202401", 1)]
+    assert queue.claim("w4") == []
+
+
+def test_heartbeat_renews_only_own_leases(queue, clock):
+    queue.enqueue("S1", PERIODS)
+    tasks = queue.claim("w1")
+    clock.advance(LEASE - 1)
+
+    assert queue.heartbeat("w2", tasks) == 0
+    assert queue.heartbeat("w1", tasks) == 3
+    assert task_row(queue, "202401")[3] == clock.now + LEASE
+
+    # El latido mantiene el préstamo después del vencimiento original
+    clock.advance(LEASE - 1)
+    assert queue.claim("w2") == []
+
+
+def test_expired_lease_returns_to_pending_then_fails(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    queue.claim("w1")
+    clock.advance(LEASE + 1)
+
+    assert queue.requeue_expired() == 1
+    assert task_row(queue, "202401")[:3] == ("pending", 1, None)
+
+    # El segundo préstamo agota los intentos: al vencer, la tarea falla
+    assert queue.claim("w2") == [Task("S1", "202401", 2)]
+    clock.advance(LEASE + 1)
+    assert queue.claim("w3") == []
+    status, attempts, *_ = task_row(queue, "202401")
+    assert (status, attempts) == ("failed", 2)
+    assert queue.failures() == [("S1", "202401", 2, "Préstamo vencido sin latidos")]
+
+
+def test_heartbeat_after_takeover_renews_nothing(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    tasks = queue.claim("w1")
+    clock.advance(LEASE + 1)
+    assert queue.claim("w2") == [Task("S1", "202401", 2)]
+
+    assert queue.heartbeat("w1", tasks) == 0
+
+
+def test_fail_waits_before_retry_and_fails_after_max_attempts(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    [task] = queue.claim("w1")
+
+    assert queue.fail("w1", task, "Tabla vacía") == "pending"
+    assert task_row(queue, "202401")[4] == clock.now + 10
+    assert queue.claim("w1") == []
+
+    clock.advance(10)
+    [task] = queue.claim("w1")
+    assert task.attempts == 2
+    assert queue.fail("w1", task, "Tabla vacía") == "failed"
+    assert queue.stats()["failed"] == 1
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1") == [Task("S1", "202401", 1)]
+
+
+def test_fail_from_previous_owner_is_ignored(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    [stale] = queue.claim("w1")
+    clock.advance(LEASE + 1)
+    queue.claim("w2")
+
+    assert queue.fail("w1", stale, "Error tardío") == "lost"
+
+    assert task_row(queue, "202401")[:3] == ("leased", 2, "w2")
+
+
+def test_fail_after_lease_lost_reports_lost(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    [first] = queue.claim("w1")
+    clock.advance(LEASE + 1)
+    [second] = queue.claim("w2")
+    assert second.attempts == queue.max_attempts
+    queue.complete("w2", "S1", "202401")
+
+    assert queue.fail("w1", first, "Error tardío") == "lost"
+    assert queue.fail("w2", second, "Error tardío") == "lost"
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_complete_is_idempotent(queue, clock):
+    queue.enqueue("S1", ["202401"])
+    [task] = queue.claim("w1")
+    clock.advance(LEASE + 1)
+    queue.claim("w2")
+
+    # El worker original termina tarde y el que retomó la tarea también
+    assert queue.complete("w1", task.station_code, task.period) is True
+    assert queue.complete("w2", task.station_code, task.period) is False
+
+    assert task_row(queue, "202401")[:3] == ("done", 2, None)
+    assert queue._query("SELECT worker, outcome FROM completions") == [("w1", "downloaded")]
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_calls_from_worker_threads(queue):
+    queue.enqueue("S1", PERIODS)
+
+    async def claim_all():
+        return await asyncio.gather(*(asyncio.to_thread(queue.claim, f"w{number}", 1) for number in range(4)))
+
+    claimed = [task for tasks in asyncio.run(claim_all()) for task in tasks]
+    assert sorted(task.period for task in claimed) == PERIODS
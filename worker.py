@@ -0,0 +1,203 @@
+"""
+Cola de trabajo distribuida: reparte meses de estaciones entre varios procesos y máquinas.
+
+Ejemplos:
+    python worker.py enqueue --all --start-year 2000 --end-year 2025
+    python worker.py enqueue --stations 472D30C8 4726A602 --start-year 2024 --end-year 2024
+    python worker.py run --browsers 2 --headless --until-empty
+    python worker.py status
+    python worker.py retry-failed
+
+Todos los workers deben usar el mismo archivo de cola (--queue o WORK_QUEUE_FILE).
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import time
+from datetime import date
+import settings
+from main import evict_html_cache, scrape_station, station_query_params
+from src.browser_pool import BrowserPool
+from src.browser_profile import ProfileStore
+from src.metrics import recorder
+from src.models import ScrapingResult
+from src.station_service import find_station_by_code, get_stations
+from src.work_queue import WorkQueue
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", default=settings.WORK_QUEUE_FILE, help="Archivo SQLite de la cola")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Agregar meses de estaciones a la cola")
+    enqueue.add_argument("--stations", nargs="+", default=[], help="Códigos de estación")
+    enqueue.add_argument("--stations-file", help="Archivo con un código de estación por línea")
+    enqueue.add_argument("--all", action="store_true", help="Todas las estaciones de la red")
+    enqueue.add_argument("--start-year", type=int, required=True)
+    enqueue.add_argument("--end-year", type=int, required=True)
+
+    run = commands.add_parser("run", help="Procesar tareas de la cola")
+    run.add_argument("--browsers", type=int, default=settings.BROWSER_POOL_SIZE, help="Navegadores (y lotes) simultáneos")
+    run.add_argument("--batch", type=int, default=settings.WORK_QUEUE_BATCH, help="Meses por lote reclamado")
+    run.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="Identificador del worker")
+    run.add_argument("--until-empty", action="store_true", help="Terminar cuando no queden tareas pendientes")
+    run.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    run.add_argument("--browser-path", help="Ejecutable de Chrome/Chromium")
+    run.add_argument("--profile", choices=("profile", "cookies"), default=settings.BROWSER_PROFILE_MODE,
+                     help="Reutilizar la autorización de Cloudflare entre ejecuciones")
+
+    commands.add_parser("status", help="Mostrar el avance de la cola")
+    commands.add_parser("retry-failed", help="Volver a poner en la cola las tareas fallidas")
+    return parser.parse_args()
+
+
+def month_periods(start_year: int, end_year: int) -> list:
+    """Periodos YYYYMM del rango, sin meses futuros"""
+    today = date.today()
+    return [f"{year:04d}{month:02d}" for year in range(start_year, end_year + 1) for month in range(1, 13)
+            if (year, month) <= (today.year, today.month)]
+
+
+def enqueue(queue: WorkQueue, args) -> None:
+    if args.all:
+        codes = [station.code for station in get_stations()]
+    else:
+        codes = list(args.stations)
+        if args.stations_file:
+            with open(args.stations_file, 'r', encoding='utf-8') as f:
+                codes.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    periods = month_periods(args.start_year, args.end_year)
+    added = 0
+    for code in codes:
+        if find_station_by_code(code) is None:
+            print(f"{settings.WARNING} Estación no encontrada: {code}")
+            continue
+        added += queue.enqueue(code, periods)
+    print(f"{settings.SUCCESS} {added} tareas nuevas ({len(codes)} estaciones x {len(periods)} meses)")
+
+
+def show_status(queue: WorkQueue) -> None:
+    stats = queue.stats()
+    total = sum(stats.values())
+    print(f"📋 {total} tareas: " + ", ".join(f"{status} {count}" for status, count in stats.items()))
+    for station_code, period, attempts, error in queue.failures():
+        print(f"   - {station_code} {period} ({attempts} intentos): {error}")
+
+
+async def keep_alive(queue: WorkQueue, worker_id: str, tasks, interval: float = settings.WORK_QUEUE_HEARTBEAT) -> None:
+    """Renueva el préstamo de las tareas mientras se descargan"""
+    while True:
+        await asyncio.sleep(interval)
+        renewed = await asyncio.to_thread(queue.heartbeat, worker_id, tasks)
+        if renewed < len(tasks):
+            print(f"{settings.WARNING} {len(tasks) - renewed} tareas de {tasks[0].station_code} ya no pertenecen a {worker_id}")
+
+
+async def process_batch(queue: WorkQueue, pool: BrowserPool, worker_id: str, tasks) -> int:
+    """
+    Descarga un lote de meses de una estación y registra el resultado de cada uno.
+    Retorna cuántos meses quedaron terminados
+    """
+    station = find_station_by_code(tasks[0].station_code)
+    if station is None:
+        for task in tasks:
+            await asyncio.to_thread(queue.fail, worker_id, task, "Estación no encontrada")
+        return 0
+
+    periods = [task.period for task in tasks]
+    print(f"\n🧾 {worker_id}: {station.name} ({station.code}) {periods[0]}-{periods[-1]} ({len(periods)} meses)")
+    params = station_query_params({"mode": "periods", "periods": periods}, station.name.replace(" ", ""))
+
+    heartbeat = asyncio.create_task(keep_alive(queue, worker_id, tasks))
+    try:
+        async with pool.lease() as browser:
+            result = await scrape_station(browser, station, params)
+    except Exception as e:
+        print(f"{settings.ERROR} Error en la estación {station.code}: {e}")
+        result = ScrapingResult(station_code=station.code, success=False)
+        result.add_error(str(e))
+    finally:
+        heartbeat.cancel()
+
+    completed = set(result.completed_periods)
+    empty = set(result.empty_periods)
+    unavailable = set(result.unavailable_periods)
+    error = result.errors[-1] if result.errors else "Mes sin descargar"
+    done = 0
+    # Las llamadas a la cola pueden esperar el bloqueo del archivo: se ejecutan fuera del loop
+    for task in tasks:
+        if task.period in empty:
+            await asyncio.to_thread(queue.complete, worker_id, task.station_code, task.period, "empty")
+            done += 1
+        elif task.period in completed:
+            await asyncio.to_thread(queue.complete, worker_id, task.station_code, task.period)
+            done += 1
+        elif task.period in unavailable:
+            await asyncio.to_thread(queue.complete, worker_id, task.station_code, task.period, "unavailable")
+            done += 1
+        else:
+            status = await asyncio.to_thread(queue.fail, worker_id, task, error)
+            if status == "failed":
+                print(f"{settings.ERROR} {task.station_code} {task.period}: sin descargar tras {task.attempts} intentos")
+            elif status == "lost":
+                print(f"{settings.WARNING} {task.station_code} {task.period}: el préstamo ya no pertenece a {worker_id}")
+    return done
+
+
+async def work(queue: WorkQueue, pool: BrowserPool, worker_id: str, batch: int, until_empty: bool) -> int:
+    """Reclama y procesa lotes hasta que la cola se vacíe (o indefinidamente)"""
+    done = 0
+    while True:
+        tasks = await asyncio.to_thread(queue.claim, worker_id, batch)
+        if tasks:
+            done += await process_batch(queue, pool, worker_id, tasks)
+            continue
+        stats = await asyncio.to_thread(queue.stats)
+        if until_empty and not stats["pending"] and not stats["leased"]:
+            return done
+        # Sin tareas disponibles: otras están prestadas o esperando su reintento
+        await asyncio.sleep(settings.WORK_QUEUE_POLL_INTERVAL)
+
+
+async def run(queue: WorkQueue, args) -> None:
+    browser_kwargs = {"headless": args.headless}
+    if args.browser_path:
+        browser_kwargs["browser_executable_path"] = args.browser_path
+
+    recorder.reset()
+    start = time.perf_counter()
+    async with BrowserPool(size=args.browsers, browser_kwargs=browser_kwargs,
+                           profiles=ProfileStore(mode=args.profile)) as pool:
+        # Un ciclo de reclamo por navegador, cada uno con su propio identificador de préstamo
+        done = await asyncio.gather(*(work(queue, pool, f"{args.worker_id}-{number}", args.batch, args.until_empty)
+                                      for number in range(args.browsers)))
+
+    print(f"\n🎉 {sum(done)} meses terminados en {time.perf_counter() - start:.1f} s")
+    await asyncio.to_thread(show_status, queue)
+    evict_html_cache()
+    for filepath in recorder.write_reports():
+        print(f"📈 Métricas guardadas: {filepath}")
+
+
+def main():
+    args = parse_args()
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == "enqueue":
+            enqueue(queue, args)
+        elif args.command == "run":
+            asyncio.run(run(queue, args))
+        elif args.command == "status":
+            show_status(queue)
+        elif args.command == "retry-failed":
+            print(f"{settings.SUCCESS} {queue.retry_failed()} tareas fallidas vuelven a la cola")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()